@@ -1,7 +1,8 @@
 import logging
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -9,6 +10,7 @@ from ...core.dependencies import get_current_admin
 from ...db.session import get_session
 from ...models import NovelProject, UsageMetric, User
 from ...schemas.admin import (
+    AdminNovelPage,
     AdminNovelSummary,
     DailyRequestLimit,
     Statistics,
@@ -33,7 +35,8 @@ from ...services.prompt_service import PromptService
 from ...services.update_log_service import UpdateLogService
 from ...services.user_service import UserService
 from ...services.rag_status_service import RAGStatusService
-from ...schemas.admin import RAGStatus
+from ...schemas.admin import RAGStatus, TaskJobRead, TaskQueueStatus
+from ...services.task_queue import TaskQueueService, task_worker
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/admin", tags=["Admin"])
@@ -71,6 +74,10 @@ def get_rag_status_service(session: AsyncSession = Depends(get_session)) -> RAGS
     return RAGStatusService(session)
 
 
+def get_task_queue_service(session: AsyncSession = Depends(get_session)) -> TaskQueueService:
+    return TaskQueueService(session)
+
+
 @router.get("/stats", response_model=Statistics)
 async def read_statistics(
     session: AsyncSession = Depends(get_session),
@@ -104,6 +111,25 @@ async def list_novel_projects(
     return projects
 
 
+@router.get("/novel-projects/page", response_model=AdminNovelPage)
+async def page_novel_projects(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor"),
+    updated_after: datetime | None = Query(None),
+    updated_before: datetime | None = Query(None),
+    order: Literal["desc", "asc"] = Query("desc"),
+    service: NovelService = Depends(get_novel_service),
+    _: None = Depends(get_current_admin),
+) -> AdminNovelPage:
+    return await service.page_projects_for_admin(
+        limit=limit,
+        cursor=cursor,
+        updated_after=updated_after,
+        updated_before=updated_before,
+        descending=order == "desc",
+    )
+
+
 @router.get("/novel-projects/{project_id}", response_model=NovelProjectSchema)
 async def get_novel_project(
     project_id: str,
@@ -329,6 +355,45 @@ async def read_rag_status(service: RAGStatusService = Depends(get_rag_status_ser
     return await service.get_status(top_n_projects=5)
 
 
+@router.get("/tasks/status", response_model=TaskQueueStatus)
+async def read_task_queue_status(
+    service: TaskQueueService = Depends(get_task_queue_service),
+    _: None = Depends(get_current_admin),
+) -> TaskQueueStatus:
+    """读取后台任务队列按类型与状态的统计。."""
+    return TaskQueueStatus(
+        worker_running=task_worker.is_running, counts=await service.stats()
+    )
+
+
+@router.get("/tasks", response_model=List[TaskJobRead])
+async def list_task_jobs(
+    status_filter: str | None = Query(None, alias="status"),
+    kind: str | None = None,
+    limit: int = Query(100, ge=1, le=500),
+    service: TaskQueueService = Depends(get_task_queue_service),
+    _: None = Depends(get_current_admin),
+) -> List[TaskJobRead]:
+    jobs = await service.list_jobs(status=status_filter, kind=kind, limit=limit)
+    return [TaskJobRead.model_validate(job) for job in jobs]
+
+
+@router.post("/tasks/{job_id}/retry", response_model=TaskJobRead)
+async def retry_task_job(
+    job_id: int,
+    service: TaskQueueService = Depends(get_task_queue_service),
+    _: None = Depends(get_current_admin),
+) -> TaskJobRead:
+    job = await service.retry(job_id)
+    if not job:
+        logger.warning("后台任务 %s 不存在，无法重试", job_id)
+        raise HTTPException(status_code=404, detail="任务不存在")
+    if job.status != "pending":
+        raise HTTPException(status_code=400, detail="只有失败的任务可以重试")
+    logger.info("管理员重试后台任务：%s", job_id)
+    return TaskJobRead.model_validate(job)
+
+
 @router.delete("/system-configs/{key}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_system_config(
     key: str,
@@ -78,19 +78,21 @@ async def generate_blueprint_stream(
     async def event_generator():
         try:
             from ....repositories.novel_repository import NovelRepository
+            from ....services.novel_service import NovelService
             novel_repo = NovelRepository(db)
-            project = await novel_repo.get_by_id(project_id)
+            project = await novel_repo.get_project(project_id)
 
             if not project:
                 error_data = json.dumps({"error": "项目不存在"})
                 yield f"event: error\ndata: {error_data}\n\n"
                 return
 
-            # 从 conversations 关系构建 conversation_history
+            # 只读取对话记录构建 conversation_history，无需加载整个项目
+            conversation_records = await NovelService(db).list_conversations(project_id)
             conversation_history = [
                 {"role": conv.role, "content": conv.content}
-                for conv in project.conversations
-            ] if project.conversations else []
+                for conv in conversation_records
+            ]
 
             progress_queue = []
 
@@ -158,7 +160,7 @@ async def get_blueprint(
     try:
         from ....repositories.novel_repository import NovelRepository
         novel_repo = NovelRepository(db)
-        project = await novel_repo.get_by_id(project_id)
+        project = await novel_repo.get_with_blueprint(project_id)
 
         if not project:
             raise HTTPException(
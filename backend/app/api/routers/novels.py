@@ -1,9 +1,10 @@
 import json
 import logging
-from typing import Dict, List
+from datetime import datetime
+from typing import Dict, List, Literal
 from pydantic import ValidationError
 
-from fastapi import APIRouter, Body, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...core.dependencies import get_current_user
@@ -13,9 +14,11 @@ from ...schemas.novel import (
     BlueprintGenerationResponse,
     BlueprintPatch,
     Chapter as ChapterSchema,
+    ChapterVersionContent,
     ConverseRequest,
     ConverseResponseV2,
     NovelProject as NovelProjectSchema,
+    NovelProjectPage,
     NovelProjectSummary,
     NovelSectionResponse,
     NovelSectionType,
@@ -24,6 +27,7 @@ from ...schemas.user import UserInDB
 from ...services.llm_service import LLMService
 from ...services.novel_service import NovelService
 from ...services.prompt_service import PromptService
+from ...utils.http_cache import not_modified_response, revision_etag, set_etag_headers
 from ...utils.json_utils import remove_think_tags, sanitize_json_like_text, unwrap_markdown_json
 
 
@@ -122,14 +126,47 @@ async def list_novels(
     return projects
 
 
+@router.get("/page", response_model=NovelProjectPage)
+async def page_novels(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor"),
+    updated_after: datetime | None = Query(None, description="只返回此时间及之后更新的项目"),
+    updated_before: datetime | None = Query(None, description="只返回此时间之前更新的项目"),
+    order: Literal["desc", "asc"] = Query("desc", description="按更新时间排序方向"),
+    session: AsyncSession = Depends(get_session),
+    current_user: UserInDB = Depends(get_current_user),
+) -> NovelProjectPage:
+    """按更新时间键集分页列出用户项目，章节统计由数据库聚合。"""
+    novel_service = NovelService(session)
+    page = await novel_service.page_projects_for_user(
+        current_user.id,
+        limit=limit,
+        cursor=cursor,
+        updated_after=updated_after,
+        updated_before=updated_before,
+        descending=order == "desc",
+    )
+    logger.info("用户 %s 分页获取项目列表，本页 %s 个", current_user.id, len(page.items))
+    return page
+
+
 @router.get("/{project_id}", response_model=NovelProjectSchema)
 async def get_novel(
     project_id: str,
+    request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_session),
     current_user: UserInDB = Depends(get_current_user),
 ) -> NovelProjectSchema:
+    """返回完整项目，支持 If-None-Match 条件请求，项目未变更时返回 304。"""
     novel_service = NovelService(session)
+    revision = await novel_service.get_project_revision(project_id, current_user.id)
+    etag = revision_etag(revision, "project")
+    not_modified = not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
     logger.info("用户 %s 查询项目 %s", current_user.id, project_id)
+    set_etag_headers(response, etag)
     return await novel_service.get_project_schema(project_id, current_user.id)
 
 
@@ -137,26 +174,72 @@ async def get_novel(
 async def get_novel_section(
     project_id: str,
     section: NovelSectionType,
+    request: Request,
     session: AsyncSession = Depends(get_session),
     current_user: UserInDB = Depends(get_current_user),
-) -> NovelSectionResponse:
+) -> Response:
+    """返回项目区段，支持条件请求；序列化结果按项目修订号缓存。"""
     novel_service = NovelService(session)
+    revision = await novel_service.get_project_revision(project_id, current_user.id)
+    etag = revision_etag(revision, section.value)
+    not_modified = not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
     logger.info("用户 %s 获取项目 %s 的 %s 区段", current_user.id, project_id, section)
-    return await novel_service.get_section_data(project_id, current_user.id, section)
+    payload = await novel_service.get_section_payload(
+        project_id, current_user.id, section, revision
+    )
+    response = Response(content=payload, media_type="application/json")
+    set_etag_headers(response, etag)
+    return response
 
 
 @router.get("/{project_id}/chapters/{chapter_number}", response_model=ChapterSchema)
 async def get_chapter(
     project_id: str,
     chapter_number: int,
+    request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_session),
     current_user: UserInDB = Depends(get_current_user),
 ) -> ChapterSchema:
+    """返回单章详情，支持条件请求，项目未变更时不读取章节表。"""
     novel_service = NovelService(session)
+    revision = await novel_service.get_project_revision(project_id, current_user.id)
+    etag = revision_etag(revision, f"chapter-{chapter_number}")
+    not_modified = not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
     logger.info("用户 %s 获取项目 %s 第 %s 章", current_user.id, project_id, chapter_number)
+    set_etag_headers(response, etag)
     return await novel_service.get_chapter_schema(project_id, current_user.id, chapter_number)
 
 
+@router.get(
+    "/{project_id}/chapters/{chapter_number}/versions/{version_index}",
+    response_model=ChapterVersionContent,
+)
+async def get_chapter_version(
+    project_id: str,
+    chapter_number: int,
+    version_index: int,
+    session: AsyncSession = Depends(get_session),
+    current_user: UserInDB = Depends(get_current_user),
+) -> ChapterVersionContent:
+    """按需读取单个章节版本的正文，版本索引与选择版本接口一致。"""
+    novel_service = NovelService(session)
+    logger.info(
+        "用户 %s 获取项目 %s 第 %s 章的第 %s 个版本",
+        current_user.id,
+        project_id,
+        chapter_number,
+        version_index,
+    )
+    return await novel_service.get_chapter_version_content(
+        project_id, current_user.id, chapter_number, version_index
+    )
+
+
 @router.delete("", status_code=status.HTTP_200_OK)
 async def delete_novels(
     project_ids: List[str] = Body(...),
@@ -454,7 +537,7 @@ async def generate_blueprint(
     if blueprint.title:
         project.title = blueprint.title
         project.status = "blueprint_ready"
-        await session.commit()
+        await novel_service.touch_project(project_id)
         logger.info("项目 %s 更新标题为 %s，并标记为 blueprint_ready", project_id, blueprint.title)
 
     ai_message = (
@@ -478,7 +561,7 @@ async def save_blueprint(
         await novel_service.replace_blueprint(project_id, blueprint_data)
         if blueprint_data.title:
             project.title = blueprint_data.title
-            await session.commit()
+            await novel_service.touch_project(project_id)
         logger.info("项目 %s 手动保存蓝图", project_id)
     else:
         logger.warning("项目 %s 保存蓝图时未提供蓝图数据", project_id)
@@ -2,10 +2,14 @@ import asyncio
 import json
 import logging
 import os
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from tenacity import (
     retry,
@@ -17,15 +21,21 @@ from tenacity import (
 from ...core.config import settings
 from ...core.dependencies import get_current_user
 from ...db.session import AsyncSessionLocal, get_session
-from ...models.novel import Chapter
+from ...models.novel import Chapter, ChapterGenerationJob, PlotEvent
+from ...models.task_job import TaskJob
 from ...repositories.system_config_repository import SystemConfigRepository
 from ...schemas.novel import (
+    ChapterGenerationJob as ChapterGenerationJobSchema,
+)
+from ...schemas.novel import (
+    ChapterGenerationStatus,
     DeleteChapterRequest,
     EditChapterRequest,
     EvaluateChapterRequest,
     GenerateChapterRequest,
     GenerateNextVolumeRequest,
     SelectVersionRequest,
+    SummaryBackfillJob,
     VolumeCompletionCheckRequest,
     VolumeCompletionCheckResponse,
 )
@@ -33,15 +43,31 @@ from ...schemas.novel import (
     NovelProject as NovelProjectSchema,
 )
 from ...schemas.user import UserInDB
+from ...services.blueprint_snapshot_service import BlueprintSnapshotService
 from ...services.chapter_context_service import ChapterContextService
-from ...services.chapter_ingest_service import ChapterIngestionService
+from ...services.generation_job_service import GenerationJobService, run_with_lease
 from ...services.llm_service import LLMService
 from ...services.novel_service import NovelService
 from ...services.plot_event_service import PlotEventService
 from ...services.prompt_service import PromptService
 from ...services.rolling_outline_service import RollingOutlineService
-from ...services.vector_store_service import VectorStoreService
-from ...utils.json_utils import remove_think_tags, unwrap_markdown_json
+from ...services.summary_tree_service import SummaryTreeService
+from ...services.task_handlers import (
+    SUMMARY_BACKFILL,
+    enqueue_chapter_ingest,
+    enqueue_chapter_vector_delete,
+    enqueue_summary_backfill,
+    enqueue_summary_tree_refresh,
+    summary_backfill_dedup_key,
+)
+from ...services.task_queue import TaskQueueService
+from ...services.vector_store_service import VectorStoreService, get_vector_store
+from ...services.writer_context_packer import WriterContextPacker
+from ...utils.json_utils import (
+    StreamingJSONFieldExtractor,
+    remove_think_tags,
+    unwrap_markdown_json,
+)
 
 router = APIRouter(prefix="/api/writer", tags=["Writer"])
 logger = logging.getLogger(__name__)
@@ -63,29 +89,30 @@ def _extract_tail_excerpt(text: str | None, limit: int = 500) -> str:
     return stripped[-limit:]
 
 
-@router.post(
-    "/novels/{project_id}/chapters/generate", response_model=NovelProjectSchema
-)
-async def generate_chapter(
+@dataclass(slots=True)
+class _ChapterGenerationPlan:
+    """章节生成前准备好的上下文：目标章节、当前事件与完整提示词。."""
+
+    chapter: Chapter
+    current_event: PlotEvent
+    writer_prompt: str
+    prompt_input: str
+    version_count: int
+
+
+async def _prepare_chapter_generation(
     project_id: str,
     request: GenerateChapterRequest,
-    background_tasks: BackgroundTasks,
-    session: AsyncSession = Depends(get_session),
-    current_user: UserInDB = Depends(get_current_user),
-) -> NovelProjectSchema:
-    """生成章节（事件驱动模式）.
-
-    逻辑：
-    1. 获取当前正在进行的事件
-    2. 根据事件的进度和关键点生成章节
-    3. 更新事件进度
-    4. 如果事件完成，自动切换到下一个事件
-    """
+    session: AsyncSession,
+    current_user: UserInDB,
+    vector_store: VectorStoreService | None,
+) -> _ChapterGenerationPlan:
+    """定位当前事件、重置章节状态并组装写作提示词，供普通与流式生成共用。."""
     novel_service = NovelService(session)
     prompt_service = PromptService(session)
     llm_service = LLMService(session)
 
-    project = await novel_service.ensure_project_owner(project_id, current_user.id)
+    await novel_service.ensure_project_owner(project_id, current_user.id)
     logger.info(
         "用户 %s 开始为项目 %s 生成第 %s 章（事件驱动模式）",
         current_user.id,
@@ -110,13 +137,13 @@ async def generate_chapter(
     chapter.event_id = current_event.id  # 关联事件
     chapter.event_progress = current_event.progress  # 记录当前事件进度
     chapter.act = current_event.act  # 记录所属的幕
-    await session.commit()
+    await novel_service.touch_project(project_id)
 
     # 构建已完成章节的摘要（事件驱动模式）
     chapters_needing_summary = []
     completed_chapters = []
     latest_prev_number = -1
-    for existing in project.chapters:
+    for existing in await novel_service.list_chapters(project_id):
         if existing.chapter_number >= request.chapter_number:
             continue
         if existing.selected_version is None or not existing.selected_version.content:
@@ -142,70 +169,12 @@ async def generate_chapter(
                     existing.selected_version.content
                 )
 
+    # 缺失的摘要交给后台任务队列并发补齐，不阻塞本次生成
     if chapters_needing_summary:
-        # 为避免复用请求级会话/服务，后台任务内部新建会话与服务并按ID重取数据
-        chapter_ids = [
-            ch.id for ch in chapters_needing_summary if getattr(ch, "id", None)
-        ]
+        await enqueue_summary_backfill(session, project_id, current_user.id)
 
-        async def generate_missing_summaries_task(
-            project_id_: str, chapter_ids_: list[int], user_id_: int
-        ):
-            try:
-                async with AsyncSessionLocal() as bg_session:
-                    bg_llm_service = LLMService(bg_session)
-                    for ch_id in chapter_ids_:
-                        stmt = select(Chapter).where(Chapter.id == ch_id)
-                        result = await bg_session.execute(stmt)
-                        ch = result.scalars().first()
-                        if (
-                            not ch
-                            or not ch.selected_version
-                            or not ch.selected_version.content
-                        ):
-                            continue
-                        summary = await bg_llm_service.get_summary(
-                            ch.selected_version.content,
-                            temperature=0.15,
-                            user_id=user_id_,
-                            timeout=180.0,
-                        )
-                        ch.real_summary = remove_think_tags(summary)
-                        await bg_session.commit()
-                        logger.info(
-                            "后台生成项目 %s 第 %s 章摘要完成",
-                            project_id_,
-                            ch.chapter_number,
-                        )
-            except Exception as exc:
-                logger.exception("后台生成摘要失败: %s", exc)
-
-        background_tasks.add_task(
-            generate_missing_summaries_task, project_id, chapter_ids, current_user.id
-        )
-
-    project_schema = await novel_service._serialize_project(project)
-    blueprint_dict = project_schema.blueprint.model_dump()
-
-    if "relationships" in blueprint_dict and blueprint_dict["relationships"]:
-        for relation in blueprint_dict["relationships"]:
-            if "character_from" in relation:
-                relation["from"] = relation.pop("character_from")
-            if "character_to" in relation:
-                relation["to"] = relation.pop("character_to")
-
-    # 蓝图中禁止携带章节级别的细节信息，避免重复传输大段场景或对话内容
-    banned_blueprint_keys = {
-        "chapter_summaries",
-        "chapter_details",
-        "chapter_dialogues",
-        "chapter_events",
-        "conversation_history",
-        "character_timelines",
-    }
-    for key in banned_blueprint_keys:
-        if key in blueprint_dict:
-            blueprint_dict.pop(key, None)
+    # 只读取蓝图相关表，避免为拿蓝图而序列化全部章节与版本
+    blueprint_dict = await BlueprintSnapshotService(session).get(project_id)
 
     writer_prompt = await prompt_service.get_prompt("writing")
     if not writer_prompt:
@@ -214,16 +183,7 @@ async def generate_chapter(
             status_code=500, detail="缺少写作提示词，请联系管理员配置 'writing' 提示词"
         )
 
-    # 初始化向量检索服务，若未配置则自动降级为纯提示词生成
-    vector_store: VectorStoreService | None
-    if not settings.vector_store_enabled:
-        vector_store = None
-    else:
-        try:
-            vector_store = VectorStoreService()
-        except RuntimeError as exc:
-            logger.warning("向量库初始化失败，RAG 检索被禁用: %s", exc)
-            vector_store = None
+    # 使用进程级共享的向量库实例，若未配置则自动降级为纯提示词生成
     context_service = ChapterContextService(
         llm_service=llm_service, vector_store=vector_store
     )
@@ -251,15 +211,6 @@ async def generate_chapter(
         chunk_count,
         summary_count,
     )
-    # 构建事件驱动模式的输入（符合 writing.md 的格式）
-    completed_lines = [
-        f"- 第{item['chapter_number']}章 - {item['title']}:{item['summary']}"
-        for item in completed_chapters
-    ]
-    completed_section = (
-        "\n".join(completed_lines) if completed_lines else "暂无前情摘要"
-    )
-
     # 计算预期的事件进度（简单估算：每章推进 20-30%）
     estimated_progress_after = min(100, current_event.progress + 25)
 
@@ -271,8 +222,6 @@ async def generate_chapter(
     # 构建事件驱动模式的 JSON 输入
     event_driven_input = {
         "mode": "event",
-        "novel_blueprint": blueprint_dict,
-        "completed_chapters": completed_section,
         "current_volume": {
             "volume_number": current_event.volume.volume_number
             if current_event.volume
@@ -305,9 +254,105 @@ async def generate_chapter(
     if request.writing_notes:
         event_driven_input["writing_notes"] = request.writing_notes
 
+    # 较早章节用事件/情节线/分卷的分层摘要替代，控制前情长度
+    if settings.summary_tree_enabled:
+        completed_chapters = await SummaryTreeService(
+            session, llm_service
+        ).build_completed_context(
+            project_id, completed_chapters, settings.summary_tree_recent_chapters
+        )
+
+    # 按 token 预算挑选蓝图、前情摘要与检索片段（符合 writing.md 的格式）
+    packed = WriterContextPacker(settings.writer_context_token_budget).pack(
+        chapter_number=request.chapter_number,
+        fixed_input=event_driven_input,
+        blueprint=blueprint_dict,
+        completed_chapters=completed_chapters,
+        rag_context=rag_context,
+    )
+    event_driven_input = {
+        "mode": "event",
+        "novel_blueprint": packed.blueprint,
+        "completed_chapters": packed.completed_chapters,
+        **{k: v for k, v in event_driven_input.items() if k != "mode"},
+    }
+    if packed.retrieved_chunks or packed.retrieved_summaries:
+        event_driven_input["retrieved_context"] = {
+            "chunks": packed.retrieved_chunks,
+            "summaries": packed.retrieved_summaries,
+        }
+    logger.info(
+        "项目 %s 第 %s 章写作上下文约 %s tokens（预算 %s）",
+        project_id,
+        request.chapter_number,
+        packed.used_tokens,
+        packed.budget or "不限",
+    )
+
     prompt_input = json.dumps(event_driven_input, ensure_ascii=False, indent=2)
     logger.debug("章节写作提示词（事件驱动模式）：%s\n%s", writer_prompt, prompt_input)
 
+    version_count = await _resolve_version_count(session)
+    logger.info(
+        "项目 %s 第 %s 章计划生成 %s 个版本",
+        project_id,
+        request.chapter_number,
+        version_count,
+    )
+    return _ChapterGenerationPlan(
+        chapter=chapter,
+        current_event=current_event,
+        writer_prompt=writer_prompt,
+        prompt_input=prompt_input,
+        version_count=version_count,
+    )
+
+
+def _parse_version_response(
+    project_id: str, chapter_number: int, idx: int, response: str
+) -> dict:
+    """解析单个版本的模型输出，非 JSON 时按纯文本处理。."""
+    cleaned = remove_think_tags(response)
+    normalized = unwrap_markdown_json(cleaned)
+    try:
+        parsed = json.loads(normalized)
+    except json.JSONDecodeError as parse_err:
+        logger.warning(
+            "项目 %s 第 %s 章第 %s 个版本 JSON 解析失败，将原始内容作为纯文本处理: %s",
+            project_id,
+            chapter_number,
+            idx + 1,
+            parse_err,
+        )
+        return {"content": normalized, "status": "success"}
+    if not isinstance(parsed, dict):
+        return {"content": normalized, "status": "success"}
+    parsed.setdefault("status", "success")
+    return parsed
+
+
+def _failed_version(exc: Exception) -> dict:
+    return {
+        "content": f"生成失败: {exc}",
+        "status": "failed",
+        "error": str(exc),
+    }
+
+
+async def _generate_versions(
+    plan: _ChapterGenerationPlan,
+    project_id: str,
+    llm_service: LLMService,
+    user_id: int,
+    on_version: Callable[[dict], Awaitable[None]] | None = None,
+) -> list[dict]:
+    """生成全部候选版本：优先一次请求多个候选，不足的部分并发补齐。.
+
+    传入 on_version 时，每个版本一结束就会回调一次（按完成顺序），便于立即写入。
+    """
+    chapter_number = plan.chapter.chapter_number
+    conversation = [{"role": "user", "content": plan.prompt_input}]
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=1, max=10),
@@ -324,115 +369,509 @@ async def generate_chapter(
             async with AsyncSessionLocal() as local_session:
                 local_llm_service = LLMService(local_session)
                 response = await local_llm_service.get_llm_response(
-                    system_prompt=writer_prompt,
-                    conversation_history=[{"role": "user", "content": prompt_input}],
+                    system_prompt=plan.writer_prompt,
+                    conversation_history=conversation,
                     temperature=0.7,
-                    user_id=current_user.id,
+                    user_id=user_id,
                     timeout=600.0,
                 )
-            cleaned = remove_think_tags(response)
-            normalized = unwrap_markdown_json(cleaned)
-            try:
-                parsed = json.loads(normalized)
-                parsed.setdefault("status", "success")
-                return parsed
-            except json.JSONDecodeError as parse_err:
-                logger.warning(
-                    "项目 %s 第 %s 章第 %s 个版本 JSON 解析失败，将原始内容作为纯文本处理: %s",
-                    project_id,
-                    request.chapter_number,
-                    idx + 1,
-                    parse_err,
-                )
-                return {"content": normalized, "status": "success"}
+            return _parse_version_response(project_id, chapter_number, idx, response)
         except HTTPException:
             raise
         except Exception as exc:
             logger.exception(
                 "项目 %s 生成第 %s 章第 %s 个版本时发生异常: %s",
                 project_id,
-                request.chapter_number,
+                chapter_number,
                 idx + 1,
                 exc,
             )
-            return {
-                "content": f"生成失败: {exc}",
-                "status": "failed",
-                "error": str(exc),
-            }
+            return _failed_version(exc)
 
-    version_count = await _resolve_version_count(session)
-    logger.info(
-        "项目 %s 第 %s 章计划生成 %s 个版本",
-        project_id,
-        request.chapter_number,
-        version_count,
+    async def _generate_and_report(idx: int) -> dict:
+        result = await _generate_single_version(idx)
+        if on_version is not None:
+            await on_version(result)
+        return result
+
+    raw_versions: list[dict] = []
+    if plan.version_count > 1 and settings.llm_multi_choice_enabled:
+        # 一次请求生成多个候选，提示词只处理一次；不足的部分再并发补齐
+        try:
+            responses = await llm_service.get_llm_responses(
+                system_prompt=plan.writer_prompt,
+                conversation_history=conversation,
+                n=plan.version_count,
+                temperature=0.7,
+                user_id=user_id,
+                timeout=600.0,
+            )
+            raw_versions = [
+                _parse_version_response(project_id, chapter_number, idx, response)
+                for idx, response in enumerate(responses[: plan.version_count])
+            ]
+            if on_version is not None:
+                for result in raw_versions:
+                    await on_version(result)
+        except HTTPException as exc:
+            logger.warning(
+                "项目 %s 第 %s 章多候选生成失败，改为并发生成: %s",
+                project_id,
+                chapter_number,
+                exc.detail,
+            )
+    tasks = [
+        _generate_and_report(idx)
+        for idx in range(len(raw_versions), plan.version_count)
+    ]
+    if tasks:
+        raw_versions.extend(await asyncio.gather(*tasks))
+    return raw_versions
+
+
+def _version_content(variant: Any) -> tuple[str, dict]:
+    """从版本结果中取出正文与元数据。."""
+    if isinstance(variant, dict):
+        # 事件驱动模式：提取 full_content 字段
+        if "full_content" in variant and isinstance(variant["full_content"], str):
+            return variant["full_content"], variant
+        if "content" in variant and isinstance(variant["content"], str):
+            return variant["content"], variant
+        if "chapter_content" in variant:
+            return str(variant["chapter_content"]), variant
+        return json.dumps(variant, ensure_ascii=False), variant
+    return str(variant), {"raw": variant}
+
+
+async def _apply_event_progress(
+    novel_service: NovelService,
+    project_id: str,
+    chapter: Chapter,
+    current_event: PlotEvent,
+    first_version: dict,
+) -> None:
+    """按第一个版本给出的进度信息推进事件，事件完成时切换到下一个事件。."""
+    event_progress_after = first_version.get(
+        "event_progress_after", current_event.progress
     )
-    tasks = [_generate_single_version(idx) for idx in range(version_count)]
-    raw_versions = await asyncio.gather(*tasks)
+    completed_key_points_in_chapter = first_version.get(
+        "completed_key_points_in_this_chapter", []
+    )
+    is_event_complete = first_version.get("is_event_complete", False)
+
+    # 更新章节的事件进度
+    await novel_service.update_chapter_event_progress(
+        chapter=chapter,
+        event_progress_after=event_progress_after,
+        completed_key_points=completed_key_points_in_chapter,
+        is_event_complete=is_event_complete,
+    )
+
+    # 如果事件完成，尝试切换到下一个事件
+    if is_event_complete:
+        next_event = await novel_service.check_and_switch_event(
+            project_id, current_event.id
+        )
+        if next_event:
+            logger.info(
+                f"事件 {current_event.event_id} 已完成，已切换到下一个事件 {next_event.event_id}"
+            )
+        else:
+            logger.info(
+                f"事件 {current_event.event_id} 已完成，当前卷的所有事件已完成"
+            )
+
+
+async def _persist_chapter_versions(
+    novel_service: NovelService,
+    project_id: str,
+    chapter: Chapter,
+    current_event: PlotEvent,
+    raw_versions: list[dict],
+) -> None:
+    """写入候选版本，并按第一个版本的结果推进事件进度。."""
     contents: list[str] = []
     metadata: list[dict] = []
     for variant in raw_versions:
-        if isinstance(variant, dict):
-            # 事件驱动模式：提取 full_content 字段
-            if "full_content" in variant and isinstance(variant["full_content"], str):
-                contents.append(variant["full_content"])
-            elif "content" in variant and isinstance(variant["content"], str):
-                contents.append(variant["content"])
-            elif "chapter_content" in variant:
-                contents.append(str(variant["chapter_content"]))
-            else:
-                contents.append(json.dumps(variant, ensure_ascii=False))
-            metadata.append(variant)
-        else:
-            contents.append(str(variant))
-            metadata.append({"raw": variant})
+        content, extra = _version_content(variant)
+        contents.append(content)
+        metadata.append(extra)
 
     await novel_service.replace_chapter_versions(chapter, contents, metadata)
 
-    # 事件驱动模式：更新事件进度
-    # 从第一个版本的 metadata 中提取事件进度信息
-    if metadata and isinstance(metadata[0], dict):
-        first_version = metadata[0]
-        event_progress_after = first_version.get(
-            "event_progress_after", current_event.progress
-        )
-        completed_key_points_in_chapter = first_version.get(
-            "completed_key_points_in_this_chapter", []
-        )
-        is_event_complete = first_version.get("is_event_complete", False)
-
-        # 更新章节的事件进度
-        await novel_service.update_chapter_event_progress(
-            chapter=chapter,
-            event_progress_after=event_progress_after,
-            completed_key_points=completed_key_points_in_chapter,
-            is_event_complete=is_event_complete,
+    # 事件驱动模式：从第一个版本的 metadata 中提取事件进度信息
+    if metadata:
+        await _apply_event_progress(
+            novel_service, project_id, chapter, current_event, metadata[0]
         )
 
-        # 如果事件完成，尝试切换到下一个事件
-        if is_event_complete:
-            next_event = await novel_service.check_and_switch_event(
-                project_id, current_event.id
-            )
-            if next_event:
-                logger.info(
-                    f"事件 {current_event.event_id} 已完成，已切换到下一个事件 {next_event.event_id}"
-                )
-            else:
-                logger.info(
-                    f"事件 {current_event.event_id} 已完成，当前卷的所有事件已完成"
-                )
-
     logger.info(
         "项目 %s 第 %s 章生成完成，已写入 %s 个版本",
         project_id,
-        request.chapter_number,
+        chapter.chapter_number,
         len(contents),
     )
+
+
+# 持有后台生成任务的引用，避免任务在完成前被垃圾回收
+_generation_job_tasks: set[asyncio.Task] = set()
+
+
+async def _run_generation_job(
+    job_id: str,
+    project_id: str,
+    plan: _ChapterGenerationPlan,
+    user_id: int,
+) -> None:
+    """后台执行章节生成：每个版本完成后立即写入，并同步更新任务进度。."""
+    async with AsyncSessionLocal() as session:
+        novel_service = NovelService(session)
+        job = await session.get(ChapterGenerationJob, job_id)
+        chapter = await session.get(Chapter, plan.chapter.id)
+        current_event = await session.get(PlotEvent, plan.current_event.id)
+        if job is None or chapter is None or current_event is None:
+            logger.warning("章节生成任务 %s 的任务或章节已不存在，跳过执行", job_id)
+            return
+
+        # 各版本在独立会话中生成，回调共用本会话写入，需要串行化
+        lock = asyncio.Lock()
+        first_version: dict | None = None
+
+        async def _on_version(result: dict) -> None:
+            nonlocal first_version
+            content, extra = _version_content(result)
+            async with lock:
+                await novel_service.append_chapter_version(chapter, content, extra)
+                if first_version is None:
+                    first_version = extra
+                job.completed_versions += 1
+                if isinstance(result, dict) and result.get("status") == "failed":
+                    job.failed_versions += 1
+                await session.commit()
+            logger.info(
+                "章节生成任务 %s 已写入 %s/%s 个版本",
+                job_id,
+                job.completed_versions,
+                job.version_count,
+            )
+
+        try:
+            job.status = "running"
+            await session.commit()
+            await novel_service.clear_chapter_versions(chapter)
+            await _generate_versions(
+                plan, project_id, LLMService(session), user_id, on_version=_on_version
+            )
+            chapter.status = ChapterGenerationStatus.WAITING_FOR_CONFIRM.value
+            await novel_service.touch_project(project_id)
+            if first_version is not None:
+                await _apply_event_progress(
+                    novel_service, project_id, chapter, current_event, first_version
+                )
+            job.status = (
+                "failed"
+                if job.failed_versions >= job.completed_versions
+                else "succeeded"
+            )
+            if job.status == "failed":
+                job.error = "所有版本均生成失败"
+        except Exception as exc:
+            logger.exception("章节生成任务 %s 执行失败: %s", job_id, exc)
+            await session.rollback()
+            await session.refresh(job)
+            await session.refresh(chapter)
+            job.status = "failed"
+            job.error = str(getattr(exc, "detail", None) or exc)
+            if not job.completed_versions:
+                chapter.status = ChapterGenerationStatus.FAILED.value
+            else:
+                chapter.status = ChapterGenerationStatus.WAITING_FOR_CONFIRM.value
+        job.finished_at = datetime.now(UTC)
+        await novel_service.touch_project(project_id)
+        logger.info(
+            "章节生成任务 %s 结束: status=%s versions=%s/%s",
+            job_id,
+            job.status,
+            job.completed_versions,
+            job.version_count,
+        )
+
+
+@router.post(
+    "/novels/{project_id}/chapters/generate",
+    response_model=NovelProjectSchema | ChapterGenerationJobSchema,
+)
+async def generate_chapter(
+    project_id: str,
+    request: GenerateChapterRequest,
+    response: Response,
+    session: AsyncSession = Depends(get_session),
+    current_user: UserInDB = Depends(get_current_user),
+    vector_store: VectorStoreService | None = Depends(get_vector_store),
+) -> NovelProjectSchema | ChapterGenerationJobSchema:
+    """生成章节（事件驱动模式）.
+
+    逻辑：
+    1. 获取当前正在进行的事件
+    2. 根据事件的进度和关键点生成章节
+    3. 更新事件进度
+    4. 如果事件完成，自动切换到下一个事件
+
+    run_async 为 true 时，准备好提示词后即提交后台任务并返回 202 与任务信息，
+    各版本完成后逐个写入，可通过任务状态接口轮询进度。
+    """
+    plan = await _prepare_chapter_generation(
+        project_id, request, session, current_user, vector_store
+    )
+    if request.run_async:
+        job = await GenerationJobService(session).create(
+            project_id, current_user.id, request.chapter_number, plan.version_count
+        )
+        task = asyncio.create_task(
+            run_with_lease(
+                job.id, _run_generation_job(job.id, project_id, plan, current_user.id)
+            )
+        )
+        _generation_job_tasks.add(task)
+        task.add_done_callback(_generation_job_tasks.discard)
+        logger.info(
+            "项目 %s 第 %s 章已提交后台生成任务 %s",
+            project_id,
+            request.chapter_number,
+            job.id,
+        )
+        response.status_code = 202
+        return GenerationJobService.to_schema(job, plan.chapter.status)
+
+    novel_service = NovelService(session)
+    raw_versions = await _generate_versions(
+        plan, project_id, LLMService(session), current_user.id
+    )
+    await _persist_chapter_versions(
+        novel_service, project_id, plan.chapter, plan.current_event, raw_versions
+    )
     return await _load_project_schema(novel_service, project_id, current_user.id)
 
 
+@router.get(
+    "/novels/{project_id}/chapters/jobs/{job_id}",
+    response_model=ChapterGenerationJobSchema,
+)
+async def get_generation_job(
+    project_id: str,
+    job_id: str,
+    session: AsyncSession = Depends(get_session),
+    current_user: UserInDB = Depends(get_current_user),
+) -> ChapterGenerationJobSchema:
+    """查询后台章节生成任务的进度，只读取任务与章节状态。."""
+    job = await GenerationJobService(session).get_status(
+        project_id, job_id, current_user.id
+    )
+    if job is None:
+        raise HTTPException(status_code=404, detail="生成任务不存在")
+    return job
+
+
+def _summary_backfill_schema(job: TaskJob) -> SummaryBackfillJob:
+    return SummaryBackfillJob(
+        job_id=job.id,
+        status=job.status,
+        progress=job.progress,
+        error=job.last_error,
+        created_at=job.created_at.isoformat() if job.created_at else None,
+        finished_at=job.finished_at.isoformat() if job.finished_at else None,
+    )
+
+
+@router.post(
+    "/novels/{project_id}/summaries/backfill",
+    response_model=SummaryBackfillJob,
+    status_code=202,
+)
+async def start_summary_backfill(
+    project_id: str,
+    session: AsyncSession = Depends(get_session),
+    current_user: UserInDB = Depends(get_current_user),
+) -> SummaryBackfillJob:
+    """提交整个项目的章节摘要补齐任务，已有待执行的任务时直接返回该任务。."""
+    await NovelService(session).ensure_project_owner(project_id, current_user.id)
+    job = await enqueue_summary_backfill(session, project_id, current_user.id)
+    await session.refresh(job)
+    logger.info("用户 %s 提交项目 %s 的摘要补齐任务 %s", current_user.id, project_id, job.id)
+    return _summary_backfill_schema(job)
+
+
+@router.get(
+    "/novels/{project_id}/summaries/backfill", response_model=SummaryBackfillJob
+)
+async def get_summary_backfill(
+    project_id: str,
+    session: AsyncSession = Depends(get_session),
+    current_user: UserInDB = Depends(get_current_user),
+) -> SummaryBackfillJob:
+    """查询项目最近一次摘要补齐任务的进度。."""
+    await NovelService(session).ensure_project_owner(project_id, current_user.id)
+    job = await TaskQueueService(session).latest_job(
+        SUMMARY_BACKFILL, summary_backfill_dedup_key(project_id)
+    )
+    if job is None:
+        raise HTTPException(status_code=404, detail="暂无摘要补齐任务")
+    return _summary_backfill_schema(job)
+
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _reset_interrupted_chapter(chapter_id: int) -> None:
+    """流式生成未写入结果就结束时，恢复章节的生成中状态。."""
+    try:
+        async with AsyncSessionLocal() as session:
+            await NovelService(session).reset_interrupted_chapter(chapter_id)
+    except Exception as exc:
+        logger.exception("恢复章节 %s 的生成状态失败: %s", chapter_id, exc)
+
+
+@router.post("/novels/{project_id}/chapters/generate/stream")
+async def generate_chapter_stream(
+    project_id: str,
+    request: GenerateChapterRequest,
+    session: AsyncSession = Depends(get_session),
+    current_user: UserInDB = Depends(get_current_user),
+    vector_store: VectorStoreService | None = Depends(get_vector_store),
+) -> StreamingResponse:
+    """生成章节（SSE 流式），边生成边推送各版本的正文增量.
+
+    事件类型：
+    - start: 开始生成 {"chapter_number": 1, "version_count": 3}
+    - delta: full_content 的正文增量（已解码）{"version": 0, "content": "..."}
+    - version_done: 单个版本结束 {"version": 0, "status": "success"}
+    - done: 全部版本已写入 {"chapter_number": 1, "version_count": 3}
+    - error: 生成失败 {"error": "..."}
+
+    准备阶段（权限、事件、提示词）在开始推送前完成，出错时仍返回普通的 HTTP 错误。
+    """
+    plan = await _prepare_chapter_generation(
+        project_id, request, session, current_user, vector_store
+    )
+    chapter_number = plan.chapter.chapter_number
+    chapter_id = plan.chapter.id
+    event_id = plan.current_event.id
+    user_id = current_user.id
+    conversation = [{"role": "user", "content": plan.prompt_input}]
+
+    async def _stream_version(idx: int, queue: asyncio.Queue) -> None:
+        # 边接收边解码 full_content，只把正文推给前端，不推送 JSON 结构与思考过程
+        extractor = StreamingJSONFieldExtractor(("full_content",))
+        try:
+            # 每个版本使用独立会话，避免并发共用请求级会话
+            async with AsyncSessionLocal() as local_session:
+                local_llm_service = LLMService(local_session)
+                async for delta in local_llm_service.stream_llm_response(
+                    system_prompt=plan.writer_prompt,
+                    conversation_history=conversation,
+                    temperature=0.7,
+                    user_id=user_id,
+                    timeout=600.0,
+                ):
+                    prose = extractor.feed(delta).get("full_content")
+                    if prose:
+                        await queue.put(("delta", idx, prose))
+            prose = extractor.finish().get("full_content")
+            if prose:
+                await queue.put(("delta", idx, prose))
+            result = _parse_version_response(
+                project_id, chapter_number, idx, extractor.text
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.exception(
+                "项目 %s 流式生成第 %s 章第 %s 个版本时发生异常: %s",
+                project_id,
+                chapter_number,
+                idx + 1,
+                exc,
+            )
+            result = _failed_version(exc)
+        await queue.put(("version_done", idx, result))
+
+    async def event_generator():
+        queue: asyncio.Queue = asyncio.Queue()
+        tasks = [
+            asyncio.create_task(_stream_version(idx, queue))
+            for idx in range(plan.version_count)
+        ]
+        results: dict[int, dict] = {}
+        persisted = False
+        try:
+            yield _sse_event(
+                "start",
+                {"chapter_number": chapter_number, "version_count": len(tasks)},
+            )
+            while len(results) < len(tasks):
+                try:
+                    kind, idx, payload = await asyncio.wait_for(
+                        queue.get(), timeout=15.0
+                    )
+                except TimeoutError:
+                    # 注释行保持连接，防止代理因长时间无数据断开
+                    yield ": keep-alive\n\n"
+                    continue
+                if kind == "delta":
+                    yield _sse_event("delta", {"version": idx, "content": payload})
+                else:
+                    results[idx] = payload
+                    yield _sse_event(
+                        "version_done",
+                        {"version": idx, "status": payload.get("status")},
+                    )
+
+            # 请求级会话的生命周期与流式响应无关，写入时新建会话并按 ID 重取
+            async with AsyncSessionLocal() as persist_session:
+                chapter = await persist_session.get(Chapter, chapter_id)
+                current_event = await persist_session.get(PlotEvent, event_id)
+                if chapter is None or current_event is None:
+                    raise ValueError("章节或事件已被删除，无法写入生成结果")
+                await _persist_chapter_versions(
+                    NovelService(persist_session),
+                    project_id,
+                    chapter,
+                    current_event,
+                    [results[idx] for idx in range(len(tasks))],
+                )
+            persisted = True
+            yield _sse_event(
+                "done",
+                {"chapter_number": chapter_number, "version_count": len(tasks)},
+            )
+        except Exception as exc:
+            logger.exception(
+                "项目 %s 第 %s 章流式生成失败: %s", project_id, chapter_number, exc
+            )
+            yield _sse_event("error", {"error": str(exc)})
+        finally:
+            # 客户端断开时取消仍在生成的版本，不再占用模型额度
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            if not persisted:
+                # 生成器可能已被取消，无法再等待数据库操作，交给独立任务恢复章节状态
+                reset_task = asyncio.create_task(_reset_interrupted_chapter(chapter_id))
+                _generation_job_tasks.add(reset_task)
+                reset_task.add_done_callback(_generation_job_tasks.discard)
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
 async def _resolve_version_count(session: AsyncSession) -> int:
     repo = SystemConfigRepository(session)
     record = await repo.get_by_key("writer.chapter_versions")
@@ -458,18 +897,14 @@ async def _resolve_version_count(session: AsyncSession) -> int:
 async def select_chapter_version(
     project_id: str,
     request: SelectVersionRequest,
-    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session),
     current_user: UserInDB = Depends(get_current_user),
 ) -> NovelProjectSchema:
     novel_service = NovelService(session)
     llm_service = LLMService(session)
 
-    project = await novel_service.ensure_project_owner(project_id, current_user.id)
-    chapter = next(
-        (ch for ch in project.chapters if ch.chapter_number == request.chapter_number),
-        None,
-    )
+    await novel_service.ensure_project_owner(project_id, current_user.id)
+    chapter = await novel_service.get_chapter(project_id, request.chapter_number)
     if not chapter:
         logger.warning(
             "项目 %s 未找到第 %s 章，无法选择版本", project_id, request.chapter_number
@@ -494,79 +929,15 @@ async def select_chapter_version(
             timeout=180.0,
         )
         chapter.real_summary = remove_think_tags(summary)
-        await session.commit()
+        await novel_service.touch_project(project_id)
 
+        if settings.summary_tree_enabled:
+            await enqueue_summary_tree_refresh(
+                session, project_id, chapter.chapter_number, current_user.id
+            )
         if settings.vector_store_enabled:
-            # 后台任务内新建会话与服务，避免复用请求态资源
-            async def ingest_chapter_background_task(
-                project_id_: str, chapter_number_: int, user_id_: int
-            ):
-                try:
-                    async with AsyncSessionLocal() as bg_session:
-                        bg_llm_service = LLMService(bg_session)
-                        try:
-                            vector_store_local = VectorStoreService()
-                        except RuntimeError as exc:
-                            logger.warning("向量库初始化失败，跳过章节入库: %s", exc)
-                            return
-                        novel_service_local = NovelService(bg_session)
-                        project_local = await novel_service_local.get_project(
-                            project_id_
-                        )
-                        outline_local = next(
-                            (
-                                item
-                                for item in project_local.outlines
-                                if item.chapter_number == chapter_number_
-                            ),
-                            None,
-                        )
-                        chapter_title_local = (
-                            outline_local.title
-                            if outline_local and outline_local.title
-                            else f"第{chapter_number_}章"
-                        )
-                        stmt = select(Chapter).where(
-                            Chapter.project_id == project_id_,
-                            Chapter.chapter_number == chapter_number_,
-                        )
-                        result = await bg_session.execute(stmt)
-                        chapter_local = result.scalars().first()
-                        if (
-                            not chapter_local
-                            or not chapter_local.selected_version
-                            or not chapter_local.selected_version.content
-                        ):
-                            return
-                        ingestion_service = ChapterIngestionService(
-                            llm_service=bg_llm_service, vector_store=vector_store_local
-                        )
-                        await ingestion_service.ingest_chapter(
-                            project_id=project_id_,
-                            chapter_number=chapter_number_,
-                            title=chapter_title_local,
-                            content=chapter_local.selected_version.content,
-                            summary=chapter_local.real_summary,
-                            user_id=user_id_,
-                        )
-                        logger.info(
-                            "项目 %s 第 %s 章已同步至向量库",
-                            project_id_,
-                            chapter_number_,
-                        )
-                except Exception as exc:
-                    logger.exception(
-                        "项目 %s 第 %s 章向量入库失败: %s",
-                        project_id_,
-                        chapter_number_,
-                        exc,
-                    )
-
-            background_tasks.add_task(
-                ingest_chapter_background_task,
-                project_id,
-                chapter.chapter_number,
-                current_user.id,
+            await enqueue_chapter_ingest(
+                session, project_id, chapter.chapter_number, current_user.id
             )
 
     return await _load_project_schema(novel_service, project_id, current_user.id)
@@ -585,11 +956,8 @@ async def evaluate_chapter(
     prompt_service = PromptService(session)
     llm_service = LLMService(session)
 
-    project = await novel_service.ensure_project_owner(project_id, current_user.id)
-    chapter = next(
-        (ch for ch in project.chapters if ch.chapter_number == request.chapter_number),
-        None,
-    )
+    await novel_service.ensure_project_owner(project_id, current_user.id)
+    chapter = await novel_service.get_chapter(project_id, request.chapter_number)
     if not chapter:
         logger.warning(
             "项目 %s 未找到第 %s 章，无法执行评估", project_id, request.chapter_number
@@ -613,8 +981,7 @@ async def evaluate_chapter(
             detail="缺少评估提示词，请联系管理员配置 'evaluation' 提示词",
         )
 
-    project_schema = await novel_service._serialize_project(project)
-    blueprint_dict = project_schema.blueprint.model_dump()
+    blueprint_dict = await BlueprintSnapshotService(session).get(project_id)
 
     versions_to_evaluate = [
         {"version_id": idx + 1, "content": version.content}
@@ -654,7 +1021,6 @@ async def evaluate_chapter(
 async def delete_chapters(
     project_id: str,
     request: DeleteChapterRequest,
-    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session),
     current_user: UserInDB = Depends(get_current_user),
 ) -> NovelProjectSchema:
@@ -662,7 +1028,6 @@ async def delete_chapters(
         logger.warning("项目 %s 删除章节时未提供章节号", project_id)
         raise HTTPException(status_code=400, detail="请提供要删除的章节号列表")
     novel_service = NovelService(session)
-    LLMService(session)
     await novel_service.ensure_project_owner(project_id, current_user.id)
     logger.info(
         "用户 %s 删除项目 %s 的章节 %s",
@@ -673,27 +1038,8 @@ async def delete_chapters(
     await novel_service.delete_chapters(project_id, request.chapter_numbers)
 
     if settings.vector_store_enabled:
-
-        async def delete_vectors_background_task(
-            project_id_: str, chapter_numbers_: list[int]
-        ):
-            try:
-                try:
-                    vector_store_local = VectorStoreService()
-                except RuntimeError as exc:
-                    logger.warning("向量库初始化失败，跳过删除: %s", exc)
-                    return
-                await vector_store_local.delete_by_chapters(
-                    project_id_, chapter_numbers_
-                )
-                logger.info(
-                    "项目 %s 已从向量库移除章节 %s", project_id_, chapter_numbers_
-                )
-            except Exception as exc:
-                logger.exception("项目 %s 向量删除失败: %s", project_id_, exc)
-
-        background_tasks.add_task(
-            delete_vectors_background_task, project_id, request.chapter_numbers
+        await enqueue_chapter_vector_delete(
+            session, project_id, request.chapter_numbers
         )
 
     return await novel_service.get_project_schema(project_id, current_user.id)
@@ -703,18 +1049,14 @@ async def delete_chapters(
 async def edit_chapter(
     project_id: str,
     request: EditChapterRequest,
-    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session),
     current_user: UserInDB = Depends(get_current_user),
 ) -> NovelProjectSchema:
     novel_service = NovelService(session)
     llm_service = LLMService(session)
 
-    project = await novel_service.ensure_project_owner(project_id, current_user.id)
-    chapter = next(
-        (ch for ch in project.chapters if ch.chapter_number == request.chapter_number),
-        None,
-    )
+    await novel_service.ensure_project_owner(project_id, current_user.id)
+    chapter = await novel_service.get_chapter(project_id, request.chapter_number)
     if not chapter or chapter.selected_version is None:
         logger.warning(
             "项目 %s 第 %s 章尚未生成或未选择版本，无法编辑",
@@ -740,82 +1082,20 @@ async def edit_chapter(
             timeout=180.0,
         )
         chapter.real_summary = remove_think_tags(summary)
-    await session.commit()
+    await novel_service.touch_project(project_id)
+
+    if settings.summary_tree_enabled and request.content.strip():
+        await enqueue_summary_tree_refresh(
+            session, project_id, chapter.chapter_number, current_user.id
+        )
 
     if (
         settings.vector_store_enabled
         and chapter.selected_version
         and chapter.selected_version.content
     ):
-        # 后台任务内新建会话与服务，避免复用请求态资源
-        async def reingest_chapter_background_task(
-            project_id_: str, chapter_number_: int, user_id_: int
-        ):
-            try:
-                async with AsyncSessionLocal() as bg_session:
-                    bg_llm_service = LLMService(bg_session)
-                    try:
-                        vector_store_local = VectorStoreService()
-                    except RuntimeError as exc:
-                        logger.warning("向量库初始化失败，跳过章节重建: %s", exc)
-                        return
-                    # 取最新章节与标题
-                    novel_service_local = NovelService(bg_session)
-                    project_local = await novel_service_local.get_project(project_id_)
-                    outline_local = next(
-                        (
-                            item
-                            for item in project_local.outlines
-                            if item.chapter_number == chapter_number_
-                        ),
-                        None,
-                    )
-                    chapter_title_local = (
-                        outline_local.title
-                        if outline_local and outline_local.title
-                        else f"第{chapter_number_}章"
-                    )
-                    stmt = select(Chapter).where(
-                        Chapter.project_id == project_id_,
-                        Chapter.chapter_number == chapter_number_,
-                    )
-                    result = await bg_session.execute(stmt)
-                    chapter_local = result.scalars().first()
-                    if (
-                        not chapter_local
-                        or not chapter_local.selected_version
-                        or not chapter_local.selected_version.content
-                    ):
-                        return
-                    ingestion_service = ChapterIngestionService(
-                        llm_service=bg_llm_service, vector_store=vector_store_local
-                    )
-                    await ingestion_service.ingest_chapter(
-                        project_id=project_id_,
-                        chapter_number=chapter_number_,
-                        title=chapter_title_local,
-                        content=chapter_local.selected_version.content,
-                        summary=chapter_local.real_summary,
-                        user_id=user_id_,
-                    )
-                    logger.info(
-                        "项目 %s 第 %s 章更新内容已同步至向量库",
-                        project_id_,
-                        chapter_number_,
-                    )
-            except Exception as exc:
-                logger.exception(
-                    "项目 %s 第 %s 章向量更新失败: %s",
-                    project_id_,
-                    chapter_number_,
-                    exc,
-                )
-
-        background_tasks.add_task(
-            reingest_chapter_background_task,
-            project_id,
-            chapter.chapter_number,
-            current_user.id,
+        await enqueue_chapter_ingest(
+            session, project_id, chapter.chapter_number, current_user.id
         )
 
     return await novel_service.get_project_schema(project_id, current_user.id)
@@ -955,24 +1235,24 @@ async def generate_next_volume(
     novel_service = NovelService(session)
     rolling_service = RollingOutlineService(session)
 
-    project = await novel_service.ensure_project_owner(project_id, current_user.id)
+    await novel_service.ensure_project_owner(project_id, current_user.id)
     logger.info("用户 %s 为项目 %s 生成下一卷大纲", current_user.id, project_id)
 
     try:
         # 构建故事上下文
-        blueprint = await novel_service._build_blueprint_schema(project)
+        blueprint = await BlueprintSnapshotService(session).get(project_id)
         story_context = {
-            "title": blueprint.title,
-            "genre": blueprint.genre,
-            "tone": blueprint.tone,
-            "world_setting": blueprint.world_setting,
+            "title": blueprint.get("title", ""),
+            "genre": blueprint.get("genre", ""),
+            "tone": blueprint.get("tone", ""),
+            "world_setting": blueprint.get("world_setting", {}),
             "characters": [
                 {
                     "name": char.get("name"),
                     "identity": char.get("identity"),
                     "personality": char.get("personality"),
                 }
-                for char in blueprint.characters[:5]  # 只传主要角色
+                for char in blueprint.get("characters", [])[:5]  # 只传主要角色
             ],
         }
 
@@ -1001,7 +1281,7 @@ async def generate_next_volume(
             status="draft",
         )
         session.add(volume)
-        await session.commit()
+        await novel_service.touch_project(project_id)
         await session.refresh(volume)
 
         logger.info(
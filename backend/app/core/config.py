@@ -99,6 +99,24 @@ class Settings(BaseSettings):
         env="LLM_COMPLETION_MAX_TOKENS",
         description="聊天补全的最大输出 token 数；未配置时不传递该参数，由提供商默认处理",
     )
+    llm_http_max_connections: int = Field(
+        default=100,
+        ge=1,
+        env="LLM_HTTP_MAX_CONNECTIONS",
+        description="每个 LLM/嵌入客户端连接池的最大连接数",
+    )
+    llm_http_max_keepalive_connections: int = Field(
+        default=20,
+        ge=0,
+        env="LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS",
+        description="每个 LLM/嵌入客户端连接池保留的空闲长连接数",
+    )
+    llm_http_keepalive_expiry: float = Field(
+        default=60.0,
+        ge=0.0,
+        env="LLM_HTTP_KEEPALIVE_EXPIRY",
+        description="空闲长连接的保活时间，单位秒",
+    )
     writer_chapter_versions: int = Field(
         default=2,
         ge=1,
@@ -108,6 +126,87 @@ class Settings(BaseSettings):
         ),
         description="每次生成章节的候选版本数量",
     )
+    llm_multi_choice_enabled: bool = Field(
+        default=False,
+        env="LLM_MULTI_CHOICE_ENABLED",
+        description="生成多个章节版本时，是否在一次请求中通过 n 参数获取全部候选（每个候选仍计一次每日配额）",
+    )
+    writer_context_token_budget: int = Field(
+        default=24000,
+        ge=0,
+        env="WRITER_CONTEXT_TOKEN_BUDGET",
+        description="章节写作提示词上下文的 token 预算，0 表示不限制",
+    )
+    summary_tree_enabled: bool = Field(
+        default=True,
+        env="SUMMARY_TREE_ENABLED",
+        description="是否维护事件/情节线/分卷的分层滚动摘要并用于章节写作",
+    )
+    summary_tree_recent_chapters: int = Field(
+        default=5,
+        ge=0,
+        env="SUMMARY_TREE_RECENT_CHAPTERS",
+        description="写作时保留逐章摘要的最近章节数，更早章节使用分层摘要",
+    )
+    summary_backfill_concurrency: int = Field(
+        default=3,
+        ge=1,
+        env="SUMMARY_BACKFILL_CONCURRENCY",
+        description="批量补齐章节摘要时，单个项目同时进行的摘要请求数",
+    )
+    summary_backfill_reserved_requests: int = Field(
+        default=10,
+        ge=0,
+        env="SUMMARY_BACKFILL_RESERVED_REQUESTS",
+        description="批量补齐摘要时为用户保留的每日请求次数，避免耗尽写作额度",
+    )
+    task_worker_enabled: bool = Field(
+        default=True,
+        env="TASK_WORKER_ENABLED",
+        description="是否在 Web 进程内运行后台任务 worker；单独部署 worker 时设为 false",
+    )
+    task_worker_poll_interval: float = Field(
+        default=2.0,
+        gt=0.0,
+        env="TASK_WORKER_POLL_INTERVAL",
+        description="后台任务 worker 轮询待执行任务的间隔（秒）",
+    )
+    task_max_attempts: int = Field(
+        default=3,
+        ge=1,
+        env="TASK_MAX_ATTEMPTS",
+        description="后台任务的最大尝试次数（含首次执行）",
+    )
+    task_lease_seconds: float = Field(
+        default=60.0,
+        ge=5.0,
+        env="TASK_LEASE_SECONDS",
+        description="执行中任务的租约时长（秒），执行进程定期续租，过期未续租视为进程已退出",
+    )
+    task_retry_base_delay: float = Field(
+        default=10.0,
+        ge=0.0,
+        env="TASK_RETRY_BASE_DELAY",
+        description="后台任务失败后的首次重试延迟（秒），之后按指数退避",
+    )
+    task_summary_concurrency: int = Field(
+        default=2,
+        ge=1,
+        env="TASK_SUMMARY_CONCURRENCY",
+        description="章节摘要生成任务的并发数",
+    )
+    task_vector_concurrency: int = Field(
+        default=1,
+        ge=1,
+        env="TASK_VECTOR_CONCURRENCY",
+        description="向量入库与删除任务的并发数",
+    )
+    section_cache_max_entries: int = Field(
+        default=256,
+        ge=0,
+        env="SECTION_CACHE_MAX_ENTRIES",
+        description="项目区段响应序列化结果的缓存条目数，按项目修订号失效，0 表示关闭缓存",
+    )
     embedding_provider: str = Field(
         default="openai",
         env="EMBEDDING_PROVIDER",
@@ -134,6 +233,45 @@ class Settings(BaseSettings):
         env="EMBEDDING_MODEL_VECTOR_SIZE",
         description="嵌入向量维度，未配置时将自动检测",
     )
+    embedding_batch_size: int = Field(
+        default=32,
+        ge=1,
+        env="EMBEDDING_BATCH_SIZE",
+        description="批量嵌入时单次请求包含的文本条数",
+    )
+    embedding_batch_concurrency: int = Field(
+        default=2,
+        ge=1,
+        env="EMBEDDING_BATCH_CONCURRENCY",
+        description="批量嵌入时允许并发执行的请求数",
+    )
+    embedding_cache_enabled: bool = Field(
+        default=True,
+        env="EMBEDDING_CACHE_ENABLED",
+        description="是否启用嵌入向量缓存（按模型、维度与文本哈希寻址）",
+    )
+    embedding_cache_memory_items: int = Field(
+        default=4096,
+        ge=0,
+        env="EMBEDDING_CACHE_MEMORY_ITEMS",
+        description="嵌入缓存内存 LRU 层的最大条目数",
+    )
+    embedding_cache_persistent: bool = Field(
+        default=True,
+        env="EMBEDDING_CACHE_PERSISTENT",
+        description="是否启用嵌入缓存的 SQLite 持久层",
+    )
+    embedding_cache_path: str | None = Field(
+        default=None,
+        env="EMBEDDING_CACHE_PATH",
+        description="嵌入缓存持久层文件路径，默认 storage/embedding_cache.db",
+    )
+    embedding_cache_max_rows: int = Field(
+        default=200_000,
+        ge=0,
+        env="EMBEDDING_CACHE_MAX_ROWS",
+        description="嵌入缓存持久层的最大行数，超出后按最近使用时间淘汰；0 表示不限制",
+    )
     ollama_embedding_base_url: AnyUrl | None = Field(
         default=None,
         env="OLLAMA_EMBEDDING_BASE_URL",
@@ -147,7 +285,7 @@ class Settings(BaseSettings):
     vector_db_url: str | None = Field(
         default=None,
         env="VECTOR_DB_URL",
-        description="向量库连接地址：libsql 使用 file:/https://，Qdrant 使用 http(s)://host:6333",
+        description="向量库连接地址：libsql 使用 file:/https://，Qdrant 使用 http(s)://host:6333，local 使用 local:目录",
     )
     vector_db_auth_token: str | None = Field(
         default=None,
@@ -157,13 +295,55 @@ class Settings(BaseSettings):
     vector_db_provider: str = Field(
         default="libsql",
         env="VECTOR_DB_PROVIDER",
-        description="向量库提供方：libsql 或 qdrant",
+        description="向量库提供方：libsql、qdrant 或 local（本地内存映射索引）",
     )
     qdrant_collection_prefix: str = Field(
         default="arboris",
         env="QDRANT_COLLECTION_PREFIX",
         description="Qdrant 集合名前缀，默认 arboris（将派生 *_chunks 与 *_summaries）",
     )
+    qdrant_prefer_grpc: bool = Field(
+        default=False,
+        env="QDRANT_PREFER_GRPC",
+        description="Qdrant 是否优先使用 gRPC 传输（需开放 gRPC 端口）",
+    )
+    qdrant_grpc_port: int = Field(
+        default=6334,
+        ge=1,
+        env="QDRANT_GRPC_PORT",
+        description="Qdrant gRPC 端口",
+    )
+    qdrant_timeout: int = Field(
+        default=10,
+        ge=1,
+        env="QDRANT_TIMEOUT",
+        description="Qdrant 单次请求超时时间（秒）",
+    )
+    vector_local_segment_rows: int = Field(
+        default=4096,
+        ge=64,
+        env="VECTOR_LOCAL_SEGMENT_ROWS",
+        description="本地向量索引单个段文件的最大行数",
+    )
+    vector_local_compact_ratio: float = Field(
+        default=0.3,
+        gt=0.0,
+        le=1.0,
+        env="VECTOR_LOCAL_COMPACT_RATIO",
+        description="本地向量索引失效行占比超过该值时触发压缩",
+    )
+    vector_local_ivf_min_rows: int = Field(
+        default=20000,
+        ge=0,
+        env="VECTOR_LOCAL_IVF_MIN_ROWS",
+        description="单个项目向量数达到该值时启用 IVF 检索，0 表示始终暴力检索",
+    )
+    vector_local_ivf_nprobe: int = Field(
+        default=8,
+        ge=1,
+        env="VECTOR_LOCAL_IVF_NPROBE",
+        description="IVF 检索时探测的聚类数量",
+    )
     vector_top_k_chunks: int = Field(
         default=5,
         ge=0,
@@ -188,12 +368,47 @@ class Settings(BaseSettings):
         env="VECTOR_CHUNK_OVERLAP",
         description="章节分块重叠字数",
     )
+    vector_upsert_batch_size: int = Field(
+        default=64,
+        ge=1,
+        env="VECTOR_UPSERT_BATCH_SIZE",
+        description="libsql 批量写入时单条 INSERT 语句包含的最大行数",
+    )
     rag_duplicate_similarity_threshold: float = Field(
         default=0.9,
         ge=0.0,
         le=1.0,
         env="RAG_DUPLICATE_SIMILARITY_THRESHOLD",
-        description="RAG 重复片段判定的相似度阈值（Jaccard 基于 3-gram）",
+        description="RAG 重复片段判定的相似度阈值（MinHash 估计的 3-gram Jaccard）",
+    )
+    rag_dedupe_chunks: bool = Field(
+        default=True,
+        env="RAG_DEDUPE_CHUNKS",
+        description="是否在拼接提示词前剔除近重复的剧情片段（MinHash/LSH）",
+    )
+    rag_embedding_timeout: float = Field(
+        default=15.0,
+        gt=0.0,
+        env="RAG_EMBEDDING_TIMEOUT",
+        description="RAG 检索时生成查询向量的超时时间（秒），超时则跳过检索",
+    )
+    rag_search_timeout: float = Field(
+        default=5.0,
+        gt=0.0,
+        env="RAG_SEARCH_TIMEOUT",
+        description="RAG 向量检索单个阶段的超时时间（秒），超时返回空结果",
+    )
+    rag_retrieval_cache_ttl: float = Field(
+        default=600.0,
+        ge=0.0,
+        env="RAG_RETRIEVAL_CACHE_TTL",
+        description="RAG 检索结果缓存有效期（秒），0 表示关闭缓存",
+    )
+    rag_retrieval_cache_max_entries: int = Field(
+        default=256,
+        ge=0,
+        env="RAG_RETRIEVAL_CACHE_MAX_ENTRIES",
+        description="RAG 检索结果缓存的最大条目数，0 表示关闭缓存",
     )
 
     # -------------------- Linux.do OAuth 配置 --------------------
@@ -262,8 +477,8 @@ class Settings(BaseSettings):
     @classmethod
     def _normalize_vector_provider(cls, value: str | None) -> str:
         candidate = (value or "libsql").strip().lower()
-        if candidate not in {"libsql", "qdrant"}:
-            raise ValueError("VECTOR_DB_PROVIDER 仅支持 libsql 或 qdrant")
+        if candidate not in {"libsql", "qdrant", "local"}:
+            raise ValueError("VECTOR_DB_PROVIDER 仅支持 libsql、qdrant 或 local")
         return candidate
 
     @field_validator("embedding_provider", mode="before")
@@ -10,7 +10,13 @@ from .api.routers import api_router
 from .core.config import settings
 from .db.init_db import init_db
 from .db.session import AsyncSessionLocal
+from .services import task_handlers  # noqa: F401 - 注册后台任务处理函数
+from .services.embedding_cache import embedding_cache
+from .services.generation_job_service import GenerationJobService
 from .services.prompt_service import PromptService
+from .services.task_queue import task_worker
+from .services.vector_store_service import close_vector_store, init_vector_store
+from .utils.llm_tool import llm_client_registry
 
 dictConfig(
     {
@@ -73,11 +79,22 @@ async def lifespan(app: FastAPI):
     async with AsyncSessionLocal() as session:
         prompt_service = PromptService(session)
         await prompt_service.preload()
+        # 后台生成任务在进程内执行，执行进程退出后（租约过期）的任务已无法继续
+        await GenerationJobService(session).fail_expired()
+    # 创建进程级共享的向量库实例并预热连接
+    await init_vector_store()
+    # 后台任务 worker 可在 Web 进程内运行，也可通过 app.worker 单独部署
+    if settings.task_worker_enabled:
+        await task_worker.start()
 
     yield
 
-    # 应用关闭时的清理工作
-    # TODO: 添加必要的清理逻辑
+    # 应用关闭时的清理工作：停止任务 worker，释放 LLM/嵌入客户端的长连接池、
+    # 向量库与嵌入缓存
+    await task_worker.stop()
+    await llm_client_registry.aclose()
+    await close_vector_store()
+    await embedding_cache.aclose()
 
 
 app = FastAPI(
@@ -7,17 +7,20 @@ from .novel import (
     BlueprintRelationship,
     Chapter,
     ChapterEvaluation,
+    ChapterGenerationJob,
     ChapterVersion,
     NovelBlueprint,
     NovelConversation,
     NovelProject,
     PlotEvent,
     StoryFramework,
+    StorySummary,
     VolumeOutline,
 )
 from .prompt import Prompt
 from .rag_metrics import RAGRetrievalLog
 from .system_config import SystemConfig
+from .task_job import TaskJob
 from .update_log import UpdateLog
 from .usage_metric import UsageMetric
 from .user import User
@@ -33,9 +36,11 @@ __all__ = [
     "Chapter",
     "ChapterVersion",
     "ChapterEvaluation",
+    "ChapterGenerationJob",
     "NovelProject",
     "PlotEvent",
     "StoryFramework",
+    "StorySummary",
     "VolumeOutline",
     "Prompt",
     "UpdateLog",
@@ -44,4 +49,5 @@ __all__ = [
     "User",
     "UserDailyRequest",
     "SystemConfig",
+    "TaskJob",
 ]
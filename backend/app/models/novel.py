@@ -10,12 +10,15 @@ from sqlalchemy import (
     Enum,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
+    UniqueConstraint,
     func,
 )
 from sqlalchemy.dialects.mysql import LONGTEXT
+from sqlalchemy.dialects.sqlite import DATETIME as SQLITE_DATETIME
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..db.base import Base
@@ -23,6 +26,17 @@ from ..db.base import Base
 # 自定义列类型：兼容跨数据库环境
 BIGINT_PK_TYPE = BigInteger().with_variant(Integer, "sqlite")
 LONG_TEXT_TYPE = Text().with_variant(LONGTEXT, "mysql")
+# SQLite 以字符串比较时间，统一按秒精度存储，与 CURRENT_TIMESTAMP 默认值格式一致
+SECOND_DATETIME_TYPE = DateTime(timezone=True).with_variant(
+    SQLITE_DATETIME(
+        timezone=True,
+        storage_format=(
+            "%(year)04d-%(month)02d-%(day)02d "
+            "%(hour)02d:%(minute)02d:%(second)02d"
+        ),
+    ),
+    "sqlite",
+)
 
 
 class _MetadataAccessor:
@@ -41,6 +55,11 @@ class NovelProject(Base):
     """小说项目主表，仅存放轻量级元数据。."""
 
     __tablename__ = "novel_projects"
+    __table_args__ = (
+        # 项目列表按 updated_at 键集分页，用户列表带 user_id 过滤
+        Index("ix_novel_projects_user_updated", "user_id", "updated_at", "id"),
+        Index("ix_novel_projects_updated", "updated_at", "id"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     user_id: Mapped[int] = mapped_column(
@@ -51,11 +70,19 @@ class NovelProject(Base):
     status: Mapped[str] = mapped_column(String(32), default="draft")
     metadata_: Mapped[dict | None] = mapped_column("metadata", JSON)
     metadata = _MetadataAccessor()
+    # 项目修订号：项目内容任何变更时递增，用作条件请求的 ETag 与序列化缓存的键
+    revision: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    # 向量入库代次：章节向量写入或删除时递增，各进程的检索缓存据此失效
+    vector_generation: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+        SECOND_DATETIME_TYPE, server_default=func.now(), onupdate=func.now()
     )
 
     owner: Mapped[User] = relationship("User", back_populates="novel_projects")
@@ -97,6 +124,13 @@ class NovelProject(Base):
         cascade="all, delete-orphan",
         order_by="PlotEvent.sequence",
     )
+    # 分层滚动摘要（事件/情节线/分卷）
+    story_summaries: Mapped[list[StorySummary]] = relationship(
+        back_populates="project", cascade="all, delete-orphan"
+    )
+    generation_jobs: Mapped[list[ChapterGenerationJob]] = relationship(
+        back_populates="project", cascade="all, delete-orphan"
+    )
 
 
 class NovelConversation(Base):
@@ -138,6 +172,8 @@ class NovelBlueprint(Base):
     one_sentence_summary: Mapped[str | None] = mapped_column(Text)
     full_synopsis: Mapped[str | None] = mapped_column(LONG_TEXT_TYPE)
     world_setting: Mapped[dict | None] = mapped_column(JSON, default=dict)
+    # 蓝图版本号：整体替换或局部修改时递增，用于蓝图快照缓存失效
+    revision: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -199,7 +235,7 @@ class Chapter(Base):
         BIGINT_PK_TYPE, primary_key=True, autoincrement=True
     )
     project_id: Mapped[str] = mapped_column(
-        ForeignKey("novel_projects.id", ondelete="CASCADE"), nullable=False
+        ForeignKey("novel_projects.id", ondelete="CASCADE"), nullable=False, index=True
     )
     chapter_number: Mapped[int] = mapped_column(Integer, nullable=False)
     real_summary: Mapped[str | None] = mapped_column(Text)
@@ -273,7 +309,8 @@ class ChapterVersion(Base):
     )
     version_label: Mapped[str | None] = mapped_column(String(64))
     provider: Mapped[str | None] = mapped_column(String(64))
-    content: Mapped[str] = mapped_column(LONG_TEXT_TYPE, nullable=False)
+    # 正文体积大，默认延迟加载；需要正文的查询通过 undefer 显式加载
+    content: Mapped[str] = mapped_column(LONG_TEXT_TYPE, nullable=False, deferred=True)
     metadata_: Mapped[dict | None] = mapped_column("metadata", JSON)
     metadata = _MetadataAccessor()
     created_at: Mapped[datetime] = mapped_column(
@@ -305,7 +342,8 @@ class ChapterEvaluation(Base):
         ForeignKey("chapter_versions.id", ondelete="CASCADE")
     )
     decision: Mapped[str | None] = mapped_column(String(32))
-    feedback: Mapped[str | None] = mapped_column(Text)
+    # 评审报告同样延迟加载，只有渲染评审结果的接口才读取
+    feedback: Mapped[str | None] = mapped_column(Text, deferred=True)
     score: Mapped[float | None] = mapped_column(Float)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
@@ -515,3 +553,79 @@ class PlotEvent(Base):
     chapters: Mapped[list[Chapter]] = relationship(
         back_populates="event", cascade="all, delete-orphan"
     )
+
+
+class StorySummary(Base):
+    """分层滚动摘要：按事件、情节线、分卷逐级汇总章节摘要。."""
+
+    __tablename__ = "story_summaries"
+    __table_args__ = (
+        UniqueConstraint("project_id", "scope_key", name="uq_story_summary_scope"),
+    )
+
+    id: Mapped[int] = mapped_column(
+        BIGINT_PK_TYPE, primary_key=True, autoincrement=True
+    )
+    project_id: Mapped[str] = mapped_column(
+        ForeignKey("novel_projects.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    level: Mapped[str] = mapped_column(
+        String(16), nullable=False, comment="摘要层级（event/arc/volume）"
+    )
+    scope_key: Mapped[str] = mapped_column(
+        String(64), nullable=False, comment="层级内的唯一标识，如 event:12"
+    )
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    start_chapter: Mapped[int] = mapped_column(Integer, nullable=False)
+    end_chapter: Mapped[int] = mapped_column(Integer, nullable=False)
+    chapter_numbers: Mapped[list] = mapped_column(
+        JSON, nullable=False, comment="摘要覆盖的章节号"
+    )
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    source_digest: Mapped[str] = mapped_column(
+        String(64), nullable=False, comment="下级摘要的指纹，未变化时跳过重算"
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    project: Mapped[NovelProject] = relationship(back_populates="story_summaries")
+
+
+class ChapterGenerationJob(Base):
+    """后台章节生成任务，记录版本的完成进度供前端轮询。."""
+
+    __tablename__ = "chapter_generation_jobs"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    project_id: Mapped[str] = mapped_column(
+        ForeignKey("novel_projects.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    chapter_number: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[str] = mapped_column(
+        String(16),
+        default="pending",
+        comment="任务状态（pending/running/succeeded/failed）",
+    )
+    version_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    completed_versions: Mapped[int] = mapped_column(
+        Integer, default=0, comment="已写入的版本数（含生成失败的版本）"
+    )
+    failed_versions: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[str | None] = mapped_column(Text)
+    claimed_by: Mapped[str | None] = mapped_column(
+        String(128), comment="执行任务的进程标识"
+    )
+    lease_expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), comment="租约到期时间，执行进程定期续租"
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+
+    project: Mapped[NovelProject] = relationship(back_populates="generation_jobs")
@@ -22,6 +22,9 @@ class RAGRetrievalLog(Base):
         DateTime(timezone=True), server_default=func.now(), index=True
     )
     latency_ms: Mapped[int] = mapped_column(Integer)
+    # 分阶段耗时：查询向量生成与向量检索，历史记录为空
+    embedding_latency_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    search_latency_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
     chunk_count: Mapped[int] = mapped_column(Integer, default=0)
     summary_count: Mapped[int] = mapped_column(Integer, default=0)
     duplicate_ratio: Mapped[float] = mapped_column(Float, default=0.0)
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, Index, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..db.base import Base
+
+
+class TaskJob(Base):
+    """持久化的后台任务（摘要生成、向量入库等），由任务队列 worker 执行。."""
+
+    __tablename__ = "task_jobs"
+    __table_args__ = (
+        Index("ix_task_jobs_kind_status_run_after", "kind", "status", "run_after"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    kind: Mapped[str] = mapped_column(String(64), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    dedup_key: Mapped[str | None] = mapped_column(
+        String(255), index=True, comment="相同类型与去重键的待执行任务只保留一个"
+    )
+    status: Mapped[str] = mapped_column(
+        String(16),
+        default="pending",
+        comment="任务状态（pending/running/succeeded/failed）",
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=3)
+    run_after: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, comment="最早可执行时间，用于退避重试"
+    )
+    last_error: Mapped[str | None] = mapped_column(Text)
+    progress: Mapped[dict | None] = mapped_column(
+        JSON, comment="处理函数上报的进度，如 {total, done, failed}"
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    claimed_by: Mapped[str | None] = mapped_column(
+        String(128), comment="领取任务的进程标识"
+    )
+    lease_expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), comment="租约到期时间，执行进程定期续租"
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
@@ -1,9 +1,16 @@
-from collections.abc import Iterable
+from datetime import UTC, datetime
 
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Row, and_, func, or_, select, update
+from sqlalchemy.orm import selectinload, undefer
 
-from ..models import Chapter, NovelProject
+from ..models import (
+    Chapter,
+    ChapterEvaluation,
+    ChapterVersion,
+    NovelBlueprint,
+    NovelProject,
+    User,
+)
 from .base import BaseRepository
 
 
@@ -11,6 +18,7 @@ class NovelRepository(BaseRepository[NovelProject]):
     model = NovelProject
 
     async def get_by_id(self, project_id: str) -> NovelProject | None:
+        """加载完整的项目对象图，仅用于序列化整个项目。."""
         stmt = (
             select(NovelProject)
             .where(NovelProject.id == project_id)
@@ -19,11 +27,15 @@ class NovelRepository(BaseRepository[NovelProject]):
                 selectinload(NovelProject.characters),
                 selectinload(NovelProject.relationships_),
                 selectinload(NovelProject.conversations),
-                selectinload(NovelProject.chapters).selectinload(Chapter.versions),
-                selectinload(NovelProject.chapters).selectinload(Chapter.evaluations),
-                selectinload(NovelProject.chapters).selectinload(
-                    Chapter.selected_version
-                ),
+                selectinload(NovelProject.chapters)
+                .selectinload(Chapter.versions)
+                .undefer(ChapterVersion.content),
+                selectinload(NovelProject.chapters)
+                .selectinload(Chapter.evaluations)
+                .undefer(ChapterEvaluation.feedback),
+                selectinload(NovelProject.chapters)
+                .selectinload(Chapter.selected_version)
+                .undefer(ChapterVersion.content),
                 selectinload(NovelProject.chapters).selectinload(
                     Chapter.event
                 ),  # 预加载事件关系
@@ -36,44 +48,223 @@ class NovelRepository(BaseRepository[NovelProject]):
         result = await self.session.execute(stmt)
         return result.scalars().first()
 
-    async def list_by_user(self, user_id: int) -> Iterable[NovelProject]:
+    async def get_project(self, project_id: str) -> NovelProject | None:
+        """只读取项目本身一行，不加载任何关联，用于归属校验与项目字段更新。."""
         result = await self.session.execute(
+            select(NovelProject).where(NovelProject.id == project_id)
+        )
+        return result.scalars().first()
+
+    async def get_revision(self, project_id: str) -> Row | None:
+        """只读取项目归属与修订号，用于条件请求的校验。."""
+        stmt = select(NovelProject.user_id, NovelProject.revision).where(
+            NovelProject.id == project_id
+        )
+        return (await self.session.execute(stmt)).first()
+
+    async def touch(self, project_id: str) -> None:
+        """刷新项目更新时间并递增修订号，随调用方的事务一起提交。."""
+        await self.session.execute(
+            update(NovelProject)
+            .where(NovelProject.id == project_id)
+            .values(
+                # 与数据库默认值同为秒精度，保证键集分页比较时精度一致
+                updated_at=datetime.now(UTC).replace(microsecond=0),
+                revision=NovelProject.revision + 1,
+            )
+        )
+
+    async def get_vector_generation(self, project_id: str) -> int:
+        """读取项目的向量入库代次，项目不存在时返回 0。."""
+        stmt = select(NovelProject.vector_generation).where(
+            NovelProject.id == project_id
+        )
+        return (await self.session.execute(stmt)).scalar() or 0
+
+    async def bump_vector_generation(self, project_id: str) -> None:
+        """递增向量入库代次，随调用方的事务一起提交；不视为项目内容变更。."""
+        await self.session.execute(
+            update(NovelProject)
+            .where(NovelProject.id == project_id)
+            .values(
+                vector_generation=NovelProject.vector_generation + 1,
+                # 显式保留原值，避免 onupdate 刷新项目更新时间
+                updated_at=NovelProject.updated_at,
+            )
+        )
+
+    async def get_with_blueprint(self, project_id: str) -> NovelProject | None:
+        """加载蓝图基础信息、角色与关系，不加载章节与三层蓝图。."""
+        stmt = (
             select(NovelProject)
-            .where(NovelProject.user_id == user_id)
-            .order_by(NovelProject.updated_at.desc())
+            .where(NovelProject.id == project_id)
             .options(
                 selectinload(NovelProject.blueprint),
-                selectinload(NovelProject.chapters).selectinload(
-                    Chapter.selected_version
-                ),
-                selectinload(NovelProject.chapters).selectinload(
-                    Chapter.event
-                ),  # 预加载事件关系
-                # 预加载三层蓝图架构的关联对象
-                selectinload(NovelProject.story_framework),
-                selectinload(NovelProject.volume_outlines),
-                selectinload(NovelProject.plot_events),  # 预加载情节事件（第三层蓝图）
+                selectinload(NovelProject.characters),
+                selectinload(NovelProject.relationships_),
             )
         )
-        return result.scalars().all()
+        result = await self.session.execute(stmt)
+        return result.scalars().first()
 
-    async def list_all(self) -> Iterable[NovelProject]:
-        result = await self.session.execute(
+    async def get_with_events(self, project_id: str) -> NovelProject | None:
+        """加载总体框架、分卷大纲与情节事件（三层蓝图），不加载章节。."""
+        stmt = (
             select(NovelProject)
-            .order_by(NovelProject.updated_at.desc())
+            .where(NovelProject.id == project_id)
             .options(
-                selectinload(NovelProject.owner),
-                selectinload(NovelProject.blueprint),
-                selectinload(NovelProject.chapters).selectinload(
-                    Chapter.selected_version
-                ),
-                selectinload(NovelProject.chapters).selectinload(
-                    Chapter.event
-                ),  # 预加载事件关系
-                # 预加载三层蓝图架构的关联对象
                 selectinload(NovelProject.story_framework),
                 selectinload(NovelProject.volume_outlines),
-                selectinload(NovelProject.plot_events),  # 预加载情节事件（第三层蓝图）
+                selectinload(NovelProject.plot_events),
             )
         )
-        return result.scalars().all()
+        result = await self.session.execute(stmt)
+        return result.scalars().first()
+
+    async def get_with_chapters(self, project_id: str) -> NovelProject | None:
+        """加载章节元数据（含关联事件）与情节事件，不加载章节版本与评估。."""
+        stmt = (
+            select(NovelProject)
+            .where(NovelProject.id == project_id)
+            .options(
+                selectinload(NovelProject.chapters).selectinload(Chapter.event),
+                selectinload(NovelProject.plot_events),
+            )
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().first()
+
+    async def list_chapters(self, project_id: str) -> list[Chapter]:
+        """按章节号列出项目章节，预加载选定版本（含正文）与关联事件。."""
+        stmt = (
+            select(Chapter)
+            .where(Chapter.project_id == project_id)
+            .order_by(Chapter.chapter_number)
+            .options(
+                selectinload(Chapter.selected_version).undefer(ChapterVersion.content),
+                selectinload(Chapter.event),
+            )
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_chapter(self, project_id: str, chapter_number: int) -> Chapter | None:
+        """加载单个章节及其全部版本正文、评估、选定版本与关联事件。."""
+        stmt = (
+            select(Chapter)
+            .where(
+                Chapter.project_id == project_id,
+                Chapter.chapter_number == chapter_number,
+            )
+            .options(
+                selectinload(Chapter.versions).undefer(ChapterVersion.content),
+                selectinload(Chapter.evaluations).undefer(ChapterEvaluation.feedback),
+                selectinload(Chapter.selected_version).undefer(ChapterVersion.content),
+                selectinload(Chapter.event),
+            )
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().first()
+
+    async def get_chapter_version(
+        self, project_id: str, chapter_number: int, version_index: int
+    ) -> tuple[Chapter, ChapterVersion] | None:
+        """按创建顺序取章节的第 version_index 个版本（含正文），与章节一并返回。."""
+        stmt = (
+            select(Chapter, ChapterVersion)
+            .join(ChapterVersion, ChapterVersion.chapter_id == Chapter.id)
+            .where(
+                Chapter.project_id == project_id,
+                Chapter.chapter_number == chapter_number,
+            )
+            .order_by(ChapterVersion.created_at, ChapterVersion.id)
+            .offset(version_index)
+            .limit(1)
+            .options(undefer(ChapterVersion.content))
+        )
+        row = (await self.session.execute(stmt)).first()
+        if row is None:
+            return None
+        return row[0], row[1]
+
+    async def list_summary_rows(
+        self,
+        *,
+        user_id: int | None = None,
+        updated_after: datetime | None = None,
+        updated_before: datetime | None = None,
+        after: tuple[datetime, str] | None = None,
+        descending: bool = True,
+        limit: int | None = None,
+    ) -> list[Row]:
+        """按 (updated_at, id) 排序读取项目列表所需的列，不加载任何关联对象.
+
+        after 为上一页最后一行的 (updated_at, id)，用于键集分页。
+        """
+        stmt = (
+            select(
+                NovelProject.id,
+                NovelProject.title,
+                NovelProject.user_id,
+                NovelProject.updated_at,
+                NovelBlueprint.genre,
+                User.username,
+            )
+            .outerjoin(NovelBlueprint, NovelBlueprint.project_id == NovelProject.id)
+            .outerjoin(User, User.id == NovelProject.user_id)
+        )
+        if user_id is not None:
+            stmt = stmt.where(NovelProject.user_id == user_id)
+        if updated_after is not None:
+            stmt = stmt.where(NovelProject.updated_at >= updated_after)
+        if updated_before is not None:
+            stmt = stmt.where(NovelProject.updated_at < updated_before)
+        if after is not None:
+            after_updated_at, after_id = after
+            if descending:
+                stmt = stmt.where(
+                    or_(
+                        NovelProject.updated_at < after_updated_at,
+                        and_(
+                            NovelProject.updated_at == after_updated_at,
+                            NovelProject.id < after_id,
+                        ),
+                    )
+                )
+            else:
+                stmt = stmt.where(
+                    or_(
+                        NovelProject.updated_at > after_updated_at,
+                        and_(
+                            NovelProject.updated_at == after_updated_at,
+                            NovelProject.id > after_id,
+                        ),
+                    )
+                )
+        if descending:
+            stmt = stmt.order_by(NovelProject.updated_at.desc(), NovelProject.id.desc())
+        else:
+            stmt = stmt.order_by(NovelProject.updated_at.asc(), NovelProject.id.asc())
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        result = await self.session.execute(stmt)
+        return list(result.all())
+
+    async def count_chapters(
+        self, project_ids: list[str] | None = None
+    ) -> dict[str, tuple[int, int]]:
+        """按项目聚合章节总数与已选定版本的章节数，project_ids 为空时统计全部项目。."""
+        stmt = select(
+            Chapter.project_id,
+            func.count(Chapter.id),
+            func.count(Chapter.selected_version_id),
+        ).group_by(Chapter.project_id)
+        if project_ids is not None:
+            if not project_ids:
+                return {}
+            stmt = stmt.where(Chapter.project_id.in_(project_ids))
+        result = await self.session.execute(stmt)
+        return {
+            project_id: (total, completed)
+            for project_id, total, completed in result.all()
+        }
@@ -21,12 +21,16 @@ class RAGMetricsRepository:
         summary_count: int,
         duplicate_ratio: float,
         provider: str,
+        embedding_latency_ms: int | None = None,
+        search_latency_ms: int | None = None,
         occurred_at: datetime | None = None,
     ) -> None:
         record = RAGRetrievalLog(
             project_id=project_id,
             occurred_at=occurred_at,
             latency_ms=latency_ms,
+            embedding_latency_ms=embedding_latency_ms,
+            search_latency_ms=search_latency_ms,
             chunk_count=chunk_count,
             summary_count=summary_count,
             duplicate_ratio=duplicate_ratio,
@@ -38,10 +42,12 @@ class RAGMetricsRepository:
     async def window_stats(self, days: int = 7) -> dict:
         since = datetime.utcnow() - timedelta(days=days)
 
-        # 平均延迟
-        stmt_avg = select(func.avg(RAGRetrievalLog.latency_ms)).where(
-            RAGRetrievalLog.occurred_at >= since
-        )
+        # 平均延迟（总耗时与分阶段耗时，AVG 会自动忽略历史记录中的空值）
+        stmt_avg = select(
+            func.avg(RAGRetrievalLog.latency_ms),
+            func.avg(RAGRetrievalLog.embedding_latency_ms),
+            func.avg(RAGRetrievalLog.search_latency_ms),
+        ).where(RAGRetrievalLog.occurred_at >= since)
         # 空召回率：chunks+summaries==0 的占比
         stmt_cnt = select(
             func.count(RAGRetrievalLog.id),
@@ -66,10 +72,14 @@ class RAGMetricsRepository:
         total_count = 0
         empty_count = 0
         avg_latency = None
+        avg_embedding_latency = None
+        avg_search_latency = None
         avg_dup = None
 
         avg_res = await self.session.execute(stmt_avg)
-        avg_latency = avg_res.scalar()
+        avg_row = avg_res.first()
+        if avg_row:
+            avg_latency, avg_embedding_latency, avg_search_latency = avg_row
 
         cnt_res = await self.session.execute(stmt_cnt)
         row = cnt_res.first()
@@ -84,6 +94,12 @@ class RAGMetricsRepository:
 
         return {
             "avg_latency_ms": float(avg_latency) if avg_latency is not None else None,
+            "avg_embedding_latency_ms": float(avg_embedding_latency)
+            if avg_embedding_latency is not None
+            else None,
+            "avg_search_latency_ms": float(avg_search_latency)
+            if avg_search_latency is not None
+            else None,
             "empty_rate": float(empty_rate) if empty_rate is not None else None,
             "duplicate_rate": float(avg_dup) if avg_dup is not None else None,
             "total": total_count,
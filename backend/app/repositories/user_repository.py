@@ -29,7 +29,8 @@ class UserRepository(BaseRepository[User]):
         result = await self.session.execute(select(User))
         return result.scalars().all()
 
-    async def increment_daily_request(self, user_id: int) -> None:
+    async def increment_daily_request(self, user_id: int, amount: int = 1) -> None:
+        """累加用户当日请求次数，amount 为负数时用于退还预扣的次数。."""
         today = date.today()
         stmt = select(UserDailyRequest).where(
             UserDailyRequest.user_id == user_id,
@@ -40,11 +41,11 @@ class UserRepository(BaseRepository[User]):
 
         if record is None:
             record = UserDailyRequest(
-                user_id=user_id, request_date=today, request_count=1
+                user_id=user_id, request_date=today, request_count=max(amount, 0)
             )
             self.session.add(record)
         else:
-            record.request_count += 1
+            record.request_count = max(record.request_count + amount, 0)
         await self.session.flush()
 
     async def get_daily_request(self, user_id: int) -> int:
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Any
 
 from pydantic import BaseModel, Field
 
@@ -52,6 +53,11 @@ class AdminNovelSummary(BaseModel):
     total_chapters: int
 
 
+class AdminNovelPage(BaseModel):
+    items: list[AdminNovelSummary]
+    next_cursor: str | None = Field(None, description="下一页游标，为空表示没有更多数据")
+
+
 class RAGProjectStat(BaseModel):
     project_id: str
     title: str | None = None
@@ -75,5 +81,41 @@ class RAGStatus(BaseModel):
     top_projects: list[RAGProjectStat] = []
     # 近 7 天运行指标
     avg_latency_ms_7d: float | None = None
+    avg_embedding_latency_ms_7d: float | None = None
+    avg_search_latency_ms_7d: float | None = None
     empty_recall_rate_7d: float | None = None
     duplicate_chunk_rate_7d: float | None = None
+    # 嵌入缓存命中统计（进程启动以来）
+    embedding_cache: dict[str, float] | None = None
+    # 检索结果缓存命中统计（进程启动以来）
+    retrieval_cache: dict[str, float] | None = None
+
+
+class TaskJobRead(BaseModel):
+    """后台任务读取模型."""
+
+    id: int
+    kind: str
+    status: str
+    payload: dict[str, Any]
+    dedup_key: str | None = None
+    attempts: int
+    max_attempts: int
+    run_after: datetime
+    last_error: str | None = None
+    progress: dict[str, Any] | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    class Config:
+        """Pydantic 模型配置."""
+
+        from_attributes = True
+
+
+class TaskQueueStatus(BaseModel):
+    worker_running: bool = Field(..., description="当前进程内的 worker 是否在运行")
+    counts: dict[str, dict[str, int]] = Field(
+        default_factory=dict, description="按任务类型统计的各状态任务数"
+    )
@@ -86,6 +86,18 @@ class Chapter(BaseModel):
     is_user_edited: bool = False
 
 
+class ChapterVersionContent(BaseModel):
+    """单个章节版本的正文，供客户端按需加载."""
+
+    chapter_number: int
+    version_index: int
+    version_label: str | None = None
+    content: str
+    word_count: int = 0
+    is_selected: bool = False
+    created_at: str | None = None
+
+
 class Relationship(BaseModel):
     character_from: str
     character_to: str
@@ -262,6 +274,13 @@ class NovelProjectSummary(BaseModel):
     total_chapters: int
 
 
+class NovelProjectPage(BaseModel):
+    """按 updated_at 键集分页的项目列表."""
+
+    items: list[NovelProjectSummary]
+    next_cursor: str | None = Field(None, description="下一页游标，为空表示没有更多数据")
+
+
 class BlueprintGenerationResponse(BaseModel):
     blueprint: Blueprint
     ai_message: str
@@ -290,6 +309,38 @@ class NovelSectionResponse(BaseModel):
 class GenerateChapterRequest(BaseModel):
     chapter_number: int
     writing_notes: str | None = Field(default=None, description="章节额外写作指令")
+    run_async: bool = Field(
+        default=False, description="为 true 时提交后台任务并立即返回任务信息"
+    )
+
+
+class ChapterGenerationJob(BaseModel):
+    """后台章节生成任务的状态."""
+
+    job_id: str
+    project_id: str
+    chapter_number: int
+    status: Literal["pending", "running", "succeeded", "failed"]
+    version_count: int
+    completed_versions: int
+    failed_versions: int
+    chapter_status: str | None = Field(None, description="章节当前的生成状态")
+    error: str | None = None
+    created_at: str | None = None
+    finished_at: str | None = None
+
+
+class SummaryBackfillJob(BaseModel):
+    """章节摘要批量补齐任务的状态."""
+
+    job_id: int
+    status: Literal["pending", "running", "succeeded", "failed"]
+    progress: dict[str, Any] | None = Field(
+        None, description="补齐进度：total/done/failed/skipped/budget_exhausted"
+    )
+    error: str | None = None
+    created_at: str | None = None
+    finished_at: str | None = None
 
 
 class SelectVersionRequest(BaseModel):
@@ -618,7 +618,7 @@ class BlueprintService:
         )
 
         try:
-            project = await self.novel_repo.get_by_id(project_id)
+            project = await self.novel_repo.get_with_blueprint(project_id)
             if not project:
                 raise ValueError(f"项目不存在: {project_id}")
 
@@ -634,6 +634,7 @@ class BlueprintService:
                 )
                 existing_blueprint.full_synopsis = blueprint.get("full_synopsis")
                 existing_blueprint.world_setting = blueprint.get("world_setting", {})
+                existing_blueprint.revision = (existing_blueprint.revision or 0) + 1
             else:
                 new_blueprint = NovelBlueprint(
                     project_id=project_id,
@@ -747,6 +748,7 @@ class BlueprintService:
                 )
                 self.session.add(event)
 
+            await self.novel_repo.touch(project_id)
             await self.session.commit()
             logger.info(
                 "蓝图已保存到数据库",
@@ -86,7 +86,7 @@ class SimpleBlueprintService:
     async def _save_to_db(self, project_id: str, blueprint: dict[str, Any]):
         """保存到数据库."""
         try:
-            project = await self.novel_repo.get_by_id(project_id)
+            project = await self.novel_repo.get_project(project_id)
             if project:
                 # 使用metadata字段存储
                 if not hasattr(project, "metadata"):
@@ -95,6 +95,7 @@ class SimpleBlueprintService:
                     blueprint, ensure_ascii=False
                 )
                 self.session.add(project)
+                await self.novel_repo.touch(project_id)
                 await self.session.commit()
                 logger.info("蓝图已保存", extra={"project_id": project_id})
         except Exception as e:
@@ -11,6 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import attributes
 
 from ...models.novel import NovelProject
+from ...repositories.novel_repository import NovelRepository
 from ...schemas.blueprint_stage import BlueprintDraft, SaveDraftRequest
 
 logger = logging.getLogger(__name__)
@@ -71,6 +72,7 @@ class DraftService:
         # 因为 metadata 使用了 descriptor，SQLAlchemy 无法自动检测到 JSON 字段的变更
         attributes.flag_modified(project, "metadata_")
 
+        await NovelRepository(self.session).touch(project_id)
         await self.session.commit()
         await self.session.refresh(project)
 
@@ -175,6 +177,7 @@ class DraftService:
             del project.metadata["blueprint_draft"]
             # 显式标记 metadata_ 字段已修改
             attributes.flag_modified(project, "metadata_")
+            await NovelRepository(self.session).touch(project_id)
             await self.session.commit()
             logger.info("草稿删除成功", extra={"project_id": project_id})
             return True
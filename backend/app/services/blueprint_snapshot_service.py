@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+"""
+蓝图快照：只读取蓝图相关表，生成可直接放入提示词的紧凑 JSON，并按项目缓存。
+
+缓存失效依据一个轻量的版本戳：
+- novel_projects.revision：项目内容的所有写入（包括滚动大纲、事件进度等
+  直接修改分卷与情节事件的流程）都会通过 touch 递增
+- novel_blueprints.revision：在整体替换或局部修改蓝图时递增
+
+不使用 updated_at 等时间戳：其精度只到秒，同一秒内的写入无法使版本戳变化。
+"""
+
+import copy
+import logging
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.novel import (
+    BlueprintCharacter,
+    BlueprintRelationship,
+    NovelBlueprint,
+    NovelProject,
+    PlotEvent,
+    StoryFramework,
+    VolumeOutline,
+)
+
+logger = logging.getLogger(__name__)
+
+_CACHE_MAX_ENTRIES = 128
+
+# 单 worker 部署，进程内缓存即可；值为 (版本戳, 快照)
+_snapshot_cache: OrderedDict[str, tuple[tuple[Any, ...], dict[str, Any]]] = (
+    OrderedDict()
+)
+
+_CHARACTER_COLUMNS = (
+    "name",
+    "identity",
+    "personality",
+    "goals",
+    "abilities",
+    "relationship_to_protagonist",
+)
+
+
+def _compact(data: dict[str, Any]) -> dict[str, Any]:
+    """去掉空值字段，缩短提示词。."""
+    return {
+        key: value
+        for key, value in data.items()
+        if value is not None and value != "" and value != [] and value != {}
+    }
+
+
+class BlueprintSnapshotService:
+    """生成与缓存供生成流程使用的蓝图快照。."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(self, project_id: str) -> dict[str, Any]:
+        """返回蓝图快照的副本，调用方可自由修改。."""
+        stamp = await self._stamp(project_id)
+        cached = _snapshot_cache.get(project_id)
+        if cached and cached[0] == stamp:
+            _snapshot_cache.move_to_end(project_id)
+            return copy.deepcopy(cached[1])
+
+        snapshot = await self._build(project_id)
+        _snapshot_cache[project_id] = (stamp, snapshot)
+        _snapshot_cache.move_to_end(project_id)
+        while len(_snapshot_cache) > _CACHE_MAX_ENTRIES:
+            _snapshot_cache.popitem(last=False)
+        logger.debug("蓝图快照已重建: project=%s stamp=%s", project_id, stamp)
+        return copy.deepcopy(snapshot)
+
+    async def _stamp(self, project_id: str) -> tuple[Any, ...]:
+        stmt = select(
+            select(NovelProject.revision)
+            .where(NovelProject.id == project_id)
+            .scalar_subquery(),
+            select(NovelBlueprint.revision)
+            .where(NovelBlueprint.project_id == project_id)
+            .scalar_subquery(),
+        )
+        result = await self.session.execute(stmt)
+        return tuple(result.one())
+
+    async def _build(self, project_id: str) -> dict[str, Any]:
+        blueprint = await self.session.get(NovelBlueprint, project_id)
+        characters = await self.session.execute(
+            select(BlueprintCharacter)
+            .where(BlueprintCharacter.project_id == project_id)
+            .order_by(BlueprintCharacter.position)
+        )
+        relationships = await self.session.execute(
+            select(BlueprintRelationship)
+            .where(BlueprintRelationship.project_id == project_id)
+            .order_by(BlueprintRelationship.position)
+        )
+        framework = await self.session.execute(
+            select(StoryFramework).where(StoryFramework.project_id == project_id)
+        )
+        volumes = (
+            await self.session.execute(
+                select(VolumeOutline)
+                .where(VolumeOutline.project_id == project_id)
+                .order_by(VolumeOutline.volume_number)
+            )
+        ).scalars().all()
+        events = await self.session.execute(
+            select(PlotEvent)
+            .where(PlotEvent.project_id == project_id)
+            .order_by(PlotEvent.sequence)
+        )
+
+        snapshot: dict[str, Any] = {
+            "title": blueprint.title if blueprint else None,
+            "target_audience": blueprint.target_audience if blueprint else None,
+            "genre": blueprint.genre if blueprint else None,
+            "style": blueprint.style if blueprint else None,
+            "tone": blueprint.tone if blueprint else None,
+            "one_sentence_summary": blueprint.one_sentence_summary
+            if blueprint
+            else None,
+            "full_synopsis": blueprint.full_synopsis if blueprint else None,
+            "world_setting": blueprint.world_setting if blueprint else None,
+            "characters": [
+                _compact(
+                    {
+                        **{
+                            column: getattr(character, column)
+                            for column in _CHARACTER_COLUMNS
+                        },
+                        **(character.extra or {}),
+                    }
+                )
+                for character in characters.scalars().all()
+            ],
+            "relationships": [
+                _compact(
+                    {
+                        "from": relation.character_from,
+                        "to": relation.character_to,
+                        "description": relation.description,
+                    }
+                )
+                for relation in relationships.scalars().all()
+            ],
+        }
+
+        story_framework = framework.scalars().first()
+        if story_framework:
+            snapshot["story_framework"] = _compact(
+                {
+                    "estimated_total_chapters": (
+                        story_framework.estimated_total_chapters
+                    ),
+                    "overall_arc": story_framework.overall_arc,
+                }
+            )
+
+        volume_numbers = {volume.id: volume.volume_number for volume in volumes}
+        snapshot["volume_outlines"] = [
+            _compact(
+                {
+                    "volume_number": volume.volume_number,
+                    "volume_title": volume.volume_title,
+                    "arc_phase": volume.arc_phase,
+                    "volume_goal": volume.volume_goal,
+                    "estimated_chapters": volume.estimated_chapters,
+                    "actual_start_chapter": volume.actual_start_chapter,
+                    "actual_end_chapter": volume.actual_end_chapter,
+                    "completion_criteria": volume.completion_criteria,
+                    "major_arcs": volume.major_arcs,
+                    "new_characters": volume.new_characters,
+                    "foreshadowing": volume.foreshadowing,
+                    "status": volume.status,
+                }
+            )
+            for volume in volumes
+        ]
+        plot_events = [
+            _compact(
+                {
+                    "volume_number": volume_numbers.get(event.volume_id),
+                    "event_id": event.event_id,
+                    "event_title": event.event_title,
+                    "act": event.act,
+                    "arc_index": event.arc_index,
+                    "event_type": event.event_type,
+                    "description": event.description,
+                    "estimated_chapters": event.estimated_chapters,
+                    "key_points": event.key_points,
+                    "completed_key_points": event.completed_key_points,
+                    "pacing": event.pacing,
+                    "tension_level": event.tension_level,
+                    "sequence": event.sequence,
+                    "progress": event.progress,
+                    "status": event.status,
+                }
+            )
+            for event in events.scalars().all()
+        ]
+        if plot_events:
+            snapshot["stage4_data"] = {"plot_events": plot_events}
+        return _compact(snapshot)
+
+
+__all__ = ["BlueprintSnapshotService"]
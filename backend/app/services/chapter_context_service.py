@@ -6,13 +6,19 @@ from __future__ import annotations
 所有关键步骤均包含中文注释，方便团队理解 RAG 流程。
 """
 
+import asyncio
 import logging
 import time
+from collections.abc import Awaitable
 from dataclasses import dataclass
+from typing import Any
 
 from ..core.config import settings
+from ..repositories.novel_repository import NovelRepository
 from ..repositories.rag_metrics_repository import RAGMetricsRepository
 from ..services.llm_service import LLMService
+from ..utils import minhash
+from .retrieval_cache import retrieval_cache
 from .vector_store_service import RetrievedChunk, RetrievedSummary, VectorStoreService
 
 logger = logging.getLogger(__name__)
@@ -72,15 +78,52 @@ class ChapterContextService:
             logger.debug("向量库未启用或初始化失败，跳过检索: project=%s", project_id)
             return ChapterRAGContext(query=query, chunks=[], summaries=[])
 
+        top_k_chunks = top_k_chunks or settings.vector_top_k_chunks
+        top_k_summaries = top_k_summaries or settings.vector_top_k_summaries
+        # 同一项目在入库代次未变时，相同查询直接复用上次检索结果；
+        # 代次从数据库读取，入库在其他进程执行时同样能使缓存失效
+        cache_key = None
+        if retrieval_cache.enabled:
+            generation = await NovelRepository(self._session).get_vector_generation(
+                project_id
+            )
+            cache_key = retrieval_cache.make_key(
+                project_id, generation, query, top_k_chunks, top_k_summaries
+            )
+            cached = retrieval_cache.get(cache_key)
+            if cached is not None:
+                chunks, summaries = cached
+                logger.debug(
+                    "命中检索缓存: project=%s chunks=%d summaries=%d",
+                    project_id,
+                    len(chunks),
+                    len(summaries),
+                )
+                return ChapterRAGContext(
+                    query=query, chunks=list(chunks), summaries=list(summaries)
+                )
+
         start = time.perf_counter()
         embedding_model = (
             None
             if settings.embedding_provider == "ollama"
             else settings.embedding_model
         )
-        embedding = await self._llm_service.get_embedding(
-            query, user_id=user_id, model=embedding_model
-        )
+        try:
+            embedding = await asyncio.wait_for(
+                self._llm_service.get_embedding(
+                    query, user_id=user_id, model=embedding_model
+                ),
+                timeout=settings.rag_embedding_timeout,
+            )
+        except TimeoutError:
+            logger.warning(
+                "检索查询向量生成超时，跳过检索: project=%s timeout=%.1fs",
+                project_id,
+                settings.rag_embedding_timeout,
+            )
+            embedding = []
+        embedding_latency_ms = int((time.perf_counter() - start) * 1000)
         if not embedding:
             logger.warning(
                 "检索查询向量生成失败: project=%s chapter_query=%s", project_id, query
@@ -89,49 +132,103 @@ class ChapterContextService:
             # 记录一次空检索（无向量）
             await self._log_metrics(
                 project_id,
-                latency_ms=int((time.perf_counter() - start) * 1000),
+                latency_ms=embedding_latency_ms,
+                embedding_latency_ms=embedding_latency_ms,
+                search_latency_ms=None,
+                duplicate_ratio=0.0,
                 chunks=[],
                 summaries=[],
             )
             return ctx
 
-        chunks = await self._vector_store.query_chunks(
-            project_id=project_id,
-            embedding=embedding,
-            top_k=top_k_chunks,
+        # 片段与摘要检索互不依赖，并发发起；单个阶段超时仅降级为空结果
+        search_start = time.perf_counter()
+        chunk_hits, summary_hits = await asyncio.gather(
+            self._search_with_timeout(
+                "剧情片段",
+                project_id,
+                self._vector_store.query_chunks(
+                    project_id=project_id,
+                    embedding=embedding,
+                    top_k=top_k_chunks,
+                ),
+            ),
+            self._search_with_timeout(
+                "章节摘要",
+                project_id,
+                self._vector_store.query_summaries(
+                    project_id=project_id,
+                    embedding=embedding,
+                    top_k=top_k_summaries,
+                ),
+            ),
         )
-        summaries = await self._vector_store.query_summaries(
-            project_id=project_id,
-            embedding=embedding,
-            top_k=top_k_summaries,
+        search_latency_ms = int((time.perf_counter() - search_start) * 1000)
+        chunks, duplicate_ratio = self._dedupe_chunks(
+            chunk_hits if chunk_hits is not None else []
         )
+        summaries = summary_hits if summary_hits is not None else []
+        if (
+            cache_key is not None
+            and chunk_hits is not None
+            and summary_hits is not None
+        ):
+            # 降级结果不入缓存，下次请求仍会重新检索
+            retrieval_cache.put(cache_key, (tuple(chunks), tuple(summaries)))
         latency_ms = int((time.perf_counter() - start) * 1000)
         logger.info(
-            "章节上下文检索完成: project=%s chunks=%d summaries=%d query_preview=%s",
+            "章节上下文检索完成: project=%s chunks=%d summaries=%d "
+            "embedding_ms=%d search_ms=%d query_preview=%s",
             project_id,
             len(chunks),
             len(summaries),
+            embedding_latency_ms,
+            search_latency_ms,
             query[:80],
         )
         await self._log_metrics(
-            project_id, latency_ms=latency_ms, chunks=chunks, summaries=summaries
+            project_id,
+            latency_ms=latency_ms,
+            embedding_latency_ms=embedding_latency_ms,
+            search_latency_ms=search_latency_ms,
+            duplicate_ratio=duplicate_ratio,
+            chunks=chunks,
+            summaries=summaries,
         )
         return ChapterRAGContext(query=query, chunks=chunks, summaries=summaries)
 
+    @staticmethod
+    async def _search_with_timeout(
+        label: str, project_id: str, search: Awaitable[list[Any]]
+    ) -> list[Any] | None:
+        """为单个检索阶段加上超时，超时或异常时返回 None。."""
+        try:
+            return await asyncio.wait_for(search, timeout=settings.rag_search_timeout)
+        except TimeoutError:
+            logger.warning(
+                "检索%s超时，已降级为空结果: project=%s timeout=%.1fs",
+                label,
+                project_id,
+                settings.rag_search_timeout,
+            )
+        except Exception as exc:  # pragma: no cover - 检索失败不阻塞章节生成
+            logger.warning("检索%s失败: project=%s error=%s", label, project_id, exc)
+        return None
+
     async def _log_metrics(
         self,
         project_id: str,
         *,
         latency_ms: int,
+        embedding_latency_ms: int | None,
+        search_latency_ms: int | None,
+        duplicate_ratio: float,
         chunks: list[RetrievedChunk],
         summaries: list[RetrievedSummary],
     ) -> None:
-        """记录一次检索的指标：延迟、结果规模、重复片段率。."""
+        """记录一次检索的指标：总延迟与分阶段延迟、结果规模、重复片段率。."""
         try:
             repo = RAGMetricsRepository(self._session)
-            duplicate_ratio = self._compute_duplicate_ratio(
-                [c.content or "" for c in chunks]
-            )
             provider = (
                 getattr(self._vector_store, "_provider", "libsql")
                 if self._vector_store
@@ -140,6 +237,8 @@ class ChapterContextService:
             await repo.add(
                 project_id=project_id,
                 latency_ms=latency_ms,
+                embedding_latency_ms=embedding_latency_ms,
+                search_latency_ms=search_latency_ms,
                 chunk_count=len(chunks),
                 summary_count=len(summaries),
                 duplicate_ratio=duplicate_ratio,
@@ -149,49 +248,33 @@ class ChapterContextService:
             logger.debug("记录 RAG 指标失败: %s", exc)
 
     @staticmethod
-    def _norm_text(text: str) -> str:
-        # 统一空白，去除多余空格与换行
-        return "".join(text.split())
+    def _dedupe_chunks(
+        chunks: list[RetrievedChunk],
+    ) -> tuple[list[RetrievedChunk], float]:
+        """基于 MinHash/LSH 剔除近重复片段，返回保留的片段与原始重复率。.
 
-    @staticmethod
-    def _shingles(text: str, k: int = 3) -> set[str]:
-        # 基于字符的 k-gram，适配中文/英文混排，无需额外分词
-        if not text:
-            return set()
-        if len(text) <= k:
-            return {text}
-        return {text[i : i + k] for i in range(0, len(text) - k + 1)}
-
-    @classmethod
-    def _jaccard_sim(cls, a: str, b: str, k: int = 3) -> float:
-        sa = cls._shingles(cls._norm_text(a), k=k)
-        sb = cls._shingles(cls._norm_text(b), k=k)
-        if not sa and not sb:
-            return 1.0
-        if not sa or not sb:
-            return 0.0
-        inter = len(sa & sb)
-        union = len(sa | sb)
-        return inter / union if union > 0 else 0.0
-
-    def _compute_duplicate_ratio(self, texts: list[str]) -> float:
-        total = len(texts)
-        if total <= 1:
-            return 0.0
-        threshold = settings.rag_duplicate_similarity_threshold
-        representatives: list[str] = []
-        dups = 0
-        for t in texts:
-            matched = False
-            for rep in representatives:
-                if self._jaccard_sim(t, rep, k=3) >= threshold:
-                    matched = True
-                    break
-            if matched:
-                dups += 1
-            else:
-                representatives.append(t)
-        return dups / total
+        优先复用入库时写入元数据的签名，缺失时现场计算；片段按相关度排序，
+        因此每组近重复片段中保留最相关的一条。
+        """
+        if len(chunks) <= 1:
+            return chunks, 0.0
+        signatures = [
+            minhash.coerce_signature((chunk.metadata or {}).get("minhash"))
+            or minhash.signature(chunk.content or "")
+            for chunk in chunks
+        ]
+        owners = minhash.find_duplicates(
+            signatures, settings.rag_duplicate_similarity_threshold
+        )
+        duplicates = sum(1 for owner in owners if owner is not None)
+        if not duplicates:
+            return chunks, 0.0
+        ratio = duplicates / len(chunks)
+        if not settings.rag_dedupe_chunks:
+            return chunks, ratio
+        kept = [chunk for chunk, owner in zip(chunks, owners) if owner is None]
+        logger.debug("已剔除近重复片段: before=%d after=%d", len(chunks), len(kept))
+        return kept, ratio
 
     @staticmethod
     def _normalize(text: str) -> str:
@@ -6,12 +6,15 @@ from __future__ import annotations
 全部注释使用中文，方便团队成员阅读理解。
 """
 
+import hashlib
 import logging
 from collections.abc import Sequence
 
 from ..core.config import settings
+from ..repositories.novel_repository import NovelRepository
 from ..services.llm_service import LLMService
-from ..services.vector_store_service import VectorStoreService
+from ..services.vector_store_service import VectorStoreService, get_vector_store
+from ..utils import minhash
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +34,7 @@ class ChapterIngestionService:
         vector_store: VectorStoreService | None = None,
     ) -> None:
         self._llm_service = llm_service
-        self._vector_store = vector_store or VectorStoreService()
+        self._vector_store = vector_store or get_vector_store()
         self._text_splitter = self._init_text_splitter()
 
     async def ingest_chapter(
@@ -45,7 +48,7 @@ class ChapterIngestionService:
         user_id: int,
     ) -> None:
         """将章节正文与摘要写入向量库，供后续 RAG 检索使用。."""
-        if not settings.vector_store_enabled:
+        if not settings.vector_store_enabled or self._vector_store is None:
             logger.debug(
                 "向量库未启用，跳过章节向量写入: project=%s chapter=%s",
                 project_id,
@@ -69,21 +72,49 @@ class ChapterIngestionService:
             )
             return
 
+        # 片段 ID 与章节位置绑定，内容哈希写入元数据，用于判断片段是否变化；
+        # 哈希包含章节标题，标题变更后载荷中的 chapter_title 会随之重写
+        planned = [
+            (
+                f"{project_id}:{chapter_number}:{index}",
+                index,
+                text,
+                _content_hash(text, title),
+            )
+            for index, text in enumerate(chunks)
+        ]
+        stored = await self._vector_store.list_chunk_hashes(project_id, chapter_number)
+        changed = [item for item in planned if stored.get(item[0]) != item[3]]
+        vanished = sorted(set(stored) - {item[0] for item in planned})
+
         logger.info(
-            "开始写入章节向量: project=%s chapter=%s chunks=%d",
+            "开始写入章节向量: project=%s chapter=%s chunks=%d changed=%d removed=%d",
             project_id,
             chapter_number,
             len(chunks),
+            len(changed),
+            len(vanished),
         )
-        await self._vector_store.delete_by_chapters(project_id, [chapter_number])
+
+        # 变化片段与摘要合并为一次批量嵌入请求，避免逐条串行往返
+        cleaned_summary = summary.strip() if summary else ""
+        inputs = [item[2] for item in changed]
+        if cleaned_summary:
+            inputs.append(cleaned_summary)
+        embeddings = (
+            await self._llm_service.get_embeddings(inputs, user_id=user_id)
+            if inputs
+            else []
+        )
+        chunk_embeddings = embeddings[: len(changed)]
+        summary_embedding = embeddings[len(changed)] if cleaned_summary else []
 
         chunk_records = []
-        for index, chunk_text in enumerate(chunks):
-            embedding = await self._llm_service.get_embedding(
-                chunk_text,
-                user_id=user_id,
-            )
+        for (record_id, index, chunk_text, digest), embedding in zip(
+            changed, chunk_embeddings
+        ):
             if not embedding:
+                # 保留旧片段，等待下次入库重试，避免检索时出现空洞
                 logger.warning(
                     "生成章节片段向量失败，已跳过: project=%s chapter=%s chunk=%s",
                     project_id,
@@ -91,7 +122,6 @@ class ChapterIngestionService:
                     index,
                 )
                 continue
-            record_id = f"{project_id}:{chapter_number}:{index}"
             chunk_records.append(
                 {
                     "id": record_id,
@@ -104,57 +134,68 @@ class ChapterIngestionService:
                     "metadata": {
                         "chunk_id": record_id,
                         "length": len(chunk_text),
+                        "content_hash": digest,
+                        # 入库时预计算 MinHash 签名，检索去重时直接复用
+                        "minhash": list(minhash.signature(chunk_text)),
                     },
                 }
             )
 
+        # 先写入新片段再删除已消失的片段，读者任何时刻都能检索到完整章节
         if chunk_records:
             await self._vector_store.upsert_chunks(records=chunk_records)
-            logger.info(
-                "章节正文向量写入完成: project=%s chapter=%s 成功片段=%d",
-                project_id,
-                chapter_number,
-                len(chunk_records),
-            )
+        if vanished:
+            await self._vector_store.delete_chunks(project_id, vanished)
+        logger.info(
+            "章节正文向量写入完成: project=%s chapter=%s 更新片段=%d 未变片段=%d 删除片段=%d",
+            project_id,
+            chapter_number,
+            len(chunk_records),
+            len(planned) - len(changed),
+            len(vanished),
+        )
 
-        if summary:
-            cleaned_summary = summary.strip()
-            if cleaned_summary:
-                summary_embedding = await self._llm_service.get_embedding(
-                    cleaned_summary,
-                    user_id=user_id,
+        if cleaned_summary:
+            if summary_embedding:
+                summary_id = f"{project_id}:{chapter_number}:summary"
+                await self._vector_store.upsert_summaries(
+                    records=[
+                        {
+                            "id": summary_id,
+                            "project_id": project_id,
+                            "chapter_number": chapter_number,
+                            "title": title,
+                            "summary": cleaned_summary,
+                            "embedding": summary_embedding,
+                        }
+                    ]
+                )
+                logger.info(
+                    "章节摘要向量写入完成: project=%s chapter=%s",
+                    project_id,
+                    chapter_number,
+                )
+            else:
+                logger.warning(
+                    "生成章节摘要向量失败，已跳过: project=%s chapter=%s",
+                    project_id,
+                    chapter_number,
                 )
-                if summary_embedding:
-                    summary_id = f"{project_id}:{chapter_number}:summary"
-                    await self._vector_store.upsert_summaries(
-                        records=[
-                            {
-                                "id": summary_id,
-                                "project_id": project_id,
-                                "chapter_number": chapter_number,
-                                "title": title,
-                                "summary": cleaned_summary,
-                                "embedding": summary_embedding,
-                            }
-                        ]
-                    )
-                    logger.info(
-                        "章节摘要向量写入完成: project=%s chapter=%s",
-                        project_id,
-                        chapter_number,
-                    )
-                else:
-                    logger.warning(
-                        "生成章节摘要向量失败，已跳过: project=%s chapter=%s",
-                        project_id,
-                        chapter_number,
-                    )
+        else:
+            await self._vector_store.delete_summaries(project_id, [chapter_number])
+
+        # 向量已变化，使该项目的检索缓存失效
+        await self._bump_vector_generation(project_id)
 
     async def delete_chapters(
         self, project_id: str, chapter_numbers: Sequence[int]
     ) -> None:
         """从向量库中删除指定章节的所有片段与摘要。."""
-        if not settings.vector_store_enabled or not chapter_numbers:
+        if (
+            not settings.vector_store_enabled
+            or self._vector_store is None
+            or not chapter_numbers
+        ):
             return
         logger.info(
             "准备删除章节向量: project=%s chapters=%s",
@@ -162,6 +203,13 @@ class ChapterIngestionService:
             list(chapter_numbers),
         )
         await self._vector_store.delete_by_chapters(project_id, list(chapter_numbers))
+        await self._bump_vector_generation(project_id)
+
+    async def _bump_vector_generation(self, project_id: str) -> None:
+        """递增项目的入库代次，各进程的检索缓存在下次查询时失效。."""
+        session = self._llm_service.session
+        await NovelRepository(session).bump_vector_generation(project_id)
+        await session.commit()
 
     def _split_into_chunks(self, text: str) -> list[str]:
         """按照配置的 chunk 大小与重叠度切分章节正文。."""
@@ -284,4 +332,12 @@ class ChapterIngestionService:
         return chunks
 
 
+def _content_hash(text: str, title: str) -> str:
+    """计算片段内容与所属章节标题的哈希，用于增量入库时判断片段是否变化。."""
+    digest = hashlib.sha256(title.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
 __all__ = ["ChapterIngestionService"]
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+"""
+嵌入向量缓存：按 (模型, 维度, sha256(文本)) 做内容寻址，避免重复调用嵌入接口。
+
+分为两层：
+- 内存 LRU：进程内热点命中，容量由 EMBEDDING_CACHE_MEMORY_ITEMS 控制
+- SQLite 持久层：重启后仍可复用，行数超过上限时按最近使用时间淘汰
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from array import array
+from collections import OrderedDict
+from collections.abc import Sequence
+from pathlib import Path
+
+from ..core.config import settings
+
+try:  # noqa: SIM105 - aiosqlite 随 SQLite 后端一起安装
+    import aiosqlite
+except ImportError:  # pragma: no cover - 缺少依赖时仅使用内存层
+    aiosqlite = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """两级嵌入缓存，所有公开方法均可安全地并发调用。."""
+
+    def __init__(
+        self,
+        *,
+        memory_items: int,
+        path: Path | None,
+        max_rows: int,
+    ) -> None:
+        self._memory: OrderedDict[str, array] = OrderedDict()
+        self._memory_items = memory_items
+        self._path = path
+        self._max_rows = max_rows
+        self._conn = None
+        self._row_count = 0
+        self._init_lock = asyncio.Lock()
+        self._disk_ready = False
+        self._disk_disabled = path is None or aiosqlite is None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, dimension: int | None, text: str) -> str:
+        """生成内容寻址的缓存键。."""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{model}:{dimension or 0}:{digest}"
+
+    async def get_many(self, keys: Sequence[str]) -> dict[str, list[float]]:
+        """批量读取缓存，返回命中的键与向量。."""
+        found: dict[str, list[float]] = {}
+        pending: list[str] = []
+        for key in keys:
+            cached = self._memory.get(key)
+            if cached is not None:
+                self._memory.move_to_end(key)
+                found[key] = list(cached)
+                self.memory_hits += 1
+            else:
+                pending.append(key)
+
+        if pending and await self._ensure_disk():
+            try:
+                loaded = await self._load_from_disk(pending)
+            except Exception as exc:  # pragma: no cover - 持久层异常不影响主流程
+                logger.warning("读取嵌入缓存失败: %s", exc)
+                loaded = {}
+            for key, vector in loaded.items():
+                self._remember(key, vector)
+                found[key] = list(vector)
+                self.disk_hits += 1
+
+        self.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    async def put_many(self, items: dict[str, Sequence[float]]) -> None:
+        """写入新计算的向量，空向量不会被缓存。."""
+        packed = {key: array("f", vector) for key, vector in items.items() if vector}
+        if not packed:
+            return
+        for key, vector in packed.items():
+            self._remember(key, vector)
+        if not await self._ensure_disk():
+            return
+        try:
+            await self._store_to_disk(packed)
+        except Exception as exc:  # pragma: no cover - 持久层异常不影响主流程
+            logger.warning("写入嵌入缓存失败: %s", exc)
+
+    def stats(self) -> dict[str, int | float]:
+        """返回命中率等统计信息，供管理端展示。."""
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (hits / total) if total else 0.0,
+            "memory_items": len(self._memory),
+            "disk_rows": self._row_count,
+        }
+
+    async def aclose(self) -> None:
+        """关闭持久层连接。."""
+        if self._conn is not None:
+            try:
+                await self._conn.close()
+            except Exception as exc:  # pragma: no cover
+                logger.warning("关闭嵌入缓存失败: %s", exc)
+            self._conn = None
+            self._disk_ready = False
+
+    # -------------------- 内部实现 --------------------
+    def _remember(self, key: str, vector: array) -> None:
+        if self._memory_items <= 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_items:
+            self._memory.popitem(last=False)
+
+    async def _ensure_disk(self) -> bool:
+        if self._disk_ready:
+            return True
+        if self._disk_disabled:
+            return False
+        async with self._init_lock:
+            if self._disk_ready:
+                return True
+            try:
+                assert self._path is not None
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+                conn = await aiosqlite.connect(str(self._path))
+                await conn.execute("PRAGMA journal_mode=WAL")
+                await conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS embedding_cache (
+                        cache_key TEXT PRIMARY KEY,
+                        embedding BLOB NOT NULL,
+                        last_used_at INTEGER NOT NULL
+                    )
+                    """
+                )
+                await conn.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_embedding_cache_last_used
+                    ON embedding_cache(last_used_at)
+                    """
+                )
+                await conn.commit()
+                async with conn.execute("SELECT COUNT(1) FROM embedding_cache") as cur:
+                    row = await cur.fetchone()
+                self._row_count = int(row[0]) if row else 0
+            except Exception as exc:  # pragma: no cover - 初始化失败时退化为纯内存
+                logger.warning("初始化嵌入缓存持久层失败，仅使用内存缓存: %s", exc)
+                self._disk_disabled = True
+                return False
+            self._conn = conn
+            self._disk_ready = True
+            logger.info(
+                "嵌入缓存持久层已就绪: path=%s rows=%d", self._path, self._row_count
+            )
+            return True
+
+    async def _load_from_disk(self, keys: Sequence[str]) -> dict[str, array]:
+        loaded: dict[str, array] = {}
+        # SQLite 默认变量上限为 999，分批查询
+        for start in range(0, len(keys), 500):
+            batch = list(keys[start : start + 500])
+            placeholders = ",".join("?" for _ in batch)
+            async with self._conn.execute(
+                f"SELECT cache_key, embedding FROM embedding_cache "
+                f"WHERE cache_key IN ({placeholders})",
+                batch,
+            ) as cur:
+                rows = await cur.fetchall()
+            for key, blob in rows:
+                vector = array("f")
+                vector.frombytes(bytes(blob))
+                loaded[key] = vector
+        if loaded:
+            now = int(time.time())
+            await self._conn.executemany(
+                "UPDATE embedding_cache SET last_used_at = ? WHERE cache_key = ?",
+                [(now, key) for key in loaded],
+            )
+            await self._conn.commit()
+        return loaded
+
+    async def _store_to_disk(self, items: dict[str, array]) -> None:
+        now = int(time.time())
+        await self._conn.executemany(
+            """
+            INSERT INTO embedding_cache (cache_key, embedding, last_used_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(cache_key) DO UPDATE SET
+                embedding=excluded.embedding,
+                last_used_at=excluded.last_used_at
+            """,
+            [(key, vector.tobytes(), now) for key, vector in items.items()],
+        )
+        self._row_count += len(items)
+        if self._max_rows and self._row_count > self._max_rows:
+            # 超出上限时淘汰最久未使用的 10%，避免每次写入都触发删除
+            async with self._conn.execute("SELECT COUNT(1) FROM embedding_cache") as cur:
+                row = await cur.fetchone()
+            self._row_count = int(row[0]) if row else 0
+            overflow = self._row_count - int(self._max_rows * 0.9)
+            if overflow > 0:
+                await self._conn.execute(
+                    """
+                    DELETE FROM embedding_cache WHERE cache_key IN (
+                        SELECT cache_key FROM embedding_cache
+                        ORDER BY last_used_at ASC
+                        LIMIT ?
+                    )
+                    """,
+                    (overflow,),
+                )
+                self._row_count -= overflow
+                logger.info("嵌入缓存已淘汰旧条目: count=%d", overflow)
+        await self._conn.commit()
+
+
+def _resolve_cache_path() -> Path | None:
+    if not settings.embedding_cache_persistent:
+        return None
+    if settings.embedding_cache_path:
+        return Path(settings.embedding_cache_path).expanduser().resolve()
+    project_root = Path(__file__).resolve().parents[2]
+    return (project_root / "storage" / "embedding_cache.db").resolve()
+
+
+embedding_cache = EmbeddingCache(
+    memory_items=settings.embedding_cache_memory_items,
+    path=_resolve_cache_path(),
+    max_rows=settings.embedding_cache_max_rows,
+)
+
+
+__all__ = ["EmbeddingCache", "embedding_cache"]
@@ -0,0 +1,150 @@
+"""后台章节生成任务的记录与查询。.
+
+任务由 writer 路由在进程内执行，这里只负责任务行的增改查；
+状态查询只读取任务行与对应的章节状态，不加载整个项目。
+执行期间任务行持有本进程的租约，进程退出后租约过期的任务才会被标记为中断。
+"""
+
+import asyncio
+import logging
+import uuid
+from collections.abc import Awaitable
+from datetime import UTC, datetime
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db.session import AsyncSessionLocal
+from ..models.novel import Chapter, ChapterGenerationJob
+from ..schemas.novel import ChapterGenerationJob as ChapterGenerationJobSchema
+from .job_lease import INSTANCE_ID, keep_lease, lease_deadline
+
+logger = logging.getLogger(__name__)
+
+_UNFINISHED_STATUSES = ("pending", "running")
+
+
+class GenerationJobService:
+    """章节生成任务的持久化操作。."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create(
+        self,
+        project_id: str,
+        user_id: int,
+        chapter_number: int,
+        version_count: int,
+    ) -> ChapterGenerationJob:
+        job = ChapterGenerationJob(
+            id=str(uuid.uuid4()),
+            project_id=project_id,
+            user_id=user_id,
+            chapter_number=chapter_number,
+            status="pending",
+            version_count=version_count,
+            completed_versions=0,
+            failed_versions=0,
+            claimed_by=INSTANCE_ID,
+            lease_expires_at=lease_deadline(),
+        )
+        self.session.add(job)
+        await self.session.commit()
+        await self.session.refresh(job)
+        return job
+
+    async def get_status(
+        self, project_id: str, job_id: str, user_id: int
+    ) -> ChapterGenerationJobSchema | None:
+        """按任务 ID 查询状态，仅返回属于该用户与项目的任务。."""
+        stmt = (
+            select(ChapterGenerationJob, Chapter.status)
+            .outerjoin(
+                Chapter,
+                and_(
+                    Chapter.project_id == ChapterGenerationJob.project_id,
+                    Chapter.chapter_number == ChapterGenerationJob.chapter_number,
+                ),
+            )
+            .where(
+                ChapterGenerationJob.id == job_id,
+                ChapterGenerationJob.project_id == project_id,
+                ChapterGenerationJob.user_id == user_id,
+            )
+        )
+        row = (await self.session.execute(stmt)).first()
+        if row is None:
+            return None
+        job, chapter_status = row
+        return self.to_schema(job, chapter_status)
+
+    async def fail_expired(self) -> int:
+        """将租约已过期（执行进程已退出）的未完成任务标记为失败，返回任务数。."""
+        now = datetime.now(UTC)
+        result = await self.session.execute(
+            update(ChapterGenerationJob)
+            .where(
+                ChapterGenerationJob.status.in_(_UNFINISHED_STATUSES),
+                or_(
+                    ChapterGenerationJob.lease_expires_at.is_(None),
+                    ChapterGenerationJob.lease_expires_at < now,
+                ),
+            )
+            .values(
+                status="failed",
+                error="服务重启，任务已中断，请重新生成",
+                finished_at=now,
+                lease_expires_at=None,
+            )
+        )
+        await self.session.commit()
+        if result.rowcount:
+            logger.warning("已将 %s 个中断的章节生成任务标记为失败", result.rowcount)
+        return result.rowcount or 0
+
+    async def renew_lease(self, job_id: str) -> None:
+        await self.session.execute(
+            update(ChapterGenerationJob)
+            .where(
+                ChapterGenerationJob.id == job_id,
+                ChapterGenerationJob.claimed_by == INSTANCE_ID,
+            )
+            .values(lease_expires_at=lease_deadline())
+        )
+        await self.session.commit()
+
+    @staticmethod
+    def to_schema(
+        job: ChapterGenerationJob, chapter_status: str | None = None
+    ) -> ChapterGenerationJobSchema:
+        return ChapterGenerationJobSchema(
+            job_id=job.id,
+            project_id=job.project_id,
+            chapter_number=job.chapter_number,
+            status=job.status,
+            version_count=job.version_count,
+            completed_versions=job.completed_versions or 0,
+            failed_versions=job.failed_versions or 0,
+            chapter_status=chapter_status,
+            error=job.error,
+            created_at=job.created_at.isoformat() if job.created_at else None,
+            finished_at=job.finished_at.isoformat() if job.finished_at else None,
+        )
+
+
+async def run_with_lease(job_id: str, job: Awaitable[None]) -> None:
+    """执行后台生成任务，期间定期为任务行续租。."""
+
+    async def _renew() -> None:
+        async with AsyncSessionLocal() as session:
+            await GenerationJobService(session).renew_lease(job_id)
+
+    lease_task = asyncio.create_task(keep_lease(_renew))
+    try:
+        await job
+    finally:
+        lease_task.cancel()
+
+
+__all__ = ["GenerationJobService", "run_with_lease"]
@@ -0,0 +1,43 @@
+"""执行中任务的租约.
+
+任务被某个进程领取后记录进程标识与租约到期时间，执行期间定期续租；
+只有租约过期（进程已退出或失联）的任务才会被重新放回队列或标记为中断，
+避免重启一个进程时误伤其他仍在运行的 Web / worker 进程中的任务。
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 当前进程的标识，同一主机上的多个进程通过 pid 与随机后缀区分
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def lease_deadline(now: datetime | None = None) -> datetime:
+    """返回从 now 起算的租约到期时间。."""
+    return (now or datetime.now(UTC)) + timedelta(seconds=settings.task_lease_seconds)
+
+
+async def keep_lease(renew: Callable[[], Awaitable[None]]) -> None:
+    """按租约时长的三分之一周期调用 renew 续租，直到被取消。."""
+    interval = settings.task_lease_seconds / 3
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await renew()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            # 单次续租失败不影响任务执行，租约仍有余量等待下次续租
+            logger.warning("任务续租失败: %s", exc)
+
+
+__all__ = ["INSTANCE_ID", "keep_lease", "lease_deadline"]
@@ -1,25 +1,50 @@
+import asyncio
 import logging
 import os
+import re
+from collections.abc import AsyncGenerator
+from typing import Any
 
 import httpx
 from fastapi import HTTPException, status
-from openai import APIConnectionError, APITimeoutError, AsyncOpenAI, InternalServerError
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    BadRequestError,
+    InternalServerError,
+)
 
 from ..core.config import settings
 from ..repositories.llm_config_repository import LLMConfigRepository
 from ..repositories.system_config_repository import SystemConfigRepository
 from ..repositories.user_repository import UserRepository
 from ..services.admin_setting_service import AdminSettingService
+from ..services.embedding_cache import embedding_cache
 from ..services.prompt_service import PromptService
 from ..services.usage_service import UsageService
-from ..utils.llm_tool import ChatMessage, LLMClient
+from ..utils.llm_tool import (
+    ChatMessage,
+    LLMClient,
+    OllamaAsyncClient,
+    llm_client_registry,
+)
 
 logger = logging.getLogger(__name__)
 
-try:  # pragma: no cover - 运行环境未安装时兼容
-    from ollama import AsyncClient as OllamaAsyncClient
-except ImportError:  # pragma: no cover - Ollama 为可选依赖
-    OllamaAsyncClient = None
+# 不支持 n 参数的 (base_url, model)，进程内记忆，避免每次都先尝试多候选
+_single_choice_endpoints: set[tuple[str, str]] = set()
+
+# 错误信息中单独出现的参数名 n（如 "'n' must be 1"、"n is not supported"）
+_CHOICE_PARAM_PATTERN = re.compile(r"(?<![\w-])['\"`]?n['\"`]?(?![\w-])")
+
+
+def _rejects_choice_count(exc: BadRequestError) -> bool:
+    """判断 400 错误是否因服务不支持 n 参数，其它 400（如超长、内容审核）不算。."""
+    if getattr(exc, "param", None) == "n":
+        return True
+    body = getattr(exc, "body", None)
+    message = body.get("message") if isinstance(body, dict) else None
+    return bool(_CHOICE_PARAM_PATTERN.search(str(message or exc)))
 
 
 class LLMService:
@@ -88,6 +113,91 @@ class LLMService:
             max_tokens=settings.llm_completion_max_tokens,
         )
 
+    async def get_llm_responses(
+        self,
+        system_prompt: str,
+        conversation_history: list[dict[str, str]],
+        *,
+        n: int,
+        temperature: float = 0.7,
+        user_id: int | None = None,
+        timeout: float = 300.0,
+        response_format: str | None = "json_object",
+        max_tokens: int | None = None,
+    ) -> list[str]:
+        """在一次流式请求中生成 n 个候选回复，提示词只需处理一次。.
+
+        返回的候选数可能少于 n（服务不支持 n 参数，或部分候选被截断、为空），
+        调用方需自行补齐；全部候选无效时与 get_llm_response 一样抛出异常。
+        """
+        messages = [{"role": "system", "content": system_prompt}, *conversation_history]
+        effective_max_tokens = (
+            max_tokens if max_tokens is not None else settings.llm_completion_max_tokens
+        )
+        return await self._stream_and_collect_choices(
+            messages,
+            n=n,
+            temperature=temperature,
+            user_id=user_id,
+            timeout=timeout,
+            response_format=response_format,
+            max_tokens=effective_max_tokens,
+        )
+
+    async def stream_llm_response(
+        self,
+        system_prompt: str,
+        conversation_history: list[dict[str, str]],
+        *,
+        temperature: float = 0.7,
+        user_id: int | None = None,
+        timeout: float = 300.0,
+        response_format: str | None = "json_object",
+        max_tokens: int | None = None,
+    ) -> AsyncGenerator[str, None]:
+        """逐段产出模型回复的增量文本，结束时按与 get_llm_response 相同的规则校验。."""
+        messages = [{"role": "system", "content": system_prompt}, *conversation_history]
+        config = await self._resolve_llm_config(user_id)
+        finish_reason = None
+        length = 0
+        async for part in self._iter_choices(
+            config,
+            messages,
+            n=1,
+            temperature=temperature,
+            user_id=user_id,
+            timeout=timeout,
+            response_format=response_format,
+            max_tokens=(
+                max_tokens
+                if max_tokens is not None
+                else settings.llm_completion_max_tokens
+            ),
+        ):
+            if part.get("content"):
+                length += len(part["content"])
+                yield part["content"]
+            if part.get("finish_reason"):
+                finish_reason = part["finish_reason"]
+
+        if finish_reason == "length":
+            logger.warning(
+                "LLM stream truncated: model=%s user_id=%s response_length=%d",
+                config.get("model"),
+                user_id,
+                length,
+            )
+            raise HTTPException(
+                status_code=500,
+                detail=f"AI 响应因长度限制被截断（已生成 {length} 字符），请缩短输入内容或调整模型参数",
+            )
+        if not length:
+            raise HTTPException(
+                status_code=500,
+                detail=f"AI 未返回有效内容（结束原因: {finish_reason or '未知'}），请稍后重试或联系管理员",
+            )
+        await self.usage_service.increment("api_request_count")
+
     async def _stream_and_collect(
         self,
         messages: list[dict[str, str]],
@@ -98,23 +208,196 @@ class LLMService:
         response_format: str | None = None,
         max_tokens: int | None = None,
     ) -> str:
-        config = await self._resolve_llm_config(user_id)
-        client = LLMClient(api_key=config["api_key"], base_url=config.get("base_url"))
-
-        chat_messages = [
-            ChatMessage(role=msg["role"], content=msg["content"]) for msg in messages
-        ]
+        responses = await self._stream_and_collect_choices(
+            messages,
+            n=1,
+            temperature=temperature,
+            user_id=user_id,
+            timeout=timeout,
+            response_format=response_format,
+            max_tokens=max_tokens,
+        )
+        return responses[0]
 
-        full_response = ""
-        finish_reason = None
+    async def _stream_and_collect_choices(
+        self,
+        messages: list[dict[str, str]],
+        *,
+        n: int,
+        temperature: float,
+        user_id: int | None,
+        timeout: float,
+        response_format: str | None = None,
+        max_tokens: int | None = None,
+    ) -> list[str]:
+        config, shared_key = await self._select_llm_config(user_id)
+        endpoint = (config.get("base_url") or "", config.get("model") or "")
+        if n > 1 and endpoint in _single_choice_endpoints:
+            n = 1
+        # 使用系统默认 Key 时每个候选计一次请求，与逐个请求时的配额消耗一致
+        charged = 0
+        if shared_key and user_id:
+            charged = await self._enforce_daily_limit(user_id, n)
+            n = charged
 
         logger.info(
-            "Streaming LLM response: model=%s user_id=%s messages=%d",
+            "Streaming LLM response: model=%s user_id=%s messages=%d n=%d",
             config.get("model"),
             user_id,
             len(messages),
+            n,
         )
 
+        stream_options = {
+            "temperature": temperature,
+            "user_id": user_id,
+            "timeout": timeout,
+            "response_format": response_format,
+            "max_tokens": max_tokens,
+        }
+        try:
+            buffers, finish_reasons = await self._collect_choices(
+                config, messages, n=n, **stream_options
+            )
+        except BadRequestError as exc:
+            if n == 1 or not _rejects_choice_count(exc):
+                raise
+            # 服务拒绝 n 参数：记住该端点，之后直接按单候选请求
+            _single_choice_endpoints.add(endpoint)
+            logger.warning(
+                "LLM 服务不支持多候选生成，退回单候选: model=%s error=%s",
+                config.get("model"),
+                exc,
+            )
+            n = 1
+            buffers, finish_reasons = await self._collect_choices(
+                config, messages, n=1, **stream_options
+            )
+
+        # 服务实际返回的候选少于预扣次数时退还差额，由调用方补齐的请求再单独计数
+        produced = max(len(set(buffers) | set(finish_reasons)), 1)
+        if charged > produced:
+            await self.user_repo.increment_daily_request(user_id, produced - charged)
+            await self.session.commit()
+
+        if n > 1 and len(buffers) <= 1:
+            # 服务忽略了 n 参数，只返回了一个候选
+            _single_choice_endpoints.add(endpoint)
+            logger.info(
+                "LLM 服务未返回多个候选，后续改为并发请求: model=%s",
+                config.get("model"),
+            )
+
+        responses: list[str] = []
+        failure: HTTPException | None = None
+        for index in sorted(set(buffers) | set(finish_reasons)) or [0]:
+            full_response = "".join(buffers.get(index, ()))
+            finish_reason = finish_reasons.get(index)
+
+            logger.debug(
+                "LLM response collected: model=%s user_id=%s index=%d "
+                "finish_reason=%s preview=%s",
+                config.get("model"),
+                user_id,
+                index,
+                finish_reason,
+                full_response[:500],
+            )
+
+            if finish_reason == "length":
+                logger.warning(
+                    "LLM response truncated: model=%s user_id=%s index=%d "
+                    "response_length=%d",
+                    config.get("model"),
+                    user_id,
+                    index,
+                    len(full_response),
+                )
+                failure = failure or HTTPException(
+                    status_code=500,
+                    detail=f"AI 响应因长度限制被截断（已生成 {len(full_response)} 字符），请缩短输入内容或调整模型参数",
+                )
+                continue
+
+            if not full_response:
+                logger.error(
+                    "LLM returned empty response: model=%s user_id=%s index=%d "
+                    "finish_reason=%s",
+                    config.get("model"),
+                    user_id,
+                    index,
+                    finish_reason,
+                )
+                failure = failure or HTTPException(
+                    status_code=500,
+                    detail=f"AI 未返回有效内容（结束原因: {finish_reason or '未知'}），请稍后重试或联系管理员",
+                )
+                continue
+
+            responses.append(full_response)
+
+        if not responses:
+            raise failure
+
+        await self.usage_service.increment("api_request_count", len(responses))
+        logger.info(
+            "LLM response success: model=%s user_id=%s choices=%d chars=%d",
+            config.get("model"),
+            user_id,
+            len(responses),
+            sum(len(text) for text in responses),
+        )
+        return responses
+
+    async def _collect_choices(
+        self,
+        config: dict[str, str | None],
+        messages: list[dict[str, str]],
+        *,
+        n: int,
+        temperature: float,
+        user_id: int | None,
+        timeout: float,
+        response_format: str | None = None,
+        max_tokens: int | None = None,
+    ) -> tuple[dict[int, list[str]], dict[int, str]]:
+        """读取完整的流式响应，按候选序号汇总正文片段与结束原因。."""
+        buffers: dict[int, list[str]] = {}
+        finish_reasons: dict[int, str] = {}
+        async for part in self._iter_choices(
+            config,
+            messages,
+            n=n,
+            temperature=temperature,
+            user_id=user_id,
+            timeout=timeout,
+            response_format=response_format,
+            max_tokens=max_tokens,
+        ):
+            index = part.get("index") or 0
+            if part.get("content"):
+                buffers.setdefault(index, []).append(part["content"])
+            if part.get("finish_reason"):
+                finish_reasons[index] = part["finish_reason"]
+        return buffers, finish_reasons
+
+    async def _iter_choices(
+        self,
+        config: dict[str, str | None],
+        messages: list[dict[str, str]],
+        *,
+        n: int,
+        temperature: float,
+        user_id: int | None,
+        timeout: float,
+        response_format: str | None = None,
+        max_tokens: int | None = None,
+    ) -> AsyncGenerator[dict[str, Any], None]:
+        """逐个产出流式增量，并将连接类错误统一转换为 503。."""
+        client = LLMClient(api_key=config["api_key"], base_url=config.get("base_url"))
+        chat_messages = [
+            ChatMessage(role=msg["role"], content=msg["content"]) for msg in messages
+        ]
         try:
             async for part in client.stream_chat(
                 messages=chat_messages,
@@ -123,11 +406,9 @@ class LLMService:
                 timeout=int(timeout),
                 response_format=response_format,
                 max_tokens=max_tokens,
+                n=n,
             ):
-                if part.get("content"):
-                    full_response += part["content"]
-                if part.get("finish_reason"):
-                    finish_reason = part["finish_reason"]
+                yield part
         except InternalServerError as exc:
             detail = "AI 服务内部错误，请稍后重试"
             response = getattr(exc, "response", None)
@@ -175,48 +456,17 @@ class LLMService:
             )
             raise HTTPException(status_code=503, detail=detail) from exc
 
-        logger.debug(
-            "LLM response collected: model=%s user_id=%s finish_reason=%s preview=%s",
-            config.get("model"),
-            user_id,
-            finish_reason,
-            full_response[:500],
-        )
-
-        if finish_reason == "length":
-            logger.warning(
-                "LLM response truncated: model=%s user_id=%s response_length=%d",
-                config.get("model"),
-                user_id,
-                len(full_response),
-            )
-            raise HTTPException(
-                status_code=500,
-                detail=f"AI 响应因长度限制被截断（已生成 {len(full_response)} 字符），请缩短输入内容或调整模型参数",
-            )
-
-        if not full_response:
-            logger.error(
-                "LLM returned empty response: model=%s user_id=%s finish_reason=%s",
-                config.get("model"),
-                user_id,
-                finish_reason,
-            )
-            raise HTTPException(
-                status_code=500,
-                detail=f"AI 未返回有效内容（结束原因: {finish_reason or '未知'}），请稍后重试或联系管理员",
-            )
-
-        await self.usage_service.increment("api_request_count")
-        logger.info(
-            "LLM response success: model=%s user_id=%s chars=%d",
-            config.get("model"),
-            user_id,
-            len(full_response),
-        )
-        return full_response
-
     async def _resolve_llm_config(self, user_id: int | None) -> dict[str, str | None]:
+        config, shared_key = await self._select_llm_config(user_id)
+        # 检查每日使用次数限制
+        if shared_key and user_id:
+            await self._enforce_daily_limit(user_id)
+        return config
+
+    async def _select_llm_config(
+        self, user_id: int | None
+    ) -> tuple[dict[str, str | None], bool]:
+        """返回模型配置，以及是否使用系统默认 Key（需计入每日配额）。."""
         if user_id:
             config = await self.llm_repo.get_by_user(user_id)
             if config and config.llm_provider_api_key:
@@ -224,11 +474,7 @@ class LLMService:
                     "api_key": config.llm_provider_api_key,
                     "base_url": config.llm_provider_url,
                     "model": config.llm_provider_model,
-                }
-
-        # 检查每日使用次数限制
-        if user_id:
-            await self._enforce_daily_limit(user_id)
+                }, False
 
         api_key = await self._get_config_value("llm.api_key")
         base_url = await self._get_config_value("llm.base_url")
@@ -243,7 +489,7 @@ class LLMService:
                 detail="未配置默认 LLM API Key，请联系管理员配置系统默认 API Key 或在个人设置中配置自定义 API Key",
             )
 
-        return {"api_key": api_key, "base_url": base_url, "model": model}
+        return {"api_key": api_key, "base_url": base_url, "model": model}, True
 
     async def get_embedding(
         self,
@@ -252,14 +498,49 @@ class LLMService:
         user_id: int | None = None,
         model: str | None = None,
     ) -> list[float]:
-        """生成文本向量，用于章节 RAG 检索，支持 openai 与 ollama 双提供方。."""
+        """生成文本向量，用于章节 RAG 检索，支持 openai 与 ollama 双提供方。.
+
+        启用嵌入缓存时先按内容哈希查询缓存，未命中才请求嵌入接口。
+        """
         provider = settings.embedding_provider
         target_model = model or (
             settings.ollama_embedding_model
             if provider == "ollama"
             else settings.embedding_model
         )
+        if not settings.embedding_cache_enabled:
+            return await self._request_embedding(
+                text, provider=provider, target_model=target_model, user_id=user_id
+            )
+
+        cache_key = self._embedding_cache_key(provider, target_model, text)
+        cached = await embedding_cache.get_many([cache_key])
+        if cache_key in cached:
+            embedding = cached[cache_key]
+            self._embedding_dimensions[target_model] = len(embedding)
+            return embedding
+
+        embedding = await self._request_embedding(
+            text, provider=provider, target_model=target_model, user_id=user_id
+        )
+        if embedding:
+            await embedding_cache.put_many({cache_key: embedding})
+        return embedding
 
+    @staticmethod
+    def _embedding_cache_key(provider: str, target_model: str, text: str) -> str:
+        return embedding_cache.make_key(
+            f"{provider}:{target_model}", settings.embedding_model_vector_size, text
+        )
+
+    async def _request_embedding(
+        self,
+        text: str,
+        *,
+        provider: str,
+        target_model: str,
+        user_id: int | None,
+    ) -> list[float]:
         if provider == "ollama":
             if OllamaAsyncClient is None:
                 logger.error("未安装 ollama 依赖，无法调用本地嵌入模型。")
@@ -271,7 +552,7 @@ class LLMService:
                 settings.ollama_embedding_base_url or settings.embedding_base_url
             )
             base_url = str(base_url_any) if base_url_any else None
-            client = OllamaAsyncClient(host=base_url)
+            client = llm_client_registry.get_ollama_client(base_url)
             try:
                 response = await client.embeddings(model=target_model, prompt=text)
             except Exception as exc:  # pragma: no cover - 本地服务调用失败
@@ -298,7 +579,7 @@ class LLMService:
             api_key = settings.embedding_api_key or config["api_key"]
             base_url_setting = settings.embedding_base_url or config.get("base_url")
             base_url = str(base_url_setting) if base_url_setting else None
-            client = AsyncOpenAI(api_key=api_key, base_url=base_url)
+            client = llm_client_registry.get_openai_client(api_key, base_url)
             try:
                 response = await client.embeddings.create(
                     input=text,
@@ -333,6 +614,177 @@ class LLMService:
             self._embedding_dimensions[target_model] = dimension
         return embedding
 
+    async def get_embeddings(
+        self,
+        texts: list[str],
+        *,
+        user_id: int | None = None,
+        model: str | None = None,
+        batch_size: int | None = None,
+    ) -> list[list[float]]:
+        """批量生成文本向量，结果与输入一一对应，失败的条目返回空列表。.
+
+        输入按 batch_size 切分为多个批次，批次之间受
+        embedding_batch_concurrency 限制并发，单章入库通常只需一两次请求。
+        """
+        if not texts:
+            return []
+
+        provider = settings.embedding_provider
+        target_model = model or (
+            settings.ollama_embedding_model
+            if provider == "ollama"
+            else settings.embedding_model
+        )
+        if not settings.embedding_cache_enabled:
+            return await self._request_embeddings(
+                texts,
+                provider=provider,
+                target_model=target_model,
+                user_id=user_id,
+                batch_size=batch_size,
+            )
+
+        keys = [self._embedding_cache_key(provider, target_model, t) for t in texts]
+        cached = await embedding_cache.get_many(keys)
+        # 同一批次内的重复文本只请求一次
+        missing_keys: list[str] = []
+        missing_texts: list[str] = []
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing_keys:
+                missing_keys.append(key)
+                missing_texts.append(text)
+
+        if missing_texts:
+            fresh = await self._request_embeddings(
+                missing_texts,
+                provider=provider,
+                target_model=target_model,
+                user_id=user_id,
+                batch_size=batch_size,
+            )
+            computed = {
+                key: vector for key, vector in zip(missing_keys, fresh) if vector
+            }
+            await embedding_cache.put_many(computed)
+            cached.update(computed)
+        else:
+            dimension = next((len(v) for v in cached.values() if v), 0)
+            if dimension:
+                self._embedding_dimensions[target_model] = dimension
+
+        logger.debug(
+            "批量嵌入缓存命中: model=%s total=%d hits=%d",
+            target_model,
+            len(texts),
+            len(texts) - len(missing_texts),
+        )
+        return [cached.get(key, []) for key in keys]
+
+    async def _request_embeddings(
+        self,
+        texts: list[str],
+        *,
+        provider: str,
+        target_model: str,
+        user_id: int | None,
+        batch_size: int | None,
+    ) -> list[list[float]]:
+        size = max(1, batch_size or settings.embedding_batch_size)
+        batches = [
+            (start, texts[start : start + size]) for start in range(0, len(texts), size)
+        ]
+
+        if provider == "ollama":
+            if OllamaAsyncClient is None:
+                logger.error("未安装 ollama 依赖，无法调用本地嵌入模型。")
+                raise HTTPException(
+                    status_code=500, detail="缺少 Ollama 依赖，请先安装 ollama 包。"
+                )
+            base_url_any = (
+                settings.ollama_embedding_base_url or settings.embedding_base_url
+            )
+            base_url = str(base_url_any) if base_url_any else None
+            client = llm_client_registry.get_ollama_client(base_url)
+
+            async def _embed_batch(batch: list[str]) -> list[list[float]]:
+                try:
+                    response = await client.embed(model=target_model, input=batch)
+                except Exception as exc:  # pragma: no cover - 本地服务调用失败
+                    logger.error(
+                        "Ollama 批量嵌入请求失败: model=%s base_url=%s size=%d error=%s",
+                        target_model,
+                        base_url,
+                        len(batch),
+                        exc,
+                        exc_info=True,
+                    )
+                    return [[] for _ in batch]
+                if isinstance(response, dict):
+                    vectors = response.get("embeddings") or []
+                else:
+                    vectors = getattr(response, "embeddings", None) or []
+                return [list(vector) if vector else [] for vector in vectors]
+
+        else:
+            # 批量请求只解析一次配置，避免每个片段都触发一次配额计数
+            config = await self._resolve_llm_config(user_id)
+            api_key = settings.embedding_api_key or config["api_key"]
+            base_url_setting = settings.embedding_base_url or config.get("base_url")
+            base_url = str(base_url_setting) if base_url_setting else None
+            client = llm_client_registry.get_openai_client(api_key, base_url)
+
+            async def _embed_batch(batch: list[str]) -> list[list[float]]:
+                try:
+                    response = await client.embeddings.create(
+                        input=batch,
+                        model=target_model,
+                    )
+                except Exception as exc:  # pragma: no cover - 网络或鉴权失败
+                    logger.error(
+                        "OpenAI 批量嵌入请求失败: model=%s base_url=%s user_id=%s size=%d error=%s",
+                        target_model,
+                        base_url,
+                        user_id,
+                        len(batch),
+                        exc,
+                        exc_info=True,
+                    )
+                    return [[] for _ in batch]
+                vectors: list[list[float]] = [[] for _ in batch]
+                for position, item in enumerate(response.data or []):
+                    index = getattr(item, "index", position)
+                    if 0 <= index < len(batch) and item.embedding:
+                        vectors[index] = list(item.embedding)
+                return vectors
+
+        semaphore = asyncio.Semaphore(max(1, settings.embedding_batch_concurrency))
+
+        async def _run(batch: list[str]) -> list[list[float]]:
+            async with semaphore:
+                return await _embed_batch(batch)
+
+        results = await asyncio.gather(*(_run(batch) for _, batch in batches))
+
+        embeddings: list[list[float]] = [[] for _ in texts]
+        for (start, batch), vectors in zip(batches, results):
+            for offset in range(len(batch)):
+                if offset < len(vectors):
+                    embeddings[start + offset] = vectors[offset]
+
+        dimension = next((len(vector) for vector in embeddings if vector), 0)
+        if dimension:
+            self._embedding_dimensions[target_model] = dimension
+        missing = sum(1 for vector in embeddings if not vector)
+        logger.debug(
+            "批量嵌入完成: model=%s total=%d batches=%d missing=%d",
+            target_model,
+            len(texts),
+            len(batches),
+            missing,
+        )
+        return embeddings
+
     def get_embedding_dimension(self, model: str | None = None) -> int | None:
         """获取嵌入向量维度，优先返回缓存结果，其次读取配置。."""
         target_model = model or (
@@ -344,7 +796,20 @@ class LLMService:
             return self._embedding_dimensions[target_model]
         return settings.embedding_model_vector_size
 
-    async def _enforce_daily_limit(self, user_id: int) -> None:
+    async def remaining_daily_requests(self, user_id: int | None) -> int | None:
+        """返回用户今日剩余的模型调用次数；使用自有 API Key 或无用户时返回 None。."""
+        if not user_id:
+            return None
+        config = await self.llm_repo.get_by_user(user_id)
+        if config and config.llm_provider_api_key:
+            return None
+        limit_str = await self.admin_setting_service.get("daily_request_limit", "100")
+        limit = int(limit_str or 10)
+        used = await self.user_repo.get_daily_request(user_id)
+        return max(0, limit - used)
+
+    async def _enforce_daily_limit(self, user_id: int, count: int = 1) -> int:
+        """扣减每日配额，剩余次数不足 count 时只扣剩余部分，返回实际扣减的次数。."""
         limit_str = await self.admin_setting_service.get("daily_request_limit", "100")
         limit = int(limit_str or 10)
         used = await self.user_repo.get_daily_request(user_id)
@@ -353,8 +818,10 @@ class LLMService:
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail="今日请求次数已达上限，请明日再试或设置自定义 API Key。",
             )
-        await self.user_repo.increment_daily_request(user_id)
+        charged = min(count, limit - used)
+        await self.user_repo.increment_daily_request(user_id, charged)
         await self.session.commit()
+        return charged
 
     async def _get_config_value(self, key: str) -> str | None:
         record = await self.system_config_repo.get_by_key(key)
@@ -0,0 +1,614 @@
+from __future__ import annotations
+
+"""
+嵌入式本地向量索引：为单机 SQLite 部署提供无需向量服务的检索能力。
+
+存储结构（每个项目、每类向量一个目录）：
+- manifest.json：向量维度与段列表
+- 000001.f32 / 000001.jsonl：只追加的段文件，分别保存 float32 矩阵与每行载荷
+- tombstones.jsonl：删除标记，记录被删除行所在的 (段, 行号)
+
+查询时以内存映射方式读取段文件并做矩阵运算；行数较多时自动构建 IVF 倒排索引，
+仅扫描最相近的若干聚类。失效行比例超过阈值时触发压缩，重写为单个新段。
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import math
+import re
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Sequence
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_MANIFEST = "manifest.json"
+_TOMBSTONES = "tombstones.jsonl"
+
+
+class _Segment:
+    """只追加的向量段，矩阵部分通过 np.memmap 按需映射。."""
+
+    __slots__ = ("name", "payloads", "alive", "_matrix", "_norms")
+
+    def __init__(self, name: str, payloads: list[dict[str, Any]]) -> None:
+        self.name = name
+        self.payloads = payloads
+        self.alive = np.ones(len(payloads), dtype=bool)
+        self._matrix = None
+        self._norms = None
+
+    @property
+    def rows(self) -> int:
+        return len(self.payloads)
+
+    def matrix(self, root: Path, dim: int) -> Any:
+        if self._matrix is None or self._matrix.shape[0] != self.rows:
+            if self.rows == 0:
+                self._matrix = np.zeros((0, dim), dtype=np.float32)
+            else:
+                self._matrix = np.memmap(
+                    root / f"{self.name}.f32",
+                    dtype=np.float32,
+                    mode="r",
+                    shape=(self.rows, dim),
+                )
+            self._norms = None
+        return self._matrix
+
+    def norms(self, root: Path, dim: int) -> Any:
+        matrix = self.matrix(root, dim)
+        if self._norms is None:
+            self._norms = np.linalg.norm(matrix, axis=1)
+        return self._norms
+
+    def grow(self, payloads: list[dict[str, Any]]) -> None:
+        self.payloads.extend(payloads)
+        self.alive = np.concatenate(
+            [self.alive, np.ones(len(payloads), dtype=bool)]
+        )
+        self._matrix = None
+        self._norms = None
+
+    def release(self) -> None:
+        self._matrix = None
+        self._norms = None
+
+
+class _IVFIndex:
+    """简易 IVF 倒排索引：球面 k-means 聚类 + 按质心探测。."""
+
+    __slots__ = ("centroids", "lists", "covered")
+
+    def __init__(
+        self,
+        centroids: Any,
+        lists: list[Any],
+        covered: dict[str, int],
+    ) -> None:
+        self.centroids = centroids
+        self.lists = lists
+        # 记录构建时每个段已覆盖的行数，之后追加的行按暴力方式补扫
+        self.covered = covered
+
+
+class _Collection:
+    """单个项目下一类向量（片段或摘要）的段式存储。."""
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        segment_rows: int,
+        compact_ratio: float,
+        ivf_min_rows: int,
+        ivf_nprobe: int,
+    ) -> None:
+        self._path = path
+        self._segment_rows = segment_rows
+        self._compact_ratio = compact_ratio
+        self._ivf_min_rows = ivf_min_rows
+        self._ivf_nprobe = ivf_nprobe
+        self._dim = 0
+        self._segments: list[_Segment] = []
+        self._next_seq = 1
+        self._positions: dict[str, tuple[int, int]] = {}
+        self._dead_rows = 0
+        self._ivf: _IVFIndex | None = None
+        self._load()
+
+    # -------------------- 读取与恢复 --------------------
+    def _load(self) -> None:
+        manifest_path = self._path / _MANIFEST
+        if not manifest_path.exists():
+            return
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        self._dim = int(manifest.get("dim") or 0)
+        self._next_seq = int(manifest.get("next_seq") or 1)
+        row_bytes = self._dim * 4
+        for name in manifest.get("segments", []):
+            payload_file = self._path / f"{name}.jsonl"
+            payloads, line_ends = self._read_payloads(payload_file)
+            vector_file = self._path / f"{name}.f32"
+            stored_rows = (
+                vector_file.stat().st_size // row_bytes
+                if row_bytes and vector_file.exists()
+                else 0
+            )
+            # 进程异常退出时两个文件可能不一致，以较短者为准，
+            # 并截掉多出的部分，否则之后追加的行会与载荷错位
+            rows = min(len(payloads), stored_rows)
+            self._truncate(vector_file, rows * row_bytes)
+            self._truncate(payload_file, line_ends[rows - 1] if rows else 0)
+            self._segments.append(_Segment(name, payloads[:rows]))
+
+        for seg_idx, segment in enumerate(self._segments):
+            for row, payload in enumerate(segment.payloads):
+                self._claim(payload.get("id"), (seg_idx, row))
+
+        tombstone_path = self._path / _TOMBSTONES
+        if tombstone_path.exists():
+            seg_index = {
+                segment.name: idx for idx, segment in enumerate(self._segments)
+            }
+            for line in tombstone_path.read_text(encoding="utf-8").splitlines():
+                try:
+                    name, row = json.loads(line)
+                except (ValueError, TypeError):
+                    continue
+                seg_idx = seg_index.get(name)
+                if seg_idx is None or row >= self._segments[seg_idx].rows:
+                    continue
+                self._kill((seg_idx, row))
+
+    @staticmethod
+    def _read_payloads(path: Path) -> tuple[list[dict[str, Any]], list[int]]:
+        """读取载荷行，同时返回每行结束处的字节偏移，供截断恢复使用。."""
+        if not path.exists():
+            return [], []
+        data = path.read_bytes()
+        payloads: list[dict[str, Any]] = []
+        line_ends: list[int] = []
+        start = 0
+        while (end := data.find(b"\n", start)) >= 0:
+            try:
+                payloads.append(json.loads(data[start:end]))
+            except ValueError:
+                # 末尾可能存在写入一半的行，之后的数据视为无效
+                break
+            start = end + 1
+            line_ends.append(start)
+        return payloads, line_ends
+
+    @staticmethod
+    def _truncate(path: Path, size: int) -> None:
+        if not path.exists() or path.stat().st_size <= size:
+            return
+        with open(path, "r+b") as fh:
+            fh.truncate(size)
+        logger.warning(
+            "本地向量索引已截断未完整写入的数据: path=%s size=%d", path, size
+        )
+
+    def _claim(self, record_id: str | None, position: tuple[int, int]) -> None:
+        if not record_id:
+            self._kill(position)
+            return
+        previous = self._positions.get(record_id)
+        if previous is not None:
+            self._kill(previous)
+        self._positions[record_id] = position
+
+    def _kill(self, position: tuple[int, int]) -> None:
+        seg_idx, row = position
+        segment = self._segments[seg_idx]
+        if not segment.alive[row]:
+            return
+        segment.alive[row] = False
+        self._dead_rows += 1
+        record_id = segment.payloads[row].get("id")
+        if record_id and self._positions.get(record_id) == position:
+            del self._positions[record_id]
+
+    # -------------------- 写入 --------------------
+    def upsert(
+        self, records: Sequence[tuple[dict[str, Any], Sequence[float]]]
+    ) -> int:
+        """追加写入记录，同 ID 的旧行自动失效；返回实际写入的行数。."""
+        if not records:
+            return 0
+        if not self._dim:
+            self._dim = len(records[0][1])
+        accepted = [
+            (payload, vector)
+            for payload, vector in records
+            if len(vector) == self._dim
+        ]
+        if len(accepted) != len(records):
+            logger.warning(
+                "本地向量索引维度不一致，已跳过部分记录: path=%s expected=%d skipped=%d",
+                self._path,
+                self._dim,
+                len(records) - len(accepted),
+            )
+        if not accepted:
+            return 0
+
+        self._path.mkdir(parents=True, exist_ok=True)
+        start = 0
+        while start < len(accepted):
+            segment = self._writable_segment()
+            room = self._segment_rows - segment.rows
+            batch = accepted[start : start + room]
+            start += len(batch)
+            matrix = np.asarray([vector for _, vector in batch], dtype=np.float32)
+            # 先写向量再写载荷：恢复时以两者较短者为准，保证行对齐
+            with open(self._path / f"{segment.name}.f32", "ab") as fh:
+                fh.write(matrix.tobytes())
+            payload_path = self._path / f"{segment.name}.jsonl"
+            with open(payload_path, "a", encoding="utf-8") as fh:
+                for payload, _ in batch:
+                    fh.write(json.dumps(payload, ensure_ascii=False) + "\n")
+            seg_idx = len(self._segments) - 1
+            first_row = segment.rows
+            segment.grow([payload for payload, _ in batch])
+            for offset, (payload, _) in enumerate(batch):
+                self._claim(payload.get("id"), (seg_idx, first_row + offset))
+        self._write_manifest()
+        self._maybe_compact()
+        return len(accepted)
+
+    def delete(self, predicate: Callable[[dict[str, Any]], bool]) -> int:
+        """按条件删除存活记录，写入删除标记；返回删除的行数。."""
+        victims = [
+            position
+            for position in self._positions.values()
+            if predicate(self._segments[position[0]].payloads[position[1]])
+        ]
+        if not victims:
+            return 0
+        with open(self._path / _TOMBSTONES, "a", encoding="utf-8") as fh:
+            for seg_idx, row in victims:
+                fh.write(json.dumps([self._segments[seg_idx].name, row]) + "\n")
+        for position in victims:
+            self._kill(position)
+        self._maybe_compact()
+        return len(victims)
+
+    def _writable_segment(self) -> _Segment:
+        if self._segments and self._segments[-1].rows < self._segment_rows:
+            return self._segments[-1]
+        name = f"{self._next_seq:06d}"
+        self._next_seq += 1
+        # 清理上次异常退出时可能遗留的同名孤儿文件
+        for suffix in (".f32", ".jsonl"):
+            (self._path / f"{name}{suffix}").unlink(missing_ok=True)
+        segment = _Segment(name, [])
+        self._segments.append(segment)
+        return segment
+
+    def _write_manifest(self) -> None:
+        manifest = {
+            "dim": self._dim,
+            "next_seq": self._next_seq,
+            "segments": [segment.name for segment in self._segments],
+        }
+        tmp_path = self._path / f"{_MANIFEST}.tmp"
+        tmp_path.write_text(json.dumps(manifest), encoding="utf-8")
+        tmp_path.replace(self._path / _MANIFEST)
+
+    # -------------------- 压缩 --------------------
+    def _maybe_compact(self) -> None:
+        total = sum(segment.rows for segment in self._segments)
+        if total and self._dead_rows >= max(64, total * self._compact_ratio):
+            self.compact()
+
+    def compact(self) -> None:
+        """把全部存活行重写进新段，删除旧段与删除标记。."""
+        live = sorted(self._positions.values())
+        old_segments = self._segments
+        payloads = [old_segments[seg_idx].payloads[row] for seg_idx, row in live]
+        new_segments: list[_Segment] = []
+        for start in range(0, len(live), self._segment_rows):
+            batch = live[start : start + self._segment_rows]
+            name = f"{self._next_seq:06d}"
+            self._next_seq += 1
+            with open(self._path / f"{name}.f32", "wb") as fh:
+                for seg_idx, row in batch:
+                    matrix = old_segments[seg_idx].matrix(self._path, self._dim)
+                    fh.write(np.ascontiguousarray(matrix[row]).tobytes())
+            with open(self._path / f"{name}.jsonl", "w", encoding="utf-8") as fh:
+                for payload in payloads[start : start + len(batch)]:
+                    fh.write(json.dumps(payload, ensure_ascii=False) + "\n")
+            new_segments.append(_Segment(name, payloads[start : start + len(batch)]))
+
+        for segment in old_segments:
+            segment.release()
+        self._segments = new_segments
+        self._positions = {}
+        self._dead_rows = 0
+        self._ivf = None
+        for seg_idx, segment in enumerate(self._segments):
+            for row, payload in enumerate(segment.payloads):
+                self._positions[payload["id"]] = (seg_idx, row)
+        # 新清单落盘后旧段即不可达，再清理旧文件
+        self._write_manifest()
+        (self._path / _TOMBSTONES).unlink(missing_ok=True)
+        for segment in old_segments:
+            for suffix in (".f32", ".jsonl"):
+                (self._path / f"{segment.name}{suffix}").unlink(missing_ok=True)
+        logger.info(
+            "本地向量索引已压缩: path=%s live=%d segments=%d",
+            self._path,
+            len(live),
+            len(self._segments),
+        )
+
+    # -------------------- 查询 --------------------
+    def count(self) -> int:
+        return len(self._positions)
+
+    def payloads(
+        self, predicate: Callable[[dict[str, Any]], bool]
+    ) -> list[dict[str, Any]]:
+        return [
+            payload
+            for seg_idx, row in self._positions.values()
+            if predicate(payload := self._segments[seg_idx].payloads[row])
+        ]
+
+    def search(
+        self, embedding: Sequence[float], top_k: int
+    ) -> list[tuple[dict[str, Any], float]]:
+        """返回余弦距离最小的 top_k 条载荷。."""
+        if top_k <= 0 or not self._positions or len(embedding) != self._dim:
+            return []
+        query = np.asarray(embedding, dtype=np.float32)
+        query_norm = float(np.linalg.norm(query))
+        if query_norm == 0:
+            return []
+
+        ivf = self._ensure_ivf()
+        candidates: list[tuple[float, int, int]] = []
+        for seg_idx, segment in enumerate(self._segments):
+            if not segment.alive.any():
+                continue
+            rows = self._candidate_rows(ivf, seg_idx, segment, query)
+            if rows is not None and rows.size == 0:
+                continue
+            matrix = segment.matrix(self._path, self._dim)
+            norms = segment.norms(self._path, self._dim)
+            alive = segment.alive
+            if rows is not None:
+                matrix, norms, alive = matrix[rows], norms[rows], alive[rows]
+            denom = norms * query_norm
+            dots = matrix @ query
+            similarity = np.divide(
+                dots, denom, out=np.zeros_like(dots), where=denom > 0
+            )
+            distances = np.where(alive, 1.0 - similarity, np.inf)
+            k = min(top_k, distances.size)
+            if k < distances.size:
+                picked = np.argpartition(distances, k - 1)[:k]
+            else:
+                picked = np.arange(distances.size)
+            for pos in picked:
+                distance = float(distances[pos])
+                if math.isinf(distance):
+                    continue
+                row = int(rows[pos]) if rows is not None else int(pos)
+                candidates.append((distance, seg_idx, row))
+
+        best = heapq.nsmallest(top_k, candidates)
+        return [
+            (self._segments[seg_idx].payloads[row], distance)
+            for distance, seg_idx, row in best
+        ]
+
+    def _candidate_rows(
+        self, ivf: _IVFIndex | None, seg_idx: int, segment: _Segment, query: Any
+    ) -> Any:
+        """IVF 可用时返回该段需要扫描的行号，None 表示整段扫描。."""
+        if ivf is None:
+            return None
+        covered = ivf.covered.get(segment.name, 0)
+        scores = ivf.centroids @ query
+        nprobe = min(self._ivf_nprobe, len(ivf.lists))
+        probes = np.argpartition(-scores, nprobe - 1)[:nprobe]
+        parts = []
+        for probe in probes:
+            entries = ivf.lists[int(probe)]
+            parts.append(entries[entries[:, 0] == seg_idx, 1])
+        if covered < segment.rows:
+            parts.append(np.arange(covered, segment.rows))
+        if not parts:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(parts))
+
+    def _ensure_ivf(self) -> _IVFIndex | None:
+        live = len(self._positions)
+        if not self._ivf_min_rows or live < self._ivf_min_rows:
+            self._ivf = None
+            return None
+        if self._ivf is not None:
+            covered_rows = sum(self._ivf.covered.values())
+            total_rows = sum(segment.rows for segment in self._segments)
+            # 新增行过多时重建，避免补扫部分退化为暴力检索
+            if total_rows - covered_rows <= covered_rows * 0.25:
+                return self._ivf
+        self._ivf = self._build_ivf()
+        return self._ivf
+
+    def _build_ivf(self) -> _IVFIndex:
+        positions = np.asarray(sorted(self._positions.values()), dtype=np.int64)
+        vectors = np.empty((len(positions), self._dim), dtype=np.float32)
+        for seg_idx, segment in enumerate(self._segments):
+            mask = positions[:, 0] == seg_idx
+            if mask.any():
+                matrix = segment.matrix(self._path, self._dim)
+                vectors[mask] = matrix[positions[mask, 1]]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = np.divide(
+            vectors, norms, out=np.zeros_like(vectors), where=norms > 0
+        )
+
+        nlist = max(1, int(math.sqrt(len(positions))))
+        rng = np.random.default_rng(0)
+        sample_size = min(len(positions), nlist * 64)
+        sample = vectors[rng.choice(len(positions), size=sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, size=nlist, replace=False)].copy()
+        for _ in range(8):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for idx in range(nlist):
+                members = sample[assign == idx]
+                if len(members):
+                    center = members.sum(axis=0)
+                    norm = np.linalg.norm(center)
+                    if norm > 0:
+                        centroids[idx] = center / norm
+
+        assign = np.empty(len(positions), dtype=np.int64)
+        for start in range(0, len(positions), 8192):
+            block = vectors[start : start + 8192]
+            scores = block @ centroids.T
+            assign[start : start + len(block)] = np.argmax(scores, axis=1)
+        lists = [positions[assign == idx] for idx in range(nlist)]
+        covered = {segment.name: segment.rows for segment in self._segments}
+        logger.info(
+            "本地向量索引已构建 IVF: path=%s rows=%d nlist=%d",
+            self._path,
+            len(positions),
+            nlist,
+        )
+        return _IVFIndex(centroids, lists, covered)
+
+    def release(self) -> None:
+        for segment in self._segments:
+            segment.release()
+        self._ivf = None
+
+
+class LocalVectorIndex:
+    """按项目划分目录的本地向量索引，供 VectorStoreService 的 local 提供方使用。.
+
+    所有磁盘与矩阵运算都放到线程池执行，并按集合加锁串行化读写。
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        segment_rows: int,
+        compact_ratio: float,
+        ivf_min_rows: int,
+        ivf_nprobe: int,
+        max_open_collections: int = 64,
+    ) -> None:
+        self._root = root
+        self._options = {
+            "segment_rows": segment_rows,
+            "compact_ratio": compact_ratio,
+            "ivf_min_rows": ivf_min_rows,
+            "ivf_nprobe": ivf_nprobe,
+        }
+        self._max_open = max_open_collections
+        self._collections: OrderedDict[tuple[str, str], _Collection] = OrderedDict()
+        # 集合锁只在有请求使用时保留，按引用计数清理
+        self._locks: dict[tuple[str, str], asyncio.Lock] = {}
+        self._lock_users: dict[tuple[str, str], int] = {}
+        self._root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def _safe_name(project_id: str) -> str:
+        return re.sub(r"[^0-9A-Za-z_.-]", "_", project_id)
+
+    def _acquire_lock(self, key: tuple[str, str]) -> asyncio.Lock:
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        self._lock_users[key] = self._lock_users.get(key, 0) + 1
+        return lock
+
+    def _release_lock(self, key: tuple[str, str]) -> None:
+        users = self._lock_users[key] - 1
+        if users:
+            self._lock_users[key] = users
+        else:
+            del self._lock_users[key]
+            del self._locks[key]
+
+    async def _run(
+        self, kind: str, project_id: str, func: Callable[[_Collection], Any]
+    ) -> Any:
+        key = (kind, project_id)
+        lock = self._acquire_lock(key)
+        try:
+            async with lock:
+                collection = self._collections.get(key)
+                if collection is None:
+                    path = self._root / self._safe_name(project_id) / kind
+                    collection = await asyncio.to_thread(
+                        _Collection, path, **self._options
+                    )
+                    self._collections[key] = collection
+                    while len(self._collections) > self._max_open:
+                        _, evicted = self._collections.popitem(last=False)
+                        evicted.release()
+                else:
+                    self._collections.move_to_end(key)
+                return await asyncio.to_thread(func, collection)
+        finally:
+            self._release_lock(key)
+
+    async def search(
+        self, kind: str, project_id: str, embedding: Sequence[float], top_k: int
+    ) -> list[tuple[dict[str, Any], float]]:
+        return await self._run(kind, project_id, lambda c: c.search(embedding, top_k))
+
+    async def upsert(
+        self,
+        kind: str,
+        project_id: str,
+        records: Sequence[tuple[dict[str, Any], Sequence[float]]],
+    ) -> int:
+        return await self._run(kind, project_id, lambda c: c.upsert(records))
+
+    async def delete(
+        self,
+        kind: str,
+        project_id: str,
+        predicate: Callable[[dict[str, Any]], bool],
+    ) -> int:
+        return await self._run(kind, project_id, lambda c: c.delete(predicate))
+
+    async def payloads(
+        self,
+        kind: str,
+        project_id: str,
+        predicate: Callable[[dict[str, Any]], bool],
+    ) -> list[dict[str, Any]]:
+        return await self._run(kind, project_id, lambda c: c.payloads(predicate))
+
+    async def count(self, kind: str, project_id: str) -> int:
+        return await self._run(kind, project_id, lambda c: c.count())
+
+    async def compact(self, kind: str, project_id: str) -> None:
+        await self._run(kind, project_id, lambda c: c.compact())
+
+    def project_ids(self) -> Iterable[str]:
+        """列出磁盘上存在索引的项目目录名。."""
+        return [path.name for path in self._root.iterdir() if path.is_dir()]
+
+    def close(self) -> None:
+        """释放全部内存映射，供应用关闭时调用。."""
+        for collection in self._collections.values():
+            collection.release()
+        self._collections.clear()
+
+
+__all__ = ["LocalVectorIndex"]
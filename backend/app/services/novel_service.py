@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import base64
 import json
 import logging
 import uuid
@@ -23,6 +24,29 @@ _PREFERRED_CONTENT_KEYS: tuple[str, ...] = (
 )
 
 
+def _as_utc(value: datetime | None) -> datetime | None:
+    """带时区的时间统一换算为 UTC，与库中存储的 updated_at 保持一致。."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(UTC)
+
+
+def _encode_cursor(updated_at: datetime, project_id: str) -> str:
+    payload = json.dumps({"u": updated_at.isoformat(), "id": project_id})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """解析分页游标，格式错误时返回 400。."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return _as_utc(datetime.fromisoformat(payload["u"])), str(payload["id"])
+    except (ValueError, TypeError, KeyError, UnicodeEncodeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="无效的分页游标"
+        ) from exc
+
+
 def _normalize_version_content(raw_content: Any, metadata: Any) -> str:
     text = _coerce_text(metadata)
     if not text:
@@ -75,7 +99,7 @@ def _clean_string(text: str) -> str:
 
 
 from fastapi import HTTPException, status
-from sqlalchemy import delete, func, select, update
+from sqlalchemy import delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models import (
@@ -91,11 +115,13 @@ from ..models import (
     VolumeOutline,
 )
 from ..repositories.novel_repository import NovelRepository
-from ..schemas.admin import AdminNovelSummary
+from ..schemas.admin import AdminNovelPage, AdminNovelSummary
 from ..schemas.novel import (
     Blueprint,
     ChapterGenerationStatus,
+    ChapterVersionContent,
     MajorArc,
+    NovelProjectPage,
     NovelProjectSummary,
     NovelSectionResponse,
     NovelSectionType,
@@ -108,6 +134,12 @@ from ..schemas.novel import (
 from ..schemas.novel import (
     NovelProject as NovelProjectSchema,
 )
+from .section_cache import section_cache
+
+# 只需要三层蓝图（总体框架、分卷、情节事件）的区段
+_LAYERED_SECTIONS = frozenset(
+    {NovelSectionType.VOLUME_MANAGEMENT, NovelSectionType.THREE_LAYER_BLUEPRINT}
+)
 
 
 class NovelService:
@@ -136,21 +168,37 @@ class NovelService:
         return project
 
     async def ensure_project_owner(self, project_id: str, user_id: int) -> NovelProject:
-        project = await self.repo.get_by_id(project_id)
+        """校验项目归属，只读取项目本身一行；需要关联数据时使用对应的加载方法。."""
+        project = await self.repo.get_project(project_id)
+        return self._check_project_access(project, user_id)
+
+    @staticmethod
+    def _check_project_access(
+        project: NovelProject | None, user_id: int | None
+    ) -> NovelProject:
+        """项目不存在时返回 404，user_id 不为空且不是所有者时返回 403。."""
         if not project:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="项目不存在"
             )
-        if project.user_id != user_id:
+        if user_id is not None and project.user_id != user_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, detail="无权访问该项目"
             )
         return project
 
+    async def get_project_revision(self, project_id: str, user_id: int | None) -> int:
+        """只读取项目修订号并校验归属，user_id 为空时不校验（管理员）。."""
+        row = await self.repo.get_revision(project_id)
+        self._check_project_access(row, user_id)
+        return row.revision
+
     async def get_project_schema(
         self, project_id: str, user_id: int
     ) -> NovelProjectSchema:
-        project = await self.ensure_project_owner(project_id, user_id)
+        project = self._check_project_access(
+            await self.repo.get_by_id(project_id), user_id
+        )
         return await self._serialize_project(project)
 
     async def get_section_data(
@@ -159,9 +207,31 @@ class NovelService:
         user_id: int,
         section: NovelSectionType,
     ) -> NovelSectionResponse:
-        project = await self.ensure_project_owner(project_id, user_id)
+        project = self._check_project_access(
+            await self._load_section_project(project_id, section), user_id
+        )
         return self._build_section_response(project, section)
 
+    async def get_section_payload(
+        self,
+        project_id: str,
+        user_id: int,
+        section: NovelSectionType,
+        revision: int,
+    ) -> bytes:
+        """返回区段响应的 JSON，序列化结果按项目修订号缓存。.
+
+        修订号需先于区段数据读取（见 get_project_revision）：期间若有写入，
+        缓存的数据只会比修订号新，不会把旧数据记在新修订号下。
+        """
+        cached = section_cache.get(project_id, section.value, revision)
+        if cached is not None:
+            return cached
+        data = await self.get_section_data(project_id, user_id, section)
+        payload = data.model_dump_json().encode("utf-8")
+        section_cache.put(project_id, section.value, revision, payload)
+        return payload
+
     async def get_chapter_schema(
         self,
         project_id: str,
@@ -169,25 +239,138 @@ class NovelService:
         chapter_number: int,
     ) -> ChapterSchema:
         project = await self.ensure_project_owner(project_id, user_id)
-        return self._build_chapter_schema(project, chapter_number)
+        return await self._load_chapter_schema(project, chapter_number)
+
+    async def get_chapter_version_content(
+        self,
+        project_id: str,
+        user_id: int,
+        chapter_number: int,
+        version_index: int,
+    ) -> ChapterVersionContent:
+        """读取单个版本的正文，版本按创建顺序编号，与选择版本时的索引一致。."""
+        await self.ensure_project_owner(project_id, user_id)
+        if version_index < 0:
+            raise HTTPException(status_code=400, detail="版本索引无效")
+        row = await self.repo.get_chapter_version(
+            project_id, chapter_number, version_index
+        )
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="章节版本不存在"
+            )
+        chapter, version = row
+        content = version.content or ""
+        return ChapterVersionContent(
+            chapter_number=chapter.chapter_number,
+            version_index=version_index,
+            version_label=version.version_label,
+            content=content,
+            word_count=len(content),
+            is_selected=chapter.selected_version_id == version.id,
+            created_at=version.created_at.isoformat() if version.created_at else None,
+        )
+
+    async def get_chapter(self, project_id: str, chapter_number: int) -> Chapter | None:
+        """加载单个章节及其版本、评估与关联事件，调用方需先校验项目归属。."""
+        return await self.repo.get_chapter(project_id, chapter_number)
+
+    async def list_chapters(self, project_id: str) -> list[Chapter]:
+        """按章节号列出章节（含选定版本与关联事件），调用方需先校验项目归属。."""
+        return await self.repo.list_chapters(project_id)
 
     async def list_projects_for_user(self, user_id: int) -> list[NovelProjectSummary]:
-        projects = await self.repo.list_by_user(user_id)
+        rows = await self.repo.list_summary_rows(user_id=user_id)
+        return await self._build_project_summaries(rows)
+
+    async def list_projects_for_admin(self) -> list[AdminNovelSummary]:
+        rows = await self.repo.list_summary_rows()
+        # 全量列表直接按项目分组统计，避免构造超长的 IN 条件
+        counts = await self.repo.count_chapters()
+        return [self._build_admin_summary(row, counts) for row in rows]
+
+    async def page_projects_for_user(
+        self,
+        user_id: int,
+        *,
+        limit: int,
+        cursor: str | None = None,
+        updated_after: datetime | None = None,
+        updated_before: datetime | None = None,
+        descending: bool = True,
+    ) -> NovelProjectPage:
+        """按 updated_at 键集分页列出用户项目，章节数由 SQL 聚合得到。."""
+        rows, next_cursor = await self._page_summary_rows(
+            limit=limit,
+            cursor=cursor,
+            updated_after=updated_after,
+            updated_before=updated_before,
+            descending=descending,
+            user_id=user_id,
+        )
+        items = await self._build_project_summaries(rows)
+        return NovelProjectPage(items=items, next_cursor=next_cursor)
+
+    async def page_projects_for_admin(
+        self,
+        *,
+        limit: int,
+        cursor: str | None = None,
+        updated_after: datetime | None = None,
+        updated_before: datetime | None = None,
+        descending: bool = True,
+    ) -> AdminNovelPage:
+        """按 updated_at 键集分页列出全部项目，供管理后台使用。."""
+        rows, next_cursor = await self._page_summary_rows(
+            limit=limit,
+            cursor=cursor,
+            updated_after=updated_after,
+            updated_before=updated_before,
+            descending=descending,
+        )
+        counts = await self.repo.count_chapters([row.id for row in rows])
+        items = [self._build_admin_summary(row, counts) for row in rows]
+        return AdminNovelPage(items=items, next_cursor=next_cursor)
+
+    async def _page_summary_rows(
+        self,
+        *,
+        limit: int,
+        cursor: str | None,
+        updated_after: datetime | None,
+        updated_before: datetime | None,
+        descending: bool,
+        user_id: int | None = None,
+    ) -> tuple[list[Any], str | None]:
+        # 多取一行判断是否还有下一页
+        rows = await self.repo.list_summary_rows(
+            user_id=user_id,
+            updated_after=_as_utc(updated_after),
+            updated_before=_as_utc(updated_before),
+            after=_decode_cursor(cursor) if cursor else None,
+            descending=descending,
+            limit=limit + 1,
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1].updated_at, rows[-1].id)
+        return rows, next_cursor
+
+    async def _build_project_summaries(
+        self, rows: list[Any]
+    ) -> list[NovelProjectSummary]:
+        counts = await self.repo.count_chapters([row.id for row in rows])
         summaries: list[NovelProjectSummary] = []
-        for project in projects:
-            blueprint = project.blueprint
-            genre = blueprint.genre if blueprint and blueprint.genre else "未知"
-            # 事件驱动模式：直接从 chapters 获取章节信息
-            chapters = project.chapters
-            total = len(chapters)
-            completed = sum(1 for chapter in chapters if chapter.selected_version_id)
+        for row in rows:
+            total, completed = counts.get(row.id, (0, 0))
             summaries.append(
                 NovelProjectSummary(
-                    id=project.id,
-                    title=project.title,
-                    genre=genre,
-                    last_edited=project.updated_at.isoformat()
-                    if project.updated_at
+                    id=row.id,
+                    title=row.title,
+                    genre=row.genre or "未知",
+                    last_edited=row.updated_at.isoformat()
+                    if row.updated_at
                     else "未知",
                     completed_chapters=completed,
                     total_chapters=total,
@@ -195,32 +378,22 @@ class NovelService:
             )
         return summaries
 
-    async def list_projects_for_admin(self) -> list[AdminNovelSummary]:
-        projects = await self.repo.list_all()
-        summaries: list[AdminNovelSummary] = []
-        for project in projects:
-            blueprint = project.blueprint
-            genre = blueprint.genre if blueprint and blueprint.genre else "未知"
-            # 事件驱动模式：直接从 chapters 获取章节信息
-            chapters = project.chapters
-            total = len(chapters)
-            completed = sum(1 for chapter in chapters if chapter.selected_version_id)
-            owner = project.owner
-            summaries.append(
-                AdminNovelSummary(
-                    id=project.id,
-                    title=project.title,
-                    owner_id=owner.id if owner else 0,
-                    owner_username=owner.username if owner else "未知",
-                    genre=genre,
-                    last_edited=project.updated_at.isoformat()
-                    if project.updated_at
-                    else "",
-                    completed_chapters=completed,
-                    total_chapters=total,
-                )
-            )
-        return summaries
+    @staticmethod
+    def _build_admin_summary(
+        row: Any, counts: dict[str, tuple[int, int]]
+    ) -> AdminNovelSummary:
+        total, completed = counts.get(row.id, (0, 0))
+        has_owner = row.username is not None
+        return AdminNovelSummary(
+            id=row.id,
+            title=row.title,
+            owner_id=row.user_id if has_owner else 0,
+            owner_username=row.username if has_owner else "未知",
+            genre=row.genre or "未知",
+            last_edited=row.updated_at.isoformat() if row.updated_at else "",
+            completed_chapters=completed,
+            total_chapters=total,
+        )
 
     async def delete_projects(self, project_ids: list[str], user_id: int) -> None:
         for pid in project_ids:
@@ -263,7 +436,7 @@ class NovelService:
         )
         self.session.add(convo)
         await self.session.commit()
-        await self._touch_project(project_id)
+        await self.touch_project(project_id)
 
     async def pop_last_conversation(
         self, project_id: str, role: str | None = None
@@ -279,7 +452,7 @@ class NovelService:
             if role is None or (convo.role == role):
                 await self.session.delete(convo)
                 await self.session.commit()
-                await self._touch_project(project_id)
+                await self.touch_project(project_id)
                 return True
         return False
 
@@ -318,6 +491,7 @@ class NovelService:
         record.one_sentence_summary = blueprint.one_sentence_summary
         record.full_synopsis = blueprint.full_synopsis
         record.world_setting = blueprint.world_setting
+        record.revision = (record.revision or 0) + 1
 
         await self.session.execute(
             delete(BlueprintCharacter).where(
@@ -488,13 +662,14 @@ class NovelService:
             logger.warning(f"未收到 plot_events 数据 - project_id={project_id}")
 
         await self.session.commit()
-        await self._touch_project(project_id)
+        await self.touch_project(project_id)
 
     async def patch_blueprint(self, project_id: str, patch: dict) -> None:
         blueprint = await self.session.get(NovelBlueprint, project_id)
         if not blueprint:
             blueprint = NovelBlueprint(project_id=project_id)
             self.session.add(blueprint)
+        blueprint.revision = (blueprint.revision or 0) + 1
 
         if "one_sentence_summary" in patch:
             blueprint.one_sentence_summary = patch["one_sentence_summary"]
@@ -555,7 +730,7 @@ class NovelService:
                     )
                 )
         await self.session.commit()
-        await self._touch_project(project_id)
+        await self.touch_project(project_id)
 
     # ------------------------------------------------------------------
     # 章节与版本
@@ -608,9 +783,55 @@ class NovelService:
 
         await self.session.commit()
         await self.session.refresh(chapter)
-        await self._touch_project(chapter.project_id)
+        await self.touch_project(chapter.project_id)
         return versions
 
+    async def clear_chapter_versions(self, chapter: Chapter) -> None:
+        """删除章节的全部版本，供逐个追加版本的后台生成使用。."""
+        await self.session.execute(
+            delete(ChapterVersion).where(ChapterVersion.chapter_id == chapter.id)
+        )
+        chapter.selected_version_id = None
+        chapter.word_count = 0
+        await self.session.commit()
+        await self.touch_project(chapter.project_id)
+
+    async def reset_interrupted_chapter(self, chapter_id: int) -> None:
+        """生成中断且结果未写入时恢复章节状态：无候选版本置为失败，否则等待确认。."""
+        chapter = await self.session.get(Chapter, chapter_id)
+        if chapter is None or chapter.status != ChapterGenerationStatus.GENERATING.value:
+            return
+        stmt = select(func.count(ChapterVersion.id)).where(
+            ChapterVersion.chapter_id == chapter.id
+        )
+        existing = (await self.session.execute(stmt)).scalar_one()
+        chapter.status = (
+            ChapterGenerationStatus.WAITING_FOR_CONFIRM.value
+            if existing
+            else ChapterGenerationStatus.FAILED.value
+        )
+        await self.session.commit()
+        await self.touch_project(chapter.project_id)
+
+    async def append_chapter_version(
+        self, chapter: Chapter, content: str, metadata: dict | None = None
+    ) -> ChapterVersion:
+        """追加一个版本并立即提交，标签按写入顺序编号，章节状态保持不变。."""
+        stmt = select(func.count(ChapterVersion.id)).where(
+            ChapterVersion.chapter_id == chapter.id
+        )
+        existing = (await self.session.execute(stmt)).scalar_one()
+        version = ChapterVersion(
+            chapter_id=chapter.id,
+            content=_normalize_version_content(content, metadata),
+            metadata=None,
+            version_label=f"v{existing + 1}",
+        )
+        self.session.add(version)
+        await self.session.commit()
+        await self.touch_project(chapter.project_id)
+        return version
+
     async def select_chapter_version(
         self, chapter: Chapter, version_index: int
     ) -> ChapterVersion:
@@ -623,7 +844,7 @@ class NovelService:
         chapter.word_count = len(selected.content or "")
         await self.session.commit()
         await self.session.refresh(chapter)
-        await self._touch_project(chapter.project_id)
+        await self.touch_project(chapter.project_id)
         return selected
 
     async def add_chapter_evaluation(
@@ -643,7 +864,7 @@ class NovelService:
         chapter.status = ChapterGenerationStatus.WAITING_FOR_CONFIRM.value
         await self.session.commit()
         await self.session.refresh(chapter)
-        await self._touch_project(chapter.project_id)
+        await self.touch_project(chapter.project_id)
 
     async def delete_chapters(
         self, project_id: str, chapter_numbers: Iterable[int]
@@ -655,7 +876,7 @@ class NovelService:
             )
         )
         await self.session.commit()
-        await self._touch_project(project_id)
+        await self.touch_project(project_id)
 
     # ------------------------------------------------------------------
     # 事件驱动模式支持
@@ -820,11 +1041,9 @@ class NovelService:
         project_id: str,
         section: NovelSectionType,
     ) -> NovelSectionResponse:
-        project = await self.repo.get_by_id(project_id)
-        if not project:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="项目不存在"
-            )
+        project = self._check_project_access(
+            await self._load_section_project(project_id, section), None
+        )
         return self._build_section_response(project, section)
 
     async def get_chapter_schema_for_admin(
@@ -832,12 +1051,32 @@ class NovelService:
         project_id: str,
         chapter_number: int,
     ) -> ChapterSchema:
-        project = await self.repo.get_by_id(project_id)
-        if not project:
+        project = self._check_project_access(
+            await self.repo.get_project(project_id), None
+        )
+        return await self._load_chapter_schema(project, chapter_number)
+
+    async def _load_section_project(
+        self, project_id: str, section: NovelSectionType
+    ) -> NovelProject | None:
+        """按区段只加载其序列化所需的关联数据。."""
+        if section == NovelSectionType.CHAPTERS:
+            return await self.repo.get_with_chapters(project_id)
+        if section in _LAYERED_SECTIONS:
+            return await self.repo.get_with_events(project_id)
+        return await self.repo.get_with_blueprint(project_id)
+
+    async def _load_chapter_schema(
+        self, project: NovelProject, chapter_number: int
+    ) -> ChapterSchema:
+        chapter = await self.repo.get_chapter(project.id, chapter_number)
+        if not chapter:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="项目不存在"
+                status_code=status.HTTP_404_NOT_FOUND, detail="章节不存在"
             )
-        return self._build_chapter_schema(project, chapter_number)
+        return self._build_chapter_schema(
+            project, chapter_number, chapters_map={chapter_number: chapter}
+        )
 
     async def _serialize_project(self, project: NovelProject) -> NovelProjectSchema:
         # 注：story_framework 和 volume_outlines 已在 repository 中通过 selectinload 预加载
@@ -870,18 +1109,14 @@ class NovelService:
             chapters=chapters_schema,
         )
 
-    async def _touch_project(self, project_id: str) -> None:
-        await self.session.execute(
-            update(NovelProject)
-            .where(NovelProject.id == project_id)
-            .values(updated_at=datetime.now(UTC))
-        )
+    async def touch_project(self, project_id: str) -> None:
+        """刷新项目更新时间并递增修订号，项目内容的所有写入都应在提交后调用。."""
+        await self.repo.touch(project_id)
         await self.session.commit()
 
-    def _build_blueprint_schema(self, project: NovelProject) -> Blueprint:
-        blueprint_obj = project.blueprint
-
-        # 构建 story_framework
+    def _build_story_framework_schema(
+        self, project: NovelProject
+    ) -> StoryFrameworkSchema | None:
         story_framework_schema = None
         if project.story_framework:
             sf = project.story_framework
@@ -893,8 +1128,11 @@ class NovelService:
                 created_at=sf.created_at.isoformat() if sf.created_at else None,
                 updated_at=sf.updated_at.isoformat() if sf.updated_at else None,
             )
+        return story_framework_schema
 
-        # 构建 volume_outlines
+    def _build_volume_outline_schemas(
+        self, project: NovelProject
+    ) -> list[VolumeOutlineSchema]:
         volume_outlines_schemas = []
         for vol in sorted(project.volume_outlines, key=lambda v: v.volume_number):
             volume_outlines_schemas.append(
@@ -919,39 +1157,51 @@ class NovelService:
                     updated_at=vol.updated_at.isoformat() if vol.updated_at else None,
                 )
             )
+        return volume_outlines_schemas
+
+    @staticmethod
+    def _serialize_plot_event(event: PlotEvent) -> dict[str, Any]:
+        return {
+            "id": event.id,
+            "volume_id": event.volume_id,
+            "event_id": event.event_id,
+            "event_title": event.event_title,
+            "act": event.act,
+            "arc_index": event.arc_index,
+            "event_type": event.event_type,
+            "description": event.description,
+            "estimated_chapters": event.estimated_chapters,
+            "key_points": event.key_points or [],
+            "completed_key_points": event.completed_key_points or [],
+            "pacing": event.pacing,
+            "tension_level": event.tension_level,
+            "sequence": event.sequence,
+            "progress": event.progress,
+            "status": event.status,
+            "created_at": event.created_at.isoformat() if event.created_at else None,
+            "updated_at": event.updated_at.isoformat() if event.updated_at else None,
+        }
 
-        # ⭐ 构建 stage4_data（情节事件列表）
-        plot_events_data = [
-            {
-                "id": event.id,
-                "volume_id": event.volume_id,
-                "event_id": event.event_id,
-                "event_title": event.event_title,
-                "act": event.act,
-                "arc_index": event.arc_index,
-                "event_type": event.event_type,
-                "description": event.description,
-                "estimated_chapters": event.estimated_chapters,
-                "key_points": event.key_points or [],
-                "completed_key_points": event.completed_key_points or [],
-                "pacing": event.pacing,
-                "tension_level": event.tension_level,
-                "sequence": event.sequence,
-                "progress": event.progress,
-                "status": event.status,
-                "created_at": event.created_at.isoformat()
-                if event.created_at
-                else None,
-                "updated_at": event.updated_at.isoformat()
-                if event.updated_at
-                else None,
-            }
-            for event in sorted(project.plot_events, key=lambda e: e.sequence)
-        ]
-
+    def _build_blueprint_schema(
+        self, project: NovelProject, *, include_layers: bool = True
+    ) -> Blueprint:
+        """构建蓝图 schema；include_layers=False 时不访问三层蓝图，无需预加载。."""
         from app.schemas.novel import Stage4Data
 
-        stage4_data = Stage4Data(plot_events=plot_events_data)
+        blueprint_obj = project.blueprint
+        story_framework_schema = None
+        volume_outlines_schemas: list[VolumeOutlineSchema] = []
+        stage4_data = None
+        if include_layers:
+            story_framework_schema = self._build_story_framework_schema(project)
+            volume_outlines_schemas = self._build_volume_outline_schemas(project)
+            # ⭐ 构建 stage4_data（情节事件列表）
+            stage4_data = Stage4Data(
+                plot_events=[
+                    self._serialize_plot_event(event)
+                    for event in sorted(project.plot_events, key=lambda e: e.sequence)
+                ]
+            )
 
         if blueprint_obj:
             return Blueprint(
@@ -1017,7 +1267,10 @@ class NovelService:
         project: NovelProject,
         section: NovelSectionType,
     ) -> NovelSectionResponse:
-        blueprint = self._build_blueprint_schema(project)
+        # 区段只访问 _load_section_project 为其预加载的关联
+        blueprint = None
+        if section not in _LAYERED_SECTIONS and section != NovelSectionType.CHAPTERS:
+            blueprint = self._build_blueprint_schema(project, include_layers=False)
 
         if section == NovelSectionType.OVERVIEW:
             data = {
@@ -1065,31 +1318,7 @@ class NovelService:
 
             # ⭐ 新增：返回情节事件列表，供左侧边栏显示
             plot_events = [
-                {
-                    "id": event.id,
-                    "volume_id": event.volume_id,
-                    "event_id": event.event_id,
-                    "event_title": event.event_title,
-                    "act": event.act,
-                    "arc_index": event.arc_index,
-                    "event_type": event.event_type,
-                    "description": event.description,
-                    "estimated_chapters": event.estimated_chapters,
-                    "key_points": event.key_points or [],
-                    "completed_key_points": event.completed_key_points or [],
-                    "pacing": event.pacing,
-                    "tension_level": event.tension_level,
-                    "sequence": event.sequence,
-                    "progress": event.progress,
-                    "status": event.status,
-                    "created_at": event.created_at.isoformat()
-                    if event.created_at
-                    else None,
-                    "updated_at": event.updated_at.isoformat()
-                    if event.updated_at
-                    else None,
-                }
-                for event in project.plot_events
+                self._serialize_plot_event(event) for event in project.plot_events
             ]
 
             data = {
@@ -1099,50 +1328,30 @@ class NovelService:
             }
         elif section == NovelSectionType.VOLUME_MANAGEMENT:
             # 分卷管理：返回总体框架和分卷大纲
+            story_framework = self._build_story_framework_schema(project)
             data = {
-                "story_framework": blueprint.story_framework.model_dump()
-                if blueprint.story_framework
+                "story_framework": story_framework.model_dump()
+                if story_framework
                 else None,
                 "volume_outlines": [
-                    vol.model_dump() for vol in blueprint.volume_outlines
+                    vol.model_dump()
+                    for vol in self._build_volume_outline_schemas(project)
                 ],
             }
         elif section == NovelSectionType.THREE_LAYER_BLUEPRINT:
             # 三层蓝图：返回完整的三层架构
             # 注意：第三层是 plot_events（情节事件），不再是 chapter_outline
+            story_framework = self._build_story_framework_schema(project)
             data = {
-                "story_framework": blueprint.story_framework.model_dump()
-                if blueprint.story_framework
+                "story_framework": story_framework.model_dump()
+                if story_framework
                 else None,
                 "volume_outlines": [
-                    vol.model_dump() for vol in blueprint.volume_outlines
+                    vol.model_dump()
+                    for vol in self._build_volume_outline_schemas(project)
                 ],
                 "plot_events": [
-                    {
-                        "id": event.id,
-                        "volume_id": event.volume_id,
-                        "event_id": event.event_id,
-                        "event_title": event.event_title,
-                        "act": event.act,
-                        "arc_index": event.arc_index,
-                        "event_type": event.event_type,
-                        "description": event.description,
-                        "estimated_chapters": event.estimated_chapters,
-                        "key_points": event.key_points or [],
-                        "completed_key_points": event.completed_key_points or [],
-                        "pacing": event.pacing,
-                        "tension_level": event.tension_level,
-                        "sequence": event.sequence,
-                        "progress": event.progress,
-                        "status": event.status,
-                        "created_at": event.created_at.isoformat()
-                        if event.created_at
-                        else None,
-                        "updated_at": event.updated_at.isoformat()
-                        if event.updated_at
-                        else None,
-                    }
-                    for event in project.plot_events
+                    self._serialize_plot_event(event) for event in project.plot_events
                 ],
             }
         else:
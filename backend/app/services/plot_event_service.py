@@ -11,6 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
 from ..models.novel import PlotEvent, StoryFramework, VolumeOutline
+from ..repositories.novel_repository import NovelRepository
 from ..schemas.plot_event import PlotEventCreate, PlotEventUpdate
 from ..services.llm_service import LLMService
 
@@ -23,6 +24,7 @@ class PlotEventService:
     def __init__(self, session: AsyncSession):
         self.session = session
         self.llm_service = LLMService(session)
+        self.novel_repo = NovelRepository(session)
 
     # ==================== CRUD 操作 ====================
 
@@ -49,6 +51,7 @@ class PlotEventService:
             status="pending",
         )
         self.session.add(event)
+        await self.novel_repo.touch(project_id)
         await self.session.commit()
         await self.session.refresh(event)
         logger.info(
@@ -93,6 +96,7 @@ class PlotEventService:
         for key, value in update_data.items():
             setattr(event, key, value)
 
+        await self.novel_repo.touch(event.project_id)
         await self.session.commit()
         await self.session.refresh(event)
         logger.info("更新情节事件成功", extra={"event_id": event_id})
@@ -105,6 +109,7 @@ class PlotEventService:
             return False
 
         await self.session.delete(event)
+        await self.novel_repo.touch(event.project_id)
         await self.session.commit()
         logger.info("删除情节事件成功", extra={"event_id": event_id})
         return True
@@ -150,6 +155,7 @@ class PlotEventService:
         else:
             event.status = "in_progress"
 
+        await self.novel_repo.touch(event.project_id)
         await self.session.commit()
         await self.session.refresh(event)
         logger.info(
@@ -295,6 +301,7 @@ class PlotEventService:
             self.session.add(event)
             events.append(event)
 
+        await self.novel_repo.touch(project_id)
         await self.session.commit()
 
         # 刷新所有事件以获取数据库生成的ID
@@ -9,15 +9,19 @@ from ..core.config import settings
 from ..models.novel import NovelProject
 from ..repositories.rag_metrics_repository import RAGMetricsRepository
 from ..schemas.admin import RAGProjectStat, RAGStatus
-from .vector_store_service import VectorStoreService
+from .embedding_cache import embedding_cache
+from .retrieval_cache import retrieval_cache
+from .vector_store_service import VectorStoreService, get_vector_store
 
 logger = logging.getLogger(__name__)
 
 
 class RAGStatusService:
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self, session: AsyncSession, vector_store: VectorStoreService | None = None
+    ):
         self.session = session
-        self.vector_store = VectorStoreService()
+        self.vector_store = vector_store or get_vector_store()
 
     async def get_status(self, top_n_projects: int = 5) -> RAGStatus:
         enabled = settings.vector_store_enabled
@@ -30,7 +34,7 @@ class RAGStatusService:
         totals = {"chunks": 0, "summaries": 0}
         top_projects: list[RAGProjectStat] = []
 
-        if enabled:
+        if enabled and self.vector_store:
             try:
                 totals = await self.vector_store.count_totals()
             except Exception as exc:  # pragma: no cover - 统计失败不致命
@@ -61,12 +65,16 @@ class RAGStatusService:
 
         # 聚合近 7 天的检索质量与性能指标
         avg_latency_ms_7d = None
+        avg_embedding_latency_ms_7d = None
+        avg_search_latency_ms_7d = None
         empty_recall_rate_7d = None
         duplicate_chunk_rate_7d = None
         try:
             metrics_repo = RAGMetricsRepository(self.session)
             win = await metrics_repo.window_stats(days=7)
             avg_latency_ms_7d = win.get("avg_latency_ms")
+            avg_embedding_latency_ms_7d = win.get("avg_embedding_latency_ms")
+            avg_search_latency_ms_7d = win.get("avg_search_latency_ms")
             empty_recall_rate_7d = win.get("empty_rate")
             duplicate_chunk_rate_7d = win.get("duplicate_rate")
         except Exception as exc:  # pragma: no cover
@@ -87,8 +95,16 @@ class RAGStatusService:
             total_summaries=int(totals.get("summaries", 0)),
             top_projects=top_projects,
             avg_latency_ms_7d=avg_latency_ms_7d,
+            avg_embedding_latency_ms_7d=avg_embedding_latency_ms_7d,
+            avg_search_latency_ms_7d=avg_search_latency_ms_7d,
             empty_recall_rate_7d=empty_recall_rate_7d,
             duplicate_chunk_rate_7d=duplicate_chunk_rate_7d,
+            embedding_cache=embedding_cache.stats()
+            if settings.embedding_cache_enabled
+            else None,
+            retrieval_cache=retrieval_cache.stats()
+            if retrieval_cache.enabled
+            else None,
         )
 
 
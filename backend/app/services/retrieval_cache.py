@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+"""
+RAG 检索结果缓存：同一项目、同一查询与 top_k 的检索结果在短时间内直接复用。
+
+失效策略：
+- 入库代次保存在 novel_projects.vector_generation，章节入库或删除时递增；
+  查询前读取该代次并写入缓存键，独立部署的 worker 入库后 Web 进程同样能感知
+- 条目带 TTL，并按 LRU 限制总条目数，避免常驻内存无限增长
+"""
+
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RetrievalCache:
+    """进程内检索结果缓存，单 worker 部署下无需跨进程同步。."""
+
+    def __init__(self, *, ttl_seconds: float, max_entries: int) -> None:
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[Any, ...], tuple[float, Any]] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_entries > 0 and self._ttl > 0
+
+    def observe(self, project_id: str, generation: int) -> None:
+        """记录从数据库读到的入库代次；代次前进时清理该项目的旧缓存。."""
+        current = self._generations.get(project_id)
+        if current is not None and generation <= current:
+            return
+        self._generations[project_id] = generation
+        if current is None:
+            return
+        stale = [
+            key
+            for key in self._entries
+            if key[0] == project_id and key[1] < generation
+        ]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            logger.debug(
+                "检索缓存已失效: project=%s count=%d", project_id, len(stale)
+            )
+
+    def make_key(
+        self,
+        project_id: str,
+        generation: int,
+        query: str,
+        top_k_chunks: int,
+        top_k_summaries: int,
+    ) -> tuple[Any, ...]:
+        self.observe(project_id, generation)
+        digest = hashlib.sha256(query.encode("utf-8")).hexdigest()
+        return (project_id, generation, digest, top_k_chunks, top_k_summaries)
+
+    def get(self, key: tuple[Any, ...]) -> Any | None:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: tuple[Any, ...], value: Any) -> None:
+        if not self.enabled:
+            return
+        # 检索期间其他请求已读到更新的代次时丢弃，避免缓存过期结果
+        if key[1] < self._generations.get(key[0], key[1]):
+            return
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict[str, int | float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "entries": len(self._entries),
+        }
+
+
+retrieval_cache = RetrievalCache(
+    ttl_seconds=settings.rag_retrieval_cache_ttl,
+    max_entries=settings.rag_retrieval_cache_max_entries,
+)
+
+
+__all__ = ["RetrievalCache", "retrieval_cache"]
@@ -0,0 +1,64 @@
+"""项目区段响应缓存：按项目修订号缓存区段接口序列化后的 JSON。.
+
+失效策略：
+- 条目记录生成时的项目修订号，项目内容变更后修订号递增，旧条目不再命中
+- 同一项目、同一区段只保留最新修订号的一条，并按 LRU 限制总条目数
+"""
+
+from collections import OrderedDict
+
+from ..core.config import settings
+
+
+class SectionCache:
+    """进程内区段响应缓存，多 worker 部署时各进程独立缓存，修订号保证不会读到旧数据。."""
+
+    def __init__(self, *, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], tuple[int, bytes]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_entries > 0
+
+    def get(self, project_id: str, section: str, revision: int) -> bytes | None:
+        if not self.enabled:
+            return None
+        key = (project_id, section)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != revision:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, project_id: str, section: str, revision: int, payload: bytes) -> None:
+        if not self.enabled:
+            return
+        key = (project_id, section)
+        entry = self._entries.get(key)
+        # 并发请求可能晚于新修订号写入，不用旧修订号覆盖
+        if entry is not None and entry[0] > revision:
+            return
+        self._entries[key] = (revision, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict[str, int | float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "entries": len(self._entries),
+        }
+
+
+section_cache = SectionCache(max_entries=settings.section_cache_max_entries)
+
+
+__all__ = ["SectionCache", "section_cache"]
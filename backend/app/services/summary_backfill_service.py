@@ -0,0 +1,202 @@
+"""章节摘要批量补齐.
+
+导入的项目或长期未维护的项目可能缺少大量章节摘要，逐章串行生成耗时过长：
+1. 用信号量限制同时进行的摘要请求数，每章独立会话、生成后立即提交
+2. 开始前按用户当日剩余额度（扣除保留次数）截断待处理章节，
+   过程中遇到额度耗尽（429）即停止派发新的章节
+3. 每完成一章回调一次进度，供任务队列记录
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from fastapi import HTTPException, status
+from sqlalchemy import or_, select
+from sqlalchemy.orm import selectinload
+
+from ..core.config import settings
+from ..db.session import AsyncSessionLocal
+from ..models.novel import Chapter, ChapterVersion
+from ..repositories.novel_repository import NovelRepository
+from ..utils.json_utils import remove_think_tags
+from .llm_service import LLMService
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+@dataclass(slots=True)
+class BackfillProgress:
+    """批量补齐的进度与结果。."""
+
+    total: int = 0
+    done: int = 0
+    failed: int = 0
+    skipped: int = 0
+    budget_exhausted: bool = False
+    chapter_numbers: list[int] = field(default_factory=list)
+
+    def as_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        # 进度只需要计数，已完成的章节号由调用方按需使用
+        data.pop("chapter_numbers")
+        return data
+
+
+class SummaryBackfillService:
+    """并发补齐项目中缺失的章节摘要。."""
+
+    def __init__(
+        self,
+        concurrency: int | None = None,
+        reserved_requests: int | None = None,
+    ):
+        self.concurrency = concurrency or settings.summary_backfill_concurrency
+        self.reserved_requests = (
+            settings.summary_backfill_reserved_requests
+            if reserved_requests is None
+            else reserved_requests
+        )
+
+    async def run(
+        self,
+        project_id: str,
+        user_id: int | None,
+        *,
+        chapter_ids: list[int] | None = None,
+        on_progress: ProgressCallback | None = None,
+    ) -> BackfillProgress:
+        """补齐摘要，返回进度；chapter_ids 为空时处理项目中全部缺失摘要的章节。."""
+        async with AsyncSessionLocal() as session:
+            stmt = (
+                select(Chapter.id)
+                .where(
+                    Chapter.project_id == project_id,
+                    Chapter.selected_version_id.is_not(None),
+                    or_(Chapter.real_summary.is_(None), Chapter.real_summary == ""),
+                )
+                .order_by(Chapter.chapter_number)
+            )
+            if chapter_ids is not None:
+                stmt = stmt.where(Chapter.id.in_(chapter_ids))
+            pending = list((await session.execute(stmt)).scalars().all())
+            remaining = await LLMService(session).remaining_daily_requests(user_id)
+
+        progress = BackfillProgress(total=len(pending))
+        if remaining is not None:
+            allowed = max(0, remaining - self.reserved_requests)
+            if allowed < len(pending):
+                # 额度不足时优先补齐较早的章节，分层摘要依赖章节顺序
+                progress.skipped = len(pending) - allowed
+                progress.budget_exhausted = True
+                pending = pending[:allowed]
+                logger.warning(
+                    "项目 %s 摘要补齐受每日额度限制: 待处理=%s 可用=%s",
+                    project_id,
+                    progress.total,
+                    allowed,
+                )
+        if not pending:
+            await self._report(progress, on_progress)
+            return progress
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        lock = asyncio.Lock()
+        stop = asyncio.Event()
+
+        async def _worker(chapter_id: int) -> None:
+            async with semaphore:
+                if stop.is_set():
+                    outcome = "skipped"
+                    chapter_number = None
+                else:
+                    outcome, chapter_number = await self._summarize(
+                        chapter_id, user_id, stop
+                    )
+            async with lock:
+                if outcome == "done":
+                    progress.done += 1
+                    progress.chapter_numbers.append(chapter_number)
+                elif outcome == "failed":
+                    progress.failed += 1
+                else:
+                    progress.skipped += 1
+                if stop.is_set():
+                    progress.budget_exhausted = True
+                await self._report(progress, on_progress)
+
+        await asyncio.gather(*(_worker(chapter_id) for chapter_id in pending))
+        progress.chapter_numbers.sort()
+        logger.info(
+            "项目 %s 摘要补齐完成: total=%s done=%s failed=%s skipped=%s",
+            project_id,
+            progress.total,
+            progress.done,
+            progress.failed,
+            progress.skipped,
+        )
+        return progress
+
+    async def _summarize(
+        self, chapter_id: int, user_id: int | None, stop: asyncio.Event
+    ) -> tuple[str, int | None]:
+        async with AsyncSessionLocal() as session:
+            stmt = (
+                select(Chapter)
+                .where(Chapter.id == chapter_id)
+                .options(
+                    selectinload(Chapter.selected_version).undefer(
+                        ChapterVersion.content
+                    )
+                )
+            )
+            chapter = (await session.execute(stmt)).scalars().first()
+            if (
+                not chapter
+                or chapter.real_summary
+                or not chapter.selected_version
+                or not chapter.selected_version.content
+            ):
+                return "skipped", None
+            try:
+                summary = await LLMService(session).get_summary(
+                    chapter.selected_version.content,
+                    temperature=0.15,
+                    user_id=user_id,
+                    timeout=180.0,
+                )
+            except HTTPException as exc:
+                if exc.status_code == status.HTTP_429_TOO_MANY_REQUESTS:
+                    stop.set()
+                    return "skipped", None
+                logger.warning(
+                    "第 %s 章摘要生成失败: %s", chapter.chapter_number, exc.detail
+                )
+                return "failed", None
+            except Exception as exc:
+                logger.exception(
+                    "第 %s 章摘要生成失败: %s", chapter.chapter_number, exc
+                )
+                return "failed", None
+            chapter.real_summary = remove_think_tags(summary)
+            await NovelRepository(session).touch(chapter.project_id)
+            await session.commit()
+            return "done", chapter.chapter_number
+
+    @staticmethod
+    async def _report(
+        progress: BackfillProgress, on_progress: ProgressCallback | None
+    ) -> None:
+        if on_progress is None:
+            return
+        try:
+            await on_progress(progress.as_dict())
+        except Exception as exc:  # pragma: no cover - 进度上报失败不影响补齐
+            logger.warning("摘要补齐进度上报失败: %s", exc)
+
+
+__all__ = ["BackfillProgress", "SummaryBackfillService"]
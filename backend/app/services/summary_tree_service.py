@@ -0,0 +1,323 @@
+"""分层滚动摘要服务.
+
+章节摘要按「事件 → 情节线 → 分卷」逐级汇总：
+1. 章节定稿后刷新所属事件的摘要，事件完成后再汇总到情节线，情节线完成后汇总到分卷
+2. 每级摘要记录下级内容的指纹，未变化时不重复调用模型
+3. 写作时最近几章保留原始摘要，更早的章节尽量用覆盖范围最大的上级摘要替代，
+   使提示词中的前情长度随章节数近似对数增长
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from ..models.novel import Chapter, PlotEvent, StorySummary, VolumeOutline
+from ..utils.json_utils import remove_think_tags
+from .llm_service import LLMService
+from .prompt_service import PromptService
+
+logger = logging.getLogger(__name__)
+
+# 层级由高到低，组装上下文时优先使用覆盖范围更大的摘要
+_LEVELS = ("volume", "arc", "event")
+
+
+@dataclass(slots=True)
+class _Child:
+    """参与汇总的下级条目。."""
+
+    label: str
+    chapter_numbers: list[int]
+    content: str
+
+
+class SummaryTreeService:
+    """维护与读取分层滚动摘要。."""
+
+    def __init__(self, session: AsyncSession, llm_service: LLMService | None = None):
+        self.session = session
+        self.llm_service = llm_service or LLMService(session)
+
+    async def refresh_for_chapter(
+        self, project_id: str, chapter_number: int, user_id: int | None = None
+    ) -> None:
+        """章节摘要更新后，自下而上刷新其所属事件、情节线与分卷的摘要。."""
+        stmt = (
+            select(Chapter)
+            .where(
+                Chapter.project_id == project_id,
+                Chapter.chapter_number == chapter_number,
+            )
+            .options(selectinload(Chapter.event))
+        )
+        result = await self.session.execute(stmt)
+        chapter = result.scalars().first()
+        if not chapter or not chapter.event:
+            return
+
+        prompt = await PromptService(self.session).get_prompt("rollup")
+        if not prompt:
+            logger.warning("未配置名为 'rollup' 的汇总提示词，跳过分层摘要刷新")
+            return
+
+        existing = await self._load_summaries(project_id)
+        await self._refresh_event(project_id, chapter.event, existing, prompt, user_id)
+
+        # 事件可能在之后的章节中才被标记完成，因此每次都检查全部分卷，
+        # 指纹未变化的层级不会触发模型调用
+        stmt = (
+            select(VolumeOutline)
+            .where(VolumeOutline.project_id == project_id)
+            .options(selectinload(VolumeOutline.plot_events))
+            .order_by(VolumeOutline.volume_number)
+        )
+        result = await self.session.execute(stmt)
+        for volume in result.scalars().all():
+            events = volume.plot_events
+            for arc_index in sorted({e.arc_index for e in events}):
+                arc_events = [e for e in events if e.arc_index == arc_index]
+                if self._is_completed(arc_events):
+                    await self._refresh_arc(
+                        project_id,
+                        volume,
+                        arc_index,
+                        arc_events,
+                        existing,
+                        prompt,
+                        user_id,
+                    )
+            if self._is_completed(events):
+                await self._refresh_volume(
+                    project_id, volume, existing, prompt, user_id
+                )
+
+    async def build_completed_context(
+        self,
+        project_id: str,
+        completed_chapters: list[dict[str, Any]],
+        recent_count: int,
+    ) -> list[dict[str, Any]]:
+        """用上级摘要替换较早章节，返回按章节顺序排列的前情条目。.
+
+        最近 recent_count 章保留原始摘要；上级摘要只有在其覆盖的章节全部早于
+        该窗口且均已完成时才会被采用，否则对应章节回退为逐章摘要。
+        """
+        ordered = sorted(completed_chapters, key=lambda item: item["chapter_number"])
+        if recent_count <= 0 or len(ordered) <= recent_count:
+            return ordered
+        older = ordered[:-recent_count]
+        available = {item["chapter_number"] for item in older}
+
+        summaries = await self._load_summaries(project_id)
+        by_level: dict[str, list[StorySummary]] = {level: [] for level in _LEVELS}
+        for summary in summaries.values():
+            if summary.level in by_level:
+                by_level[summary.level].append(summary)
+
+        items: list[dict[str, Any]] = []
+        for level in _LEVELS:
+            for summary in sorted(by_level[level], key=lambda s: s.start_chapter):
+                numbers = set(summary.chapter_numbers or [])
+                # 单章的汇总与原始摘要相同，不必替换
+                if len(numbers) < 2 or not numbers <= available:
+                    continue
+                available -= numbers
+                items.append(
+                    {
+                        "chapter_number": summary.start_chapter,
+                        "end_chapter": summary.end_chapter,
+                        "title": summary.title,
+                        "summary": summary.content,
+                        "level": summary.level,
+                    }
+                )
+
+        items.extend(item for item in older if item["chapter_number"] in available)
+        items.sort(key=lambda item: item["chapter_number"])
+        return items + ordered[-recent_count:]
+
+    async def _refresh_event(
+        self,
+        project_id: str,
+        event: PlotEvent,
+        existing: dict[str, StorySummary],
+        prompt: str,
+        user_id: int | None,
+    ) -> None:
+        stmt = (
+            select(Chapter.chapter_number, Chapter.real_summary)
+            .where(
+                Chapter.project_id == project_id,
+                Chapter.event_id == event.id,
+                Chapter.real_summary.is_not(None),
+            )
+            .order_by(Chapter.chapter_number)
+        )
+        result = await self.session.execute(stmt)
+        children = [
+            _Child(f"第{number}章", [number], summary)
+            for number, summary in result.all()
+            if summary and summary.strip()
+        ]
+        await self._upsert(
+            project_id,
+            level="event",
+            scope_key=f"event:{event.id}",
+            title=event.event_title or f"事件{event.event_id}",
+            children=children,
+            existing=existing,
+            prompt=prompt,
+            user_id=user_id,
+        )
+
+    async def _refresh_arc(
+        self,
+        project_id: str,
+        volume: VolumeOutline,
+        arc_index: int,
+        events: list[PlotEvent],
+        existing: dict[str, StorySummary],
+        prompt: str,
+        user_id: int | None,
+    ) -> None:
+        children = self._children_of(
+            existing, [(e.event_title, f"event:{e.id}") for e in events]
+        )
+        arcs = volume.major_arcs or []
+        arc_title = f"情节线{arc_index + 1}"
+        if 0 <= arc_index < len(arcs) and isinstance(arcs[arc_index], dict):
+            arc_title = arcs[arc_index].get("arc_title") or arc_title
+        await self._upsert(
+            project_id,
+            level="arc",
+            scope_key=f"arc:{volume.id}:{arc_index}",
+            title=f"第{volume.volume_number}卷·{arc_title}",
+            children=children,
+            existing=existing,
+            prompt=prompt,
+            user_id=user_id,
+        )
+
+    async def _refresh_volume(
+        self,
+        project_id: str,
+        volume: VolumeOutline,
+        existing: dict[str, StorySummary],
+        prompt: str,
+        user_id: int | None,
+    ) -> None:
+        arc_indexes = sorted({e.arc_index for e in volume.plot_events})
+        children = self._children_of(
+            existing,
+            [(str(index), f"arc:{volume.id}:{index}") for index in arc_indexes],
+        )
+        await self._upsert(
+            project_id,
+            level="volume",
+            scope_key=f"volume:{volume.id}",
+            title=f"第{volume.volume_number}卷《{volume.volume_title}》",
+            children=children,
+            existing=existing,
+            prompt=prompt,
+            user_id=user_id,
+        )
+
+    async def _upsert(
+        self,
+        project_id: str,
+        *,
+        level: str,
+        scope_key: str,
+        title: str,
+        children: list[_Child],
+        existing: dict[str, StorySummary],
+        prompt: str,
+        user_id: int | None,
+    ) -> None:
+        """下级内容变化时重新生成摘要，并同步更新 existing 以供上级使用。."""
+        if not children:
+            return
+        digest = hashlib.sha256(
+            "\x1e".join(
+                f"{child.chapter_numbers}\x1f{child.content}" for child in children
+            ).encode("utf-8")
+        ).hexdigest()
+        record = existing.get(scope_key)
+        if record and record.source_digest == digest:
+            return
+
+        if len(children) == 1:
+            content = children[0].content
+        else:
+            payload = "\n\n".join(
+                f"【{child.label}】\n{child.content.strip()}" for child in children
+            )
+            content = remove_think_tags(
+                await self.llm_service.get_summary(
+                    payload,
+                    temperature=0.2,
+                    user_id=user_id,
+                    timeout=180.0,
+                    system_prompt=prompt,
+                )
+            ).strip()
+            if not content:
+                logger.warning("分层摘要生成结果为空: scope=%s", scope_key)
+                return
+
+        numbers = sorted({n for child in children for n in child.chapter_numbers})
+        if record is None:
+            record = StorySummary(project_id=project_id, scope_key=scope_key)
+            self.session.add(record)
+            existing[scope_key] = record
+        record.level = level
+        record.title = title
+        record.start_chapter = numbers[0]
+        record.end_chapter = numbers[-1]
+        record.chapter_numbers = numbers
+        record.content = content
+        record.source_digest = digest
+        await self.session.commit()
+        logger.info(
+            "分层摘要已更新: project=%s scope=%s chapters=%s-%s",
+            project_id,
+            scope_key,
+            numbers[0],
+            numbers[-1],
+        )
+
+    async def _load_summaries(self, project_id: str) -> dict[str, StorySummary]:
+        stmt = select(StorySummary).where(StorySummary.project_id == project_id)
+        result = await self.session.execute(stmt)
+        return {summary.scope_key: summary for summary in result.scalars().all()}
+
+    @staticmethod
+    def _children_of(
+        existing: dict[str, StorySummary], scopes: list[tuple[str, str]]
+    ) -> list[_Child]:
+        children = []
+        for label, scope_key in scopes:
+            summary = existing.get(scope_key)
+            if summary is None:
+                continue
+            children.append(
+                _Child(
+                    summary.title or label,
+                    list(summary.chapter_numbers or []),
+                    summary.content,
+                )
+            )
+        children.sort(key=lambda child: min(child.chapter_numbers, default=0))
+        return children
+
+    @staticmethod
+    def _is_completed(events: list[PlotEvent]) -> bool:
+        return bool(events) and all(e.status == "completed" for e in events)
+
+
+__all__ = ["SummaryTreeService"]
@@ -0,0 +1,209 @@
+"""后台任务处理函数：章节摘要补齐、分层摘要刷新与向量库同步。.
+
+导入本模块即完成注册；处理函数抛出异常时由任务队列负责重试。
+"""
+
+import logging
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from ..core.config import settings
+from ..db.session import AsyncSessionLocal
+from ..models.novel import Chapter, ChapterVersion
+from ..models.task_job import TaskJob
+from .chapter_ingest_service import ChapterIngestionService
+from .llm_service import LLMService
+from .summary_backfill_service import SummaryBackfillService
+from .summary_tree_service import SummaryTreeService
+from .task_queue import enqueue_task, register_task, report_task_progress
+from .vector_store_service import get_vector_store
+
+logger = logging.getLogger(__name__)
+
+CHAPTER_SUMMARY = "chapter_summary"
+SUMMARY_BACKFILL = "summary_backfill"
+SUMMARY_TREE_REFRESH = "summary_tree_refresh"
+CHAPTER_INGEST = "chapter_ingest"
+CHAPTER_VECTOR_DELETE = "chapter_vector_delete"
+
+
+async def _backfill_summaries(
+    project_id: str, user_id: int | None, chapter_ids: list[int] | None
+) -> None:
+    progress = await SummaryBackfillService().run(
+        project_id,
+        user_id,
+        chapter_ids=chapter_ids,
+        on_progress=report_task_progress,
+    )
+    if settings.summary_tree_enabled and progress.chapter_numbers:
+        async with AsyncSessionLocal() as session:
+            for chapter_number in progress.chapter_numbers:
+                await enqueue_summary_tree_refresh(
+                    session, project_id, chapter_number, user_id
+                )
+    if progress.failed:
+        # 抛出异常交给任务队列重试，重试时只会处理仍缺少摘要的章节
+        raise RuntimeError(f"{progress.failed} 个章节摘要生成失败")
+
+
+@register_task(CHAPTER_SUMMARY, concurrency=settings.task_summary_concurrency)
+async def summarize_chapter(payload: dict[str, Any]) -> None:
+    """为单个章节补齐摘要；新的补齐统一按项目提交，保留以执行已入队的任务。."""
+    await _backfill_summaries(
+        payload["project_id"], payload.get("user_id"), [payload["chapter_id"]]
+    )
+
+
+@register_task(SUMMARY_BACKFILL, concurrency=settings.task_summary_concurrency)
+async def backfill_project_summaries(payload: dict[str, Any]) -> None:
+    """并发补齐整个项目缺失的章节摘要，逐章提交并上报进度。."""
+    await _backfill_summaries(
+        payload["project_id"], payload.get("user_id"), payload.get("chapter_ids")
+    )
+
+
+@register_task(SUMMARY_TREE_REFRESH, concurrency=1)
+async def refresh_summary_tree(payload: dict[str, Any]) -> None:
+    """章节摘要更新后刷新所属事件、情节线与分卷的分层摘要。."""
+    async with AsyncSessionLocal() as session:
+        await SummaryTreeService(session).refresh_for_chapter(
+            payload["project_id"], payload["chapter_number"], payload.get("user_id")
+        )
+
+
+@register_task(CHAPTER_INGEST, concurrency=settings.task_vector_concurrency)
+async def ingest_chapter_vectors(payload: dict[str, Any]) -> None:
+    """将章节选定版本与摘要同步至向量库，向量库使用进程级共享实例。."""
+    project_id = payload["project_id"]
+    chapter_number = payload["chapter_number"]
+    vector_store = get_vector_store()
+    if vector_store is None:
+        logger.warning("向量库不可用，跳过章节入库: project=%s", project_id)
+        return
+    async with AsyncSessionLocal() as session:
+        stmt = (
+            select(Chapter)
+            .where(
+                Chapter.project_id == project_id,
+                Chapter.chapter_number == chapter_number,
+            )
+            .options(
+                selectinload(Chapter.selected_version).undefer(ChapterVersion.content),
+                selectinload(Chapter.event),
+            )
+        )
+        chapter = (await session.execute(stmt)).scalars().first()
+        if (
+            not chapter
+            or not chapter.selected_version
+            or not chapter.selected_version.content
+        ):
+            return
+        chapter_title = (
+            chapter.event.event_title
+            if chapter.event and chapter.event.event_title
+            else f"第{chapter_number}章"
+        )
+        ingestion_service = ChapterIngestionService(
+            llm_service=LLMService(session), vector_store=vector_store
+        )
+        await ingestion_service.ingest_chapter(
+            project_id=project_id,
+            chapter_number=chapter_number,
+            title=chapter_title,
+            content=chapter.selected_version.content,
+            summary=chapter.real_summary,
+            user_id=payload.get("user_id"),
+        )
+    logger.info("项目 %s 第 %s 章已同步至向量库", project_id, chapter_number)
+
+
+@register_task(CHAPTER_VECTOR_DELETE, concurrency=settings.task_vector_concurrency)
+async def delete_chapter_vectors(payload: dict[str, Any]) -> None:
+    """从向量库移除已删除章节的片段与摘要。."""
+    project_id = payload["project_id"]
+    chapter_numbers = payload["chapter_numbers"]
+    vector_store = get_vector_store()
+    if vector_store is None:
+        logger.warning("向量库不可用，跳过删除: project=%s", project_id)
+        return
+    async with AsyncSessionLocal() as session:
+        ingestion_service = ChapterIngestionService(
+            llm_service=LLMService(session), vector_store=vector_store
+        )
+        await ingestion_service.delete_chapters(project_id, chapter_numbers)
+    logger.info("项目 %s 已从向量库移除章节 %s", project_id, chapter_numbers)
+
+
+async def enqueue_summary_backfill(
+    session: AsyncSession, project_id: str, user_id: int | None
+) -> TaskJob:
+    """提交整个项目的摘要补齐任务，同一项目只保留一个待执行的补齐任务。."""
+    return await enqueue_task(
+        session,
+        SUMMARY_BACKFILL,
+        {"project_id": project_id, "user_id": user_id},
+        dedup_key=summary_backfill_dedup_key(project_id),
+    )
+
+
+def summary_backfill_dedup_key(project_id: str) -> str:
+    """返回项目摘要补齐任务的去重键。."""
+    return f"project:{project_id}"
+
+
+async def enqueue_summary_tree_refresh(
+    session: AsyncSession, project_id: str, chapter_number: int, user_id: int | None
+) -> None:
+    """提交章节所属分层摘要的刷新任务，同一章节只保留一个待执行任务。."""
+    await enqueue_task(
+        session,
+        SUMMARY_TREE_REFRESH,
+        {
+            "project_id": project_id,
+            "chapter_number": chapter_number,
+            "user_id": user_id,
+        },
+        dedup_key=f"{project_id}:{chapter_number}",
+    )
+
+
+async def enqueue_chapter_ingest(
+    session: AsyncSession, project_id: str, chapter_number: int, user_id: int | None
+) -> None:
+    """提交章节向量入库任务，同一章节只保留一个待执行任务。."""
+    await enqueue_task(
+        session,
+        CHAPTER_INGEST,
+        {
+            "project_id": project_id,
+            "chapter_number": chapter_number,
+            "user_id": user_id,
+        },
+        dedup_key=f"{project_id}:{chapter_number}",
+    )
+
+
+async def enqueue_chapter_vector_delete(
+    session: AsyncSession, project_id: str, chapter_numbers: list[int]
+) -> None:
+    """提交从向量库移除已删除章节的任务。."""
+    await enqueue_task(
+        session,
+        CHAPTER_VECTOR_DELETE,
+        {"project_id": project_id, "chapter_numbers": chapter_numbers},
+    )
+
+
+__all__ = [
+    "SUMMARY_BACKFILL",
+    "enqueue_chapter_ingest",
+    "enqueue_chapter_vector_delete",
+    "enqueue_summary_backfill",
+    "enqueue_summary_tree_refresh",
+    "summary_backfill_dedup_key",
+]
@@ -0,0 +1,427 @@
+"""基于数据库的后台任务队列.
+
+替代进程内的 BackgroundTasks：任务先写入 task_jobs 表再由 worker 执行，
+进程重启不会丢失；失败后按指数退避重试，超过最大次数标记为失败并保留错误信息。
+
+- register_task 注册任务类型及其并发上限，处理函数只接收 payload 并自行管理会话
+- enqueue_task 写入任务，相同类型与去重键的待执行任务只保留一个
+- TaskWorker 轮询并执行任务，可运行在 Web 进程内，也可通过 app.worker 单独运行
+- 领取任务时记录进程标识与租约，执行期间定期续租，只有租约过期的任务才会被重新执行
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..db.session import AsyncSessionLocal
+from ..models.task_job import TaskJob
+from .job_lease import INSTANCE_ID, keep_lease, lease_deadline
+
+logger = logging.getLogger(__name__)
+
+TaskHandler = Callable[[dict[str, Any]], Awaitable[None]]
+
+# 重试退避的上限（秒）
+_MAX_RETRY_DELAY = 3600.0
+_MAX_ERROR_LENGTH = 2000
+
+
+@dataclass(slots=True)
+class TaskSpec:
+    """任务类型的处理函数与执行约束。."""
+
+    kind: str
+    handler: TaskHandler
+    concurrency: int
+    max_attempts: int
+
+
+_registry: dict[str, TaskSpec] = {}
+
+# 当前执行中的任务 ID，供处理函数上报进度
+_current_job_id: ContextVar[int | None] = ContextVar("task_job_id", default=None)
+
+
+def register_task(
+    kind: str, *, concurrency: int = 1, max_attempts: int | None = None
+) -> Callable[[TaskHandler], TaskHandler]:
+    """装饰器：注册任务类型，同一类型同时最多执行 concurrency 个任务。."""
+
+    def decorator(handler: TaskHandler) -> TaskHandler:
+        _registry[kind] = TaskSpec(
+            kind=kind,
+            handler=handler,
+            concurrency=max(1, concurrency),
+            max_attempts=max_attempts or settings.task_max_attempts,
+        )
+        return handler
+
+    return decorator
+
+
+async def enqueue_task(
+    session: AsyncSession,
+    kind: str,
+    payload: dict[str, Any],
+    *,
+    dedup_key: str | None = None,
+) -> TaskJob:
+    """写入一个待执行任务并提交；存在相同的待执行任务时直接返回已有任务。."""
+    if dedup_key is not None:
+        stmt = select(TaskJob).where(
+            TaskJob.kind == kind,
+            TaskJob.dedup_key == dedup_key,
+            TaskJob.status == "pending",
+        )
+        existing = (await session.execute(stmt)).scalars().first()
+        if existing is not None:
+            logger.debug("跳过重复任务: kind=%s dedup_key=%s", kind, dedup_key)
+            return existing
+
+    spec = _registry.get(kind)
+    job = TaskJob(
+        kind=kind,
+        payload=payload,
+        dedup_key=dedup_key,
+        status="pending",
+        attempts=0,
+        max_attempts=spec.max_attempts if spec else settings.task_max_attempts,
+        run_after=datetime.now(UTC),
+    )
+    session.add(job)
+    await session.commit()
+    task_worker.notify()
+    return job
+
+
+async def report_task_progress(progress: dict[str, Any]) -> None:
+    """在处理函数内上报当前任务的进度，不在任务中调用时忽略。."""
+    job_id = _current_job_id.get()
+    if job_id is None:
+        return
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(TaskJob).where(TaskJob.id == job_id).values(progress=progress)
+        )
+        await session.commit()
+
+
+def _retry_delay(attempts: int) -> float:
+    delay = settings.task_retry_base_delay * (2 ** max(0, attempts - 1))
+    return min(delay, _MAX_RETRY_DELAY)
+
+
+class TaskQueueService:
+    """任务队列的查询与管理操作。."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def list_jobs(
+        self,
+        *,
+        status: str | None = None,
+        kind: str | None = None,
+        limit: int = 100,
+    ) -> list[TaskJob]:
+        stmt = select(TaskJob).order_by(TaskJob.id.desc()).limit(limit)
+        if status:
+            stmt = stmt.where(TaskJob.status == status)
+        if kind:
+            stmt = stmt.where(TaskJob.kind == kind)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def latest_job(self, kind: str, dedup_key: str) -> TaskJob | None:
+        """返回指定类型与去重键的最近一个任务。."""
+        stmt = (
+            select(TaskJob)
+            .where(TaskJob.kind == kind, TaskJob.dedup_key == dedup_key)
+            .order_by(TaskJob.id.desc())
+            .limit(1)
+        )
+        return (await self.session.execute(stmt)).scalars().first()
+
+    async def stats(self) -> dict[str, dict[str, int]]:
+        """按任务类型统计各状态的任务数。."""
+        stmt = select(TaskJob.kind, TaskJob.status, func.count(TaskJob.id)).group_by(
+            TaskJob.kind, TaskJob.status
+        )
+        counts: dict[str, dict[str, int]] = {}
+        for kind, status, count in (await self.session.execute(stmt)).all():
+            counts.setdefault(kind, {})[status] = count
+        return counts
+
+    async def retry(self, job_id: int) -> TaskJob | None:
+        """将失败的任务重新放回队列，尝试次数清零。."""
+        job = await self.session.get(TaskJob, job_id)
+        if job is None or job.status != "failed":
+            return job
+        job.status = "pending"
+        job.attempts = 0
+        job.run_after = datetime.now(UTC)
+        job.finished_at = None
+        await self.session.commit()
+        task_worker.notify()
+        return job
+
+    async def requeue_expired(self) -> int:
+        """将租约已过期（执行进程已退出）的执行中任务放回队列。."""
+        now = datetime.now(UTC)
+        result = await self.session.execute(
+            update(TaskJob)
+            .where(
+                TaskJob.status == "running",
+                or_(
+                    TaskJob.lease_expires_at.is_(None),
+                    TaskJob.lease_expires_at < now,
+                ),
+            )
+            .values(
+                status="pending",
+                run_after=now,
+                claimed_by=None,
+                lease_expires_at=None,
+            )
+        )
+        await self.session.commit()
+        return result.rowcount or 0
+
+    async def release_claimed(self, owner: str) -> int:
+        """进程正常退出时，把其执行中的任务立即放回队列，无需等待租约过期。."""
+        result = await self.session.execute(
+            update(TaskJob)
+            .where(TaskJob.status == "running", TaskJob.claimed_by == owner)
+            .values(
+                status="pending",
+                run_after=datetime.now(UTC),
+                claimed_by=None,
+                lease_expires_at=None,
+            )
+        )
+        await self.session.commit()
+        return result.rowcount or 0
+
+    async def renew_leases(self, owner: str) -> None:
+        """为指定进程执行中的全部任务续租。."""
+        await self.session.execute(
+            update(TaskJob)
+            .where(TaskJob.status == "running", TaskJob.claimed_by == owner)
+            .values(lease_expires_at=lease_deadline())
+        )
+        await self.session.commit()
+
+
+class TaskWorker:
+    """轮询任务表并按类型限制并发执行任务。."""
+
+    def __init__(self) -> None:
+        self._loop_task: asyncio.Task | None = None
+        self._lease_task: asyncio.Task | None = None
+        self._wake = asyncio.Event()
+        self._running: dict[str, set[asyncio.Task]] = {}
+        self._next_requeue = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        return self._loop_task is not None and not self._loop_task.done()
+
+    def notify(self) -> None:
+        """有新任务或空出执行槽位时唤醒轮询，未启动时无副作用。."""
+        self._wake.set()
+
+    async def start(self) -> None:
+        if self.is_running:
+            return
+        self._loop_task = asyncio.create_task(self._run())
+        self._lease_task = asyncio.create_task(keep_lease(self._renew_leases))
+        logger.info(
+            "后台任务 worker 已启动: instance=%s kinds=%s",
+            INSTANCE_ID,
+            sorted(_registry),
+        )
+
+    async def stop(self) -> None:
+        """停止轮询并取消执行中的任务，本进程领取的任务立即放回队列。."""
+        tasks = [task for running in self._running.values() for task in running]
+        for attr in ("_loop_task", "_lease_task"):
+            task = getattr(self, attr)
+            if task is not None:
+                tasks.append(task)
+                setattr(self, attr, None)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._running.clear()
+        try:
+            async with AsyncSessionLocal() as session:
+                await TaskQueueService(session).release_claimed(INSTANCE_ID)
+        except Exception as exc:  # pragma: no cover - 释放失败时等待租约过期
+            logger.warning("释放执行中的后台任务失败: %s", exc)
+        logger.info("后台任务 worker 已停止")
+
+    async def _renew_leases(self) -> None:
+        async with AsyncSessionLocal() as session:
+            await TaskQueueService(session).renew_leases(INSTANCE_ID)
+
+    async def _requeue_expired(self) -> None:
+        """每个租约周期检查一次过期任务，其他进程退出后遗留的任务由此接管。."""
+        loop_time = asyncio.get_running_loop().time()
+        if loop_time < self._next_requeue:
+            return
+        self._next_requeue = loop_time + settings.task_lease_seconds / 3
+        async with AsyncSessionLocal() as session:
+            requeued = await TaskQueueService(session).requeue_expired()
+        if requeued:
+            logger.warning("已将 %s 个租约过期的后台任务重新放回队列", requeued)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._requeue_expired()
+                await self._dispatch()
+            except Exception as exc:
+                logger.exception("后台任务调度失败: %s", exc)
+            try:
+                await asyncio.wait_for(
+                    self._wake.wait(), timeout=settings.task_worker_poll_interval
+                )
+            except TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def _dispatch(self) -> None:
+        for kind, spec in _registry.items():
+            running = self._running.setdefault(kind, set())
+            free = spec.concurrency - len(running)
+            if free <= 0:
+                continue
+            for job_id in await self._claim(kind, free):
+                task = asyncio.create_task(self._execute(job_id, spec))
+                running.add(task)
+                task.add_done_callback(self._on_task_done(running))
+
+    def _on_task_done(
+        self, running: set[asyncio.Task]
+    ) -> Callable[[asyncio.Task], None]:
+        def callback(task: asyncio.Task) -> None:
+            running.discard(task)
+            self.notify()
+
+        return callback
+
+    async def _claim(self, kind: str, limit: int) -> list[int]:
+        """领取到期的待执行任务；条件更新保证多个 worker 不会重复领取。."""
+        now = datetime.now(UTC)
+        async with AsyncSessionLocal() as session:
+            stmt = (
+                select(TaskJob.id)
+                .where(
+                    TaskJob.kind == kind,
+                    TaskJob.status == "pending",
+                    TaskJob.run_after <= now,
+                )
+                .order_by(TaskJob.id)
+                .limit(limit)
+            )
+            candidates = list((await session.execute(stmt)).scalars().all())
+            claimed: list[int] = []
+            for job_id in candidates:
+                result = await session.execute(
+                    update(TaskJob)
+                    .where(TaskJob.id == job_id, TaskJob.status == "pending")
+                    .values(
+                        status="running",
+                        started_at=now,
+                        attempts=TaskJob.attempts + 1,
+                        claimed_by=INSTANCE_ID,
+                        lease_expires_at=lease_deadline(now),
+                    )
+                )
+                if result.rowcount:
+                    claimed.append(job_id)
+            await session.commit()
+        return claimed
+
+    async def _execute(self, job_id: int, spec: TaskSpec) -> None:
+        async with AsyncSessionLocal() as session:
+            job = await session.get(TaskJob, job_id)
+            if job is None:
+                return
+            payload = dict(job.payload or {})
+            attempts = job.attempts
+
+        # 执行期间不占用数据库连接，处理函数自行管理会话
+        error: str | None = None
+        _current_job_id.set(job_id)
+        try:
+            await spec.handler(payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.exception(
+                "后台任务执行失败: id=%s kind=%s attempt=%s error=%s",
+                job_id,
+                spec.kind,
+                attempts,
+                exc,
+            )
+            error = (str(exc) or exc.__class__.__name__)[:_MAX_ERROR_LENGTH]
+
+        now = datetime.now(UTC)
+        async with AsyncSessionLocal() as session:
+            job = await session.get(TaskJob, job_id)
+            if job is None:
+                return
+            if job.status != "running" or job.claimed_by != INSTANCE_ID:
+                # 续租中断期间租约过期，任务已被重新放回队列或由其他进程接管
+                logger.warning(
+                    "后台任务租约已失效，丢弃本次结果: id=%s kind=%s owner=%s",
+                    job_id,
+                    spec.kind,
+                    job.claimed_by,
+                )
+                return
+            job.lease_expires_at = None
+            if error is None:
+                job.status = "succeeded"
+                job.last_error = None
+                job.finished_at = now
+            elif job.attempts >= job.max_attempts:
+                job.status = "failed"
+                job.last_error = error
+                job.finished_at = now
+            else:
+                job.status = "pending"
+                job.last_error = error
+                job.run_after = now + timedelta(seconds=_retry_delay(job.attempts))
+            await session.commit()
+            logger.info(
+                "后台任务结束: id=%s kind=%s status=%s attempts=%s",
+                job_id,
+                spec.kind,
+                job.status,
+                job.attempts,
+            )
+
+
+task_worker = TaskWorker()
+
+
+__all__ = [
+    "TaskQueueService",
+    "TaskWorker",
+    "enqueue_task",
+    "register_task",
+    "report_task_progress",
+    "task_worker",
+]
@@ -10,9 +10,9 @@ class UsageService:
         self.session = session
         self.repo = UsageMetricRepository(session)
 
-    async def increment(self, key: str) -> None:
+    async def increment(self, key: str, amount: int = 1) -> None:
         counter = await self.repo.get_or_create(key)
-        counter.value += 1
+        counter.value += amount
         await self.session.commit()
 
     async def get_value(self, key: str) -> int:
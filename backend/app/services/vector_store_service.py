@@ -3,13 +3,17 @@ from __future__ import annotations
 """
 向量检索服务，封装章节内容的存储与查询。
 
-支持两种提供方：
+支持三种提供方：
 - libsql（本地文件/远程 libsql）
 - Qdrant（推荐，HNSW 近似检索，更适合规模化）
+- local（嵌入式内存映射索引，见 local_vector_index，适合无需向量服务的单机部署）
 
 本文件中的注释均使用中文，便于团队成员快速理解 RAG 相关逻辑。
 """
 
+import asyncio
+import heapq
+import inspect
 import json
 import logging
 import math
@@ -20,30 +24,37 @@ from pathlib import Path
 from typing import Any
 
 from ..core.config import settings
+from .local_vector_index import LocalVectorIndex
 
 try:  # noqa: SIM105 - 明确区分依赖缺失的情况
     import libsql_client
 except ImportError:  # pragma: no cover - 在未安装依赖时提供友好提示
     libsql_client = None  # type: ignore[assignment]
 
+try:  # noqa: SIM105 - numpy 随 qdrant-client 安装，缺失时退化为纯 Python 计算
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
 try:  # Qdrant 可选依赖
-    from qdrant_client import QdrantClient
+    from qdrant_client import AsyncQdrantClient
     from qdrant_client.http.models import (
         Distance,
         FieldCondition,
         Filter,
         MatchAny,
         MatchValue,
+        PointIdsList,
         PointStruct,
         VectorParams,
     )
 except Exception:  # pragma: no cover - 未安装时允许退化
-    QdrantClient = None  # type: ignore[assignment]
+    AsyncQdrantClient = None  # type: ignore[assignment]
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class RetrievedChunk:
     """向量检索得到的剧情片段。."""
 
@@ -54,7 +65,7 @@ class RetrievedChunk:
     metadata: dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True)
 class RetrievedSummary:
     """向量检索得到的章节摘要。."""
 
@@ -68,6 +79,9 @@ class VectorStoreService:
     """向量库操作工具，确保不同小说项目的数据隔离。."""
 
     def __init__(self) -> None:
+        # 共享实例会被并发请求同时使用，建表与集合检查需要串行化并缓存结果
+        self._schema_lock = asyncio.Lock()
+        self._known_collections: dict[str, int] = {}
         if not settings.vector_store_enabled:
             logger.warning("未开启向量库配置，RAG 检索将被跳过。")
             self._provider = "none"
@@ -85,13 +99,35 @@ class VectorStoreService:
             provider = "libsql"
         self._provider = provider
 
+        if provider == "local":
+            root = self._resolve_local_root(settings.vector_db_url or "")
+            logger.info("初始化本地向量索引: root=%s", root)
+            self._client = LocalVectorIndex(
+                root,
+                segment_rows=settings.vector_local_segment_rows,
+                compact_ratio=settings.vector_local_compact_ratio,
+                ivf_min_rows=settings.vector_local_ivf_min_rows,
+                ivf_nprobe=settings.vector_local_ivf_nprobe,
+            )
+            self._schema_ready = True
+            return
+
         if provider == "qdrant":
-            if QdrantClient is None:  # pragma: no cover
+            if AsyncQdrantClient is None:  # pragma: no cover
                 raise RuntimeError("缺少 qdrant-client 依赖，请先在环境中安装。")
             base_url = settings.vector_db_url
-            logger.info("初始化 Qdrant 客户端: url=%s", base_url)
-            self._client = QdrantClient(
-                url=base_url, api_key=settings.vector_db_auth_token
+            logger.info(
+                "初始化 Qdrant 异步客户端: url=%s grpc=%s",
+                base_url,
+                settings.qdrant_prefer_grpc,
+            )
+            # 使用异步客户端，避免网络往返阻塞唯一的事件循环
+            self._client = AsyncQdrantClient(
+                url=base_url,
+                api_key=settings.vector_db_auth_token,
+                prefer_grpc=settings.qdrant_prefer_grpc,
+                grpc_port=settings.qdrant_grpc_port,
+                timeout=settings.qdrant_timeout,
             )
             self._schema_ready = False
             self._qdrant_chunks = f"{settings.qdrant_collection_prefix}_chunks"
@@ -129,11 +165,55 @@ class VectorStoreService:
         if not self._client or self._schema_ready:
             return
 
+        async with self._schema_lock:
+            if not self._schema_ready:
+                await self._create_schema()
+
+    async def warmup(self) -> None:
+        """应用启动时预热连接：建表、探活并缓存已有集合的向量维度。."""
+        if not self._client:
+            return
+        await self.ensure_schema()
+        if self._provider == "local":
+            logger.info("本地向量索引已就绪: root=%s", settings.vector_db_url)
+            return
+        if self._provider == "qdrant":
+            for name in (self._qdrant_chunks, self._qdrant_summaries):
+                try:
+                    info = await self._client.get_collection(name)  # type: ignore[attr-defined]
+                except Exception:
+                    # 集合尚未创建，首次写入时再按维度创建
+                    continue
+                self._known_collections[name] = self._collection_dim(info)
+            logger.info("Qdrant 连接已预热: collections=%s", self._known_collections)
+            return
+        try:
+            await self._client.execute("SELECT 1")  # type: ignore[union-attr]
+        except Exception as exc:  # pragma: no cover - 预热失败不影响启动
+            logger.warning("libsql 连接预热失败: %s", exc)
+        else:
+            logger.info("libsql 连接已预热。")
+
+    async def aclose(self) -> None:
+        """关闭底层客户端，供应用关闭时调用。."""
+        client, self._client = self._client, None
+        if client is None:
+            return
+        try:
+            result = client.close()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as exc:  # pragma: no cover - 关闭失败仅记录
+            logger.warning("关闭向量库客户端失败: %s", exc)
+        else:
+            logger.info("向量库客户端已关闭: provider=%s", self._provider)
+
+    async def _create_schema(self) -> None:
         if self._provider == "qdrant":
             # Qdrant 集合将在首次 upsert 时依据向量维度创建，这里仅检测是否存活
             try:
                 # 轻量探活：尝试列出集合（失败也不致命）
-                _ = self._client.get_collections()  # type: ignore[attr-defined]
+                _ = await self._client.get_collections()  # type: ignore[attr-defined]
             except Exception as exc:  # pragma: no cover
                 logger.warning("Qdrant 探活失败: %s", exc)
             # 置为 True，避免重复尝试
@@ -200,6 +280,21 @@ class VectorStoreService:
         if top_k <= 0:
             return []
 
+        if self._provider == "local":
+            hits = await self._client.search(  # type: ignore[union-attr]
+                "chunks", project_id, embedding, top_k
+            )
+            return [
+                RetrievedChunk(
+                    content=payload.get("content", ""),
+                    chapter_number=int(payload.get("chapter_number", 0)),
+                    chapter_title=payload.get("chapter_title"),
+                    score=distance,
+                    metadata=self._parse_metadata(payload.get("metadata")),
+                )
+                for payload, distance in hits
+            ]
+
         if self._provider == "qdrant":
             try:
                 flt = Filter(
@@ -209,7 +304,7 @@ class VectorStoreService:
                         )
                     ]
                 )
-                results = self._client.search(
+                results = await self._client.search(
                     collection_name=self._qdrant_chunks,  # type: ignore[attr-defined]
                     query_vector=list(embedding),
                     limit=top_k,
@@ -297,6 +392,20 @@ class VectorStoreService:
         if top_k <= 0:
             return []
 
+        if self._provider == "local":
+            hits = await self._client.search(  # type: ignore[union-attr]
+                "summaries", project_id, embedding, top_k
+            )
+            return [
+                RetrievedSummary(
+                    chapter_number=int(payload.get("chapter_number", 0)),
+                    title=payload.get("title", ""),
+                    summary=payload.get("summary", ""),
+                    score=distance,
+                )
+                for payload, distance in hits
+            ]
+
         if self._provider == "qdrant":
             try:
                 flt = Filter(
@@ -306,7 +415,7 @@ class VectorStoreService:
                         )
                     ]
                 )
-                results = self._client.search(
+                results = await self._client.search(
                     collection_name=self._qdrant_summaries,  # type: ignore[attr-defined]
                     query_vector=list(embedding),
                     limit=top_k,
@@ -385,6 +494,22 @@ class VectorStoreService:
 
         await self.ensure_schema()
 
+        if self._provider == "local":
+            await self._local_upsert(
+                "chunks",
+                records,
+                (
+                    "id",
+                    "project_id",
+                    "chapter_number",
+                    "chunk_index",
+                    "chapter_title",
+                    "content",
+                    "metadata",
+                ),
+            )
+            return
+
         if self._provider == "qdrant":
             items = list(records)
             if not items:
@@ -411,7 +536,7 @@ class VectorStoreService:
                 points.append(PointStruct(id=pid, vector=list(emb), payload=payload))
             if points:
                 try:
-                    self._client.upsert(
+                    await self._client.upsert(
                         collection_name=self._qdrant_chunks, points=points
                     )  # type: ignore[attr-defined]
                     logger.debug("Qdrant 已写入章节片段: count=%d", len(points))
@@ -420,32 +545,6 @@ class VectorStoreService:
             return
 
         # libsql 分支
-        sql = """
-        INSERT INTO rag_chunks (
-            id,
-            project_id,
-            chapter_number,
-            chunk_index,
-            chapter_title,
-            content,
-            embedding,
-            metadata
-        ) VALUES (
-            :id,
-            :project_id,
-            :chapter_number,
-            :chunk_index,
-            :chapter_title,
-            :content,
-            :embedding,
-            :metadata
-        )
-        ON CONFLICT(id) DO UPDATE SET
-            content=excluded.content,
-            embedding=excluded.embedding,
-            metadata=excluded.metadata,
-            chapter_title=excluded.chapter_title
-        """
         payload = []
         for item in records:
             embedding = item.get("embedding", [])
@@ -462,18 +561,26 @@ class VectorStoreService:
         if not payload:
             return
 
-        for item in payload:
-            try:
-                await self._client.execute(sql, item)  # type: ignore[union-attr]
-            except Exception as exc:  # pragma: no cover - 单条写入失败时记录日志
-                logger.error("写入 rag_chunks 失败: %s", exc)
-            else:
-                logger.debug(
-                    "已写入章节片段: project=%s chapter=%s chunk=%s",
-                    item.get("project_id"),
-                    item.get("chapter_number"),
-                    item.get("chunk_index"),
-                )
+        await self._bulk_upsert(
+            table="rag_chunks",
+            columns=(
+                "id",
+                "project_id",
+                "chapter_number",
+                "chunk_index",
+                "chapter_title",
+                "content",
+                "embedding",
+                "metadata",
+            ),
+            update_columns=("content", "embedding", "metadata", "chapter_title"),
+            rows=payload,
+        )
+        logger.debug(
+            "已写入章节片段: project=%s count=%d",
+            payload[0].get("project_id"),
+            len(payload),
+        )
 
     async def upsert_summaries(
         self,
@@ -486,6 +593,14 @@ class VectorStoreService:
 
         await self.ensure_schema()
 
+        if self._provider == "local":
+            await self._local_upsert(
+                "summaries",
+                records,
+                ("id", "project_id", "chapter_number", "title", "summary"),
+            )
+            return
+
         if self._provider == "qdrant":
             items = list(records)
             if not items:
@@ -510,7 +625,7 @@ class VectorStoreService:
                 points.append(PointStruct(id=pid, vector=list(emb), payload=payload))
             if points:
                 try:
-                    self._client.upsert(
+                    await self._client.upsert(
                         collection_name=self._qdrant_summaries, points=points
                     )  # type: ignore[attr-defined]
                     logger.debug("Qdrant 已写入章节摘要: count=%d", len(points))
@@ -519,28 +634,6 @@ class VectorStoreService:
             return
 
         # libsql 分支
-        sql = """
-        INSERT INTO rag_summaries (
-            id,
-            project_id,
-            chapter_number,
-            title,
-            summary,
-            embedding
-        ) VALUES (
-            :id,
-            :project_id,
-            :chapter_number,
-            :title,
-            :summary,
-            :embedding
-        )
-        ON CONFLICT(id) DO UPDATE SET
-            summary=excluded.summary,
-            embedding=excluded.embedding,
-            title=excluded.title
-        """
-
         payload = []
         for item in records:
             embedding = item.get("embedding", [])
@@ -554,17 +647,81 @@ class VectorStoreService:
         if not payload:
             return
 
-        for item in payload:
+        await self._bulk_upsert(
+            table="rag_summaries",
+            columns=(
+                "id",
+                "project_id",
+                "chapter_number",
+                "title",
+                "summary",
+                "embedding",
+            ),
+            update_columns=("summary", "embedding", "title"),
+            rows=payload,
+        )
+        logger.debug(
+            "已写入章节摘要: project=%s count=%d",
+            payload[0].get("project_id"),
+            len(payload),
+        )
+
+    async def _bulk_upsert(
+        self,
+        *,
+        table: str,
+        columns: Sequence[str],
+        update_columns: Sequence[str],
+        rows: Sequence[dict[str, Any]],
+    ) -> None:
+        """使用多行 VALUES 的 UPSERT 语句批量写入，并在同一事务中提交。.
+
+        所有批次通过 libsql 的 batch 接口一次性发送，任一语句失败时整体回滚，
+        随后退化为逐行写入，保证单条异常数据不会拖累整章入库。
+        """
+        # SQLite 默认单语句变量上限为 999，按列数收敛每批行数
+        batch_size = max(
+            1, min(settings.vector_upsert_batch_size, 999 // len(columns))
+        )
+        column_sql = ", ".join(columns)
+        update_sql = ", ".join(f"{col}=excluded.{col}" for col in update_columns)
+
+        def build(batch: Sequence[dict[str, Any]]) -> tuple[str, dict[str, Any]]:
+            values: list[str] = []
+            params: dict[str, Any] = {}
+            for idx, row in enumerate(batch):
+                values.append(
+                    "(" + ", ".join(f":{col}_{idx}" for col in columns) + ")"
+                )
+                for col in columns:
+                    params[f"{col}_{idx}"] = row.get(col)
+            sql = (
+                f"INSERT INTO {table} ({column_sql}) VALUES {', '.join(values)} "
+                f"ON CONFLICT(id) DO UPDATE SET {update_sql}"
+            )
+            return sql, params
+
+        statements = [
+            build(rows[start : start + batch_size])
+            for start in range(0, len(rows), batch_size)
+        ]
+        try:
+            await self._client.batch(statements)  # type: ignore[union-attr]
+            return
+        except Exception as exc:  # pragma: no cover - 批量失败时回退逐行写入
+            logger.warning(
+                "批量写入 %s 失败，回退为逐行写入: rows=%d error=%s",
+                table,
+                len(rows),
+                exc,
+            )
+
+        for row in rows:
+            sql, params = build([row])
             try:
-                await self._client.execute(sql, item)  # type: ignore[union-attr]
+                await self._client.execute(sql, params)  # type: ignore[union-attr]
             except Exception as exc:  # pragma: no cover - 单条写入失败时记录日志
-                logger.error("写入 rag_summaries 失败: %s", exc)
-            else:
-                logger.debug(
-                    "已写入章节摘要: project=%s chapter=%s",
-                    item.get("project_id"),
-                    item.get("chapter_number"),
-                )
+                logger.error("写入 %s 失败: id=%s error=%s", table, row.get("id"), exc)
 
     # -------------------- 统计接口（用于 /admin RAG 状态） --------------------
     async def count_totals(self) -> dict[str, int]:
@@ -572,16 +729,20 @@ class VectorStoreService:
         if not self._client:
             return {"chunks": 0, "summaries": 0}
         await self.ensure_schema()
+        if self._provider == "local":
+            chunks = summaries = 0
+            for pid in self._client.project_ids():  # type: ignore[union-attr]
+                counts = await self.count_by_project(pid)
+                chunks += counts["chunks"]
+                summaries += counts["summaries"]
+            return {"chunks": chunks, "summaries": summaries}
+
         if self._provider == "qdrant":
-            try:
-                c1 = self._client.count(self._qdrant_chunks, exact=True).count  # type: ignore[attr-defined]
-            except Exception:
-                c1 = 0
-            try:
-                c2 = self._client.count(self._qdrant_summaries, exact=True).count  # type: ignore[attr-defined]
-            except Exception:
-                c2 = 0
-            return {"chunks": int(c1 or 0), "summaries": int(c2 or 0)}
+            c1, c2 = await asyncio.gather(
+                self._qdrant_count(self._qdrant_chunks),
+                self._qdrant_count(self._qdrant_summaries),
+            )
+            return {"chunks": c1, "summaries": c2}
 
         # libsql 分支
         sql1 = "SELECT COUNT(1) AS c FROM rag_chunks"
@@ -609,25 +770,22 @@ class VectorStoreService:
         if not self._client:
             return {"chunks": 0, "summaries": 0}
         await self.ensure_schema()
+        if self._provider == "local":
+            c1 = await self._client.count("chunks", project_id)  # type: ignore[union-attr]
+            c2 = await self._client.count("summaries", project_id)  # type: ignore[union-attr]
+            return {"chunks": c1, "summaries": c2}
+
         if self._provider == "qdrant":
             flt = Filter(
                 must=[
                     FieldCondition(key="project_id", match=MatchValue(value=project_id))
                 ]
             )
-            try:
-                c1 = self._client.count(
-                    self._qdrant_chunks, count_filter=flt, exact=True
-                ).count  # type: ignore[attr-defined]
-            except Exception:
-                c1 = 0
-            try:
-                c2 = self._client.count(
-                    self._qdrant_summaries, count_filter=flt, exact=True
-                ).count  # type: ignore[attr-defined]
-            except Exception:
-                c2 = 0
-            return {"chunks": int(c1 or 0), "summaries": int(c2 or 0)}
+            c1, c2 = await asyncio.gather(
+                self._qdrant_count(self._qdrant_chunks, flt),
+                self._qdrant_count(self._qdrant_summaries, flt),
+            )
+            return {"chunks": c1, "summaries": c2}
 
         # libsql 分支
         sql1 = "SELECT COUNT(1) AS c FROM rag_chunks WHERE project_id = :pid"
@@ -660,6 +818,21 @@ class VectorStoreService:
 
         await self.ensure_schema()
 
+        if self._provider == "local":
+            targets = set(chapter_numbers)
+            for kind in ("chunks", "summaries"):
+                await self._client.delete(  # type: ignore[union-attr]
+                    kind,
+                    project_id,
+                    lambda payload: payload.get("chapter_number") in targets,
+                )
+            logger.info(
+                "本地索引已删除章节向量: project=%s chapters=%s",
+                project_id,
+                sorted(targets),
+            )
+            return
+
         if self._provider == "qdrant":
             try:
                 flt = Filter(
@@ -673,12 +846,15 @@ class VectorStoreService:
                         ),
                     ]
                 )
-                self._client.delete(
-                    collection_name=self._qdrant_chunks, points_selector=flt
-                )  # type: ignore[attr-defined]
-                self._client.delete(
-                    collection_name=self._qdrant_summaries, points_selector=flt
-                )  # type: ignore[attr-defined]
+                # 两个集合互不依赖，并发删除以缩短等待时间
+                await asyncio.gather(
+                    self._client.delete(  # type: ignore[attr-defined]
+                        collection_name=self._qdrant_chunks, points_selector=flt
+                    ),
+                    self._client.delete(  # type: ignore[attr-defined]
+                        collection_name=self._qdrant_summaries, points_selector=flt
+                    ),
+                )
                 logger.info(
                     "Qdrant 已删除章节向量: project=%s chapters=%s",
                     project_id,
@@ -721,6 +897,196 @@ class VectorStoreService:
                 exc,
             )
 
+    async def list_chunk_hashes(
+        self, project_id: str, chapter_number: int
+    ) -> dict[str, str | None]:
+        """列出章节已入库片段的 ID 与内容哈希，供增量入库计算差异。."""
+        if not self._client:
+            return {}
+
+        await self.ensure_schema()
+
+        if self._provider == "local":
+            payloads = await self._client.payloads(  # type: ignore[union-attr]
+                "chunks",
+                project_id,
+                lambda payload: payload.get("chapter_number") == chapter_number,
+            )
+            return {
+                payload["id"]: self._parse_metadata(payload.get("metadata")).get(
+                    "content_hash"
+                )
+                for payload in payloads
+            }
+
+        if self._provider == "qdrant":
+            flt = Filter(
+                must=[
+                    FieldCondition(key="project_id", match=MatchValue(value=project_id)),
+                    FieldCondition(
+                        key="chapter_number", match=MatchValue(value=chapter_number)
+                    ),
+                ]
+            )
+            stored: dict[str, str | None] = {}
+            offset = None
+            try:
+                while True:
+                    points, offset = await self._client.scroll(  # type: ignore[attr-defined]
+                        collection_name=self._qdrant_chunks,
+                        scroll_filter=flt,
+                        limit=256,
+                        offset=offset,
+                        with_payload=True,
+                        with_vectors=False,
+                    )
+                    for point in points:
+                        payload = point.payload or {}
+                        record_id = payload.get("id")
+                        if record_id:
+                            metadata = self._parse_metadata(payload.get("metadata"))
+                            stored[record_id] = metadata.get("content_hash")
+                    if offset is None:
+                        break
+            except Exception as exc:  # pragma: no cover - 集合尚未创建等情况
+                logger.debug("Qdrant 读取章节片段失败: %s", exc)
+            return stored
+
+        sql = """
+        SELECT id, COALESCE(metadata, '{}') AS metadata
+        FROM rag_chunks
+        WHERE project_id = :project_id AND chapter_number = :chapter_number
+        """
+        try:
+            result = await self._client.execute(  # type: ignore[union-attr]
+                sql, {"project_id": project_id, "chapter_number": chapter_number}
+            )
+        except Exception as exc:  # pragma: no cover - 查询失败时视为无历史数据
+            logger.warning("读取章节片段失败: %s", exc)
+            return {}
+        return {
+            row.get("id"): self._parse_metadata(row.get("metadata")).get(
+                "content_hash"
+            )
+            for row in self._iter_rows(result)
+            if row.get("id")
+        }
+
+    async def delete_chunks(self, project_id: str, chunk_ids: Sequence[str]) -> None:
+        """按片段 ID 删除剧情片段，用于增量入库时移除已消失的片段。."""
+        if not self._client or not chunk_ids:
+            return
+
+        await self.ensure_schema()
+
+        if self._provider == "local":
+            targets = set(chunk_ids)
+            await self._client.delete(  # type: ignore[union-attr]
+                "chunks", project_id, lambda payload: payload.get("id") in targets
+            )
+            return
+
+        if self._provider == "qdrant":
+            try:
+                await self._client.delete(  # type: ignore[attr-defined]
+                    collection_name=self._qdrant_chunks,
+                    points_selector=PointIdsList(
+                        points=[self._stable_int_id(cid) for cid in chunk_ids]
+                    ),
+                )
+            except Exception as exc:  # pragma: no cover
+                logger.warning("Qdrant 删除章节片段失败: %s", exc)
+            return
+
+        placeholders = ",".join(":id_" + str(idx) for idx in range(len(chunk_ids)))
+        params = {
+            "project_id": project_id,
+            **{f"id_{idx}": cid for idx, cid in enumerate(chunk_ids)},
+        }
+        sql = f"""
+        DELETE FROM rag_chunks
+        WHERE project_id = :project_id
+          AND id IN ({placeholders})
+        """
+        try:
+            await self._client.execute(sql, params)  # type: ignore[union-attr]
+        except Exception as exc:  # pragma: no cover - 删除失败时记录日志
+            logger.error(
+                "删除章节片段失败: project=%s ids=%s error=%s",
+                project_id,
+                list(chunk_ids),
+                exc,
+            )
+
+    async def delete_summaries(
+        self, project_id: str, chapter_numbers: Sequence[int]
+    ) -> None:
+        """仅删除指定章节的摘要向量。."""
+        if not self._client or not chapter_numbers:
+            return
+
+        await self.ensure_schema()
+
+        if self._provider == "local":
+            targets = set(chapter_numbers)
+            await self._client.delete(  # type: ignore[union-attr]
+                "summaries",
+                project_id,
+                lambda payload: payload.get("chapter_number") in targets,
+            )
+            return
+
+        if self._provider == "qdrant":
+            try:
+                flt = Filter(
+                    must=[
+                        FieldCondition(
+                            key="project_id", match=MatchValue(value=project_id)
+                        ),
+                        FieldCondition(
+                            key="chapter_number",
+                            match=MatchAny(any=list(chapter_numbers)),
+                        ),
+                    ]
+                )
+                await self._client.delete(
+                    collection_name=self._qdrant_summaries, points_selector=flt
+                )  # type: ignore[attr-defined]
+            except Exception as exc:  # pragma: no cover
+                logger.warning("Qdrant 删除章节摘要失败: %s", exc)
+            return
+
+        placeholders = ",".join(
+            ":chapter_" + str(idx) for idx in range(len(chapter_numbers))
+        )
+        params = {
+            "project_id": project_id,
+            **{f"chapter_{idx}": number for idx, number in enumerate(chapter_numbers)},
+        }
+        sql = f"""
+        DELETE FROM rag_summaries
+        WHERE project_id = :project_id
+          AND chapter_number IN ({placeholders})
+        """
+        try:
+            await self._client.execute(sql, params)  # type: ignore[union-attr]
+        except Exception as exc:  # pragma: no cover - 删除失败时记录日志
+            logger.error(
+                "删除章节摘要失败: project=%s chapters=%s error=%s",
+                project_id,
+                list(chapter_numbers),
+                exc,
+            )
+
+    @staticmethod
+    def _resolve_local_root(url: str) -> Path:
+        """解析本地索引目录，兼容 local:/file: 前缀与普通路径。."""
+        for prefix in ("local:", "file:"):
+            if url.startswith(prefix):
+                url = url[len(prefix) :]
+                break
+        return Path(url or "storage/vector_index").expanduser().resolve()
+
     @staticmethod
     def _to_f32_blob(embedding: Sequence[float]) -> bytes:
         """将向量浮点列表编码为 libsql 可识别的 float32 二进制。."""
@@ -750,6 +1116,50 @@ class VectorStoreService:
         similarity = dot / (norm_a * norm_b)
         return 1.0 - similarity
 
+    @staticmethod
+    def _rank_by_cosine(
+        query: Sequence[float], blobs: Sequence[Any], top_k: int
+    ) -> list[tuple[int, float]]:
+        """在应用层计算余弦距离，返回距离最小的 (下标, 距离) 列表。.
+
+        安装 numpy 时将全部向量拼成连续矩阵，一次矩阵向量乘法加 argpartition
+        完成 top-k；否则退化为逐行计算并用堆选取。
+        """
+        if not blobs or top_k <= 0 or not query:
+            return []
+        if np is None:
+            decode = VectorStoreService._from_f32_blob
+            distance = VectorStoreService._cosine_distance
+            scored = (
+                (idx, distance(query, decode(blob))) for idx, blob in enumerate(blobs)
+            )
+            return heapq.nsmallest(top_k, scored, key=lambda item: item[1])
+
+        query_vec = np.asarray(query, dtype=np.float32)
+        row_bytes = query_vec.size * 4
+        # 维度不一致的历史数据直接跳过，避免 reshape 失败
+        indices = [
+            idx for idx, blob in enumerate(blobs) if blob and len(blob) == row_bytes
+        ]
+        if not indices:
+            return []
+        matrix = np.frombuffer(
+            b"".join(bytes(blobs[idx]) for idx in indices), dtype=np.float32
+        ).reshape(len(indices), query_vec.size)
+        norms = np.linalg.norm(matrix, axis=1) * float(np.linalg.norm(query_vec))
+        dots = matrix @ query_vec
+        similarity = np.divide(
+            dots, norms, out=np.zeros_like(dots), where=norms > 0
+        )
+        distances = 1.0 - similarity
+        k = min(top_k, len(indices))
+        if k < len(indices):
+            candidates = np.argpartition(distances, k - 1)[:k]
+        else:
+            candidates = np.arange(len(indices))
+        ordered = candidates[np.argsort(distances[candidates], kind="stable")]
+        return [(indices[int(pos)], float(distances[pos])) for pos in ordered]
+
     async def _query_chunks_with_python_similarity(
         self,
         *,
@@ -757,22 +1167,38 @@ class VectorStoreService:
         embedding: Sequence[float],
         top_k: int,
     ) -> list[RetrievedChunk]:
+        # 先只取 ID 与向量完成排序，再按命中 ID 回查正文，避免搬运全部文本
         sql = """
-        SELECT
-            content,
-            chapter_number,
-            chapter_title,
-            COALESCE(metadata, '{}') AS metadata,
-            embedding
+        SELECT id, embedding
         FROM rag_chunks
         WHERE project_id = :project_id
         """
         result = await self._client.execute(sql, {"project_id": project_id})  # type: ignore[union-attr]
-        scored: list[RetrievedChunk] = []
-        for row in self._iter_rows(result):
-            stored_embedding = self._from_f32_blob(row.get("embedding"))
-            distance = self._cosine_distance(embedding, stored_embedding)
-            scored.append(
+        rows = list(self._iter_rows(result))
+        ranked = self._rank_by_cosine(
+            embedding, [row.get("embedding") for row in rows], top_k
+        )
+        if not ranked:
+            return []
+        ids = [rows[idx].get("id") for idx, _ in ranked]
+        details = await self._fetch_by_ids(
+            """
+            SELECT
+                id,
+                content,
+                chapter_number,
+                chapter_title,
+                COALESCE(metadata, '{}') AS metadata
+            FROM rag_chunks
+            """,
+            ids,
+        )
+        items: list[RetrievedChunk] = []
+        for record_id, (_, distance) in zip(ids, ranked):
+            row = details.get(record_id)
+            if row is None:
+                continue
+            items.append(
                 RetrievedChunk(
                     content=row.get("content", ""),
                     chapter_number=row.get("chapter_number", 0),
@@ -781,8 +1207,7 @@ class VectorStoreService:
                     metadata=self._parse_metadata(row.get("metadata")),
                 )
             )
-        scored.sort(key=lambda item: item.score)
-        return scored[:top_k]
+        return items
 
     async def _query_summaries_with_python_similarity(
         self,
@@ -792,20 +1217,31 @@ class VectorStoreService:
         top_k: int,
     ) -> list[RetrievedSummary]:
         sql = """
-        SELECT
-            chapter_number,
-            title,
-            summary,
-            embedding
+        SELECT id, embedding
         FROM rag_summaries
         WHERE project_id = :project_id
         """
         result = await self._client.execute(sql, {"project_id": project_id})  # type: ignore[union-attr]
-        scored: list[RetrievedSummary] = []
-        for row in self._iter_rows(result):
-            stored_embedding = self._from_f32_blob(row.get("embedding"))
-            distance = self._cosine_distance(embedding, stored_embedding)
-            scored.append(
+        rows = list(self._iter_rows(result))
+        ranked = self._rank_by_cosine(
+            embedding, [row.get("embedding") for row in rows], top_k
+        )
+        if not ranked:
+            return []
+        ids = [rows[idx].get("id") for idx, _ in ranked]
+        details = await self._fetch_by_ids(
+            """
+            SELECT id, chapter_number, title, summary
+            FROM rag_summaries
+            """,
+            ids,
+        )
+        items: list[RetrievedSummary] = []
+        for record_id, (_, distance) in zip(ids, ranked):
+            row = details.get(record_id)
+            if row is None:
+                continue
+            items.append(
                 RetrievedSummary(
                     chapter_number=row.get("chapter_number", 0),
                     title=row.get("title", ""),
@@ -813,8 +1249,17 @@ class VectorStoreService:
                     score=distance,
                 )
             )
-        scored.sort(key=lambda item: item.score)
-        return scored[:top_k]
+        return items
+
+    async def _fetch_by_ids(
+        self, select_sql: str, ids: Sequence[str]
+    ) -> dict[str, dict[str, Any]]:
+        placeholders = ",".join(":id_" + str(idx) for idx in range(len(ids)))
+        params = {f"id_{idx}": record_id for idx, record_id in enumerate(ids)}
+        result = await self._client.execute(  # type: ignore[union-attr]
+            f"{select_sql} WHERE id IN ({placeholders})", params
+        )
+        return {row.get("id"): row for row in self._iter_rows(result)}
 
     @staticmethod
     def _parse_metadata(raw: Any) -> dict[str, Any]:
@@ -854,6 +1299,31 @@ class VectorStoreService:
                     continue
         return normalized
 
+    # -------------------- 本地索引辅助 --------------------
+    async def _local_upsert(
+        self,
+        kind: str,
+        records: Iterable[dict[str, Any]],
+        fields: Sequence[str],
+    ) -> None:
+        grouped: dict[str, list[tuple[dict[str, Any], Sequence[float]]]] = {}
+        for item in records:
+            embedding = item.get("embedding") or []
+            if not embedding:
+                continue
+            payload = {field: item.get(field) for field in fields}
+            grouped.setdefault(item.get("project_id", ""), []).append(
+                (payload, embedding)
+            )
+        for project_id, items in grouped.items():
+            written = await self._client.upsert(kind, project_id, items)  # type: ignore[union-attr]
+            logger.debug(
+                "本地索引已写入%s: project=%s count=%d",
+                "章节片段" if kind == "chunks" else "章节摘要",
+                project_id,
+                written,
+            )
+
     # -------------------- Qdrant 辅助 --------------------
     @staticmethod
     def _stable_int_id(text: str) -> int:
@@ -866,26 +1336,102 @@ class VectorStoreService:
         # 取前 8 字节为无符号 64 位整数
         return int.from_bytes(digest[:8], byteorder="big", signed=False)
 
+    async def _qdrant_count(self, collection: str, flt: Any = None) -> int:
+        try:
+            result = await self._client.count(  # type: ignore[union-attr]
+                collection, count_filter=flt, exact=True
+            )
+        except Exception:
+            return 0
+        return int(result.count or 0)
+
+    @staticmethod
+    def _collection_dim(info: Any) -> int:
+        try:
+            vectors = info.config.params.vectors
+            return int(getattr(vectors, "size", 0) or 0)
+        except AttributeError:
+            return 0
+
     async def _ensure_qdrant_collection(self, name: str, dim: int) -> None:
         if self._provider != "qdrant" or not self._client:
             return
-        try:
-            self._client.get_collection(name)  # type: ignore[attr-defined]
+        known_dim = self._known_collections.get(name)
+        if known_dim is not None:
+            if known_dim and known_dim != dim:
+                logger.warning(
+                    "Qdrant 集合维度与嵌入维度不一致: collection=%s expected=%d actual=%d",
+                    name,
+                    known_dim,
+                    dim,
+                )
             return
-        except Exception:
-            pass
+        async with self._schema_lock:
+            if name in self._known_collections:
+                return
+            try:
+                info = await self._client.get_collection(name)  # type: ignore[attr-defined]
+            except Exception:
+                info = None
+            if info is not None:
+                self._known_collections[name] = self._collection_dim(info)
+                return
+            try:
+                await self._client.create_collection(  # type: ignore[attr-defined]
+                    collection_name=name,
+                    vectors_config=VectorParams(size=dim, distance=Distance.COSINE),
+                )
+                logger.info("Qdrant 已创建集合: %s (dim=%d)", name, dim)
+            except Exception as exc:  # pragma: no cover
+                logger.error("Qdrant 创建集合失败: %s", exc)
+                return
+            self._known_collections[name] = dim
+
+
+_shared_store: VectorStoreService | None = None
+
+
+def get_vector_store() -> VectorStoreService | None:
+    """返回进程级共享的向量库实例，可直接用作 FastAPI 依赖。.
+
+    未启用向量库或初始化失败时返回 None，调用方应降级为无 RAG 模式。
+    """
+    global _shared_store
+    if not settings.vector_store_enabled:
+        return None
+    if _shared_store is None:
         try:
-            self._client.create_collection(  # type: ignore[attr-defined]
-                collection_name=name,
-                vectors_config=VectorParams(size=dim, distance=Distance.COSINE),
-            )
-            logger.info("Qdrant 已创建集合: %s (dim=%d)", name, dim)
-        except Exception as exc:  # pragma: no cover
-            logger.error("Qdrant 创建集合失败: %s", exc)
+            _shared_store = VectorStoreService()
+        except RuntimeError as exc:
+            logger.warning("向量库初始化失败，RAG 功能被禁用: %s", exc)
+            return None
+    return _shared_store
+
+
+async def init_vector_store() -> None:
+    """在应用启动阶段创建共享实例并预热连接。."""
+    store = get_vector_store()
+    if store is None:
+        return
+    try:
+        await store.warmup()
+    except Exception as exc:  # pragma: no cover - 预热失败不阻塞启动
+        logger.warning("向量库预热失败: %s", exc)
+
+
+async def close_vector_store() -> None:
+    """关闭共享实例，供应用关闭时调用。."""
+    global _shared_store
+    store, _shared_store = _shared_store, None
+    if store is not None:
+        await store.aclose()
 
 
 __all__ = [
     "VectorStoreService",
     "RetrievedChunk",
     "RetrievedSummary",
+    "close_vector_store",
+    "get_vector_store",
+    "init_vector_store",
 ]
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+"""
+章节写作上下文打包：在给定的 token 预算内，按优先级挑选写入提示词的上下文。
+
+优先级（从高到低）：
+1. 当前事件、待写章节、写作备注与蓝图核心设定（始终保留）
+2. 最近几章的前情摘要
+3. 向量检索到的剧情片段与相关章节摘要
+4. 更早章节的前情摘要（从近到远）
+5. 蓝图的扩展部分（人物关系、完整梗概、三层架构等）
+
+token 数在本地估算：中日韩字符按 1 token 计，其余字符按 4 个约 1 token 计，
+无需依赖具体模型的分词器。
+"""
+
+import json
+import logging
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+from .chapter_context_service import ChapterRAGContext
+
+logger = logging.getLogger(__name__)
+
+_CJK_PATTERN = re.compile(
+    r"[　-〿぀-ヿ㐀-䶿一-鿿가-힯＀-￯]"
+)
+
+# 蓝图中始终保留的核心字段
+_BLUEPRINT_CORE_KEYS = (
+    "title",
+    "target_audience",
+    "genre",
+    "style",
+    "tone",
+    "one_sentence_summary",
+    "world_setting",
+    "characters",
+)
+# 预算不足时按此顺序依次尝试补充的扩展字段
+_BLUEPRINT_OPTIONAL_KEYS = (
+    "relationships",
+    "full_synopsis",
+    "story_framework",
+    "volume_outlines",
+    "stage4_data",
+)
+# 无论预算如何都优先放入的最近章节数
+_RECENT_CHAPTERS = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算文本 token 数，对中日韩文本按字计数。."""
+    if not text:
+        return 0
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def _json_tokens(value: Any) -> int:
+    return estimate_tokens(json.dumps(value, ensure_ascii=False))
+
+
+@dataclass
+class PackedWriterContext:
+    """打包后的写作上下文。."""
+
+    blueprint: dict[str, Any]
+    completed_chapters: str
+    retrieved_chunks: list[str]
+    retrieved_summaries: list[str]
+    used_tokens: int
+    budget: int
+    dropped: dict[str, int] = field(default_factory=dict)
+
+
+class WriterContextPacker:
+    """按 token 预算组装章节写作提示词的上下文。."""
+
+    def __init__(self, budget: int) -> None:
+        # budget <= 0 表示不限制，全部上下文原样放入
+        self._budget = budget
+
+    def pack(
+        self,
+        *,
+        chapter_number: int,
+        fixed_input: dict[str, Any],
+        blueprint: dict[str, Any],
+        completed_chapters: list[dict[str, Any]],
+        rag_context: ChapterRAGContext | None,
+    ) -> PackedWriterContext:
+        """返回在预算内的上下文；fixed_input 中的内容始终保留并计入预算。.
+
+        completed_chapters 的条目可带 end_chapter，表示覆盖多章的分层汇总。
+        """
+        unlimited = self._budget <= 0
+        remaining = self._budget - _json_tokens(fixed_input)
+
+        def take(cost: int) -> bool:
+            nonlocal remaining
+            if unlimited or cost <= remaining:
+                remaining -= cost
+                return True
+            return False
+
+        packed_blueprint = {
+            key: blueprint[key] for key in _BLUEPRINT_CORE_KEYS if key in blueprint
+        }
+        remaining -= _json_tokens(packed_blueprint)
+
+        ordered = sorted(completed_chapters, key=lambda item: item["chapter_number"])
+        recent = ordered[-_RECENT_CHAPTERS:]
+        older = ordered[: len(ordered) - len(recent)]
+        included: dict[int, str] = {}
+        dropped = {"completed_chapters": 0, "chunks": 0, "summaries": 0}
+
+        for item in reversed(recent):
+            line = self._chapter_line(item)
+            if take(estimate_tokens(line)):
+                included[item["chapter_number"]] = line
+            else:
+                dropped["completed_chapters"] += 1
+
+        # 只使用当前章之前的检索结果，避免重写章节时引用旧稿或后文
+        chunks = []
+        summaries = []
+        if rag_context:
+            chunks = [
+                c for c in rag_context.chunks if c.chapter_number < chapter_number
+            ]
+            summaries = [
+                s for s in rag_context.summaries if s.chapter_number < chapter_number
+            ]
+
+        chunk_texts: list[str] = []
+        for chunk in chunks:
+            title = chunk.chapter_title or f"第{chunk.chapter_number}章"
+            text = f"（来源：{title}）\n{chunk.content.strip()}"
+            if take(estimate_tokens(text)):
+                chunk_texts.append(text)
+            else:
+                dropped["chunks"] += 1
+
+        # 相关摘要对应的章节已在前情中时无需重复放入；分层汇总条目不参与匹配
+        older_numbers = {
+            item["chapter_number"] for item in older if "end_chapter" not in item
+        }
+        summary_texts: list[str] = []
+        for summary in summaries:
+            if summary.chapter_number in included:
+                continue
+            if summary.chapter_number in older_numbers:
+                # 提前放入前情摘要，使相关章节在预算紧张时也能保留
+                item = next(
+                    i
+                    for i in older
+                    if i["chapter_number"] == summary.chapter_number
+                    and "end_chapter" not in i
+                )
+                line = self._chapter_line(item)
+                if take(estimate_tokens(line)):
+                    included[summary.chapter_number] = line
+                continue
+            text = (
+                f"第{summary.chapter_number}章 - {summary.title}:"
+                f"{summary.summary.strip()}"
+            )
+            if take(estimate_tokens(text)):
+                summary_texts.append(text)
+            else:
+                dropped["summaries"] += 1
+
+        for item in reversed(older):
+            if item["chapter_number"] in included:
+                continue
+            line = self._chapter_line(item)
+            if take(estimate_tokens(line)):
+                included[item["chapter_number"]] = line
+            else:
+                dropped["completed_chapters"] += 1
+
+        for key in _BLUEPRINT_OPTIONAL_KEYS:
+            value = blueprint.get(key)
+            if not value:
+                continue
+            if take(_json_tokens({key: value})):
+                packed_blueprint[key] = value
+            else:
+                dropped[f"blueprint.{key}"] = 1
+
+        completed_section = self._render_completed(ordered, included)
+        used = (
+            self._budget - remaining
+            if not unlimited
+            else _json_tokens(fixed_input)
+            + _json_tokens(packed_blueprint)
+            + estimate_tokens(completed_section)
+            + sum(estimate_tokens(text) for text in chunk_texts + summary_texts)
+        )
+        dropped = {key: count for key, count in dropped.items() if count}
+        if dropped:
+            logger.info(
+                "写作上下文超出预算已裁剪: chapter=%s budget=%d used=%d dropped=%s",
+                chapter_number,
+                self._budget,
+                used,
+                dropped,
+            )
+        return PackedWriterContext(
+            blueprint=packed_blueprint,
+            completed_chapters=completed_section,
+            retrieved_chunks=chunk_texts,
+            retrieved_summaries=summary_texts,
+            used_tokens=used,
+            budget=self._budget,
+            dropped=dropped,
+        )
+
+    @staticmethod
+    def _chapter_line(item: dict[str, Any]) -> str:
+        start = item["chapter_number"]
+        end = item.get("end_chapter", start)
+        span = f"第{start}章" if end == start else f"第{start}-{end}章"
+        return f"- {span} - {item['title']}:{item['summary']}"
+
+    @staticmethod
+    def _render_completed(
+        ordered: list[dict[str, Any]], included: dict[int, str]
+    ) -> str:
+        """按章节顺序输出前情摘要，连续省略的章节合并为一行提示。."""
+        if not ordered:
+            return "暂无前情摘要"
+        lines: list[str] = []
+        skipped: list[int] = []
+        for item in ordered:
+            number = item["chapter_number"]
+            if number in included:
+                if skipped:
+                    lines.append(WriterContextPacker._skipped_line(skipped))
+                    skipped = []
+                lines.append(included[number])
+            else:
+                skipped.extend((number, item.get("end_chapter", number)))
+        if skipped:
+            lines.append(WriterContextPacker._skipped_line(skipped))
+        return "\n".join(lines)
+
+    @staticmethod
+    def _skipped_line(numbers: list[int]) -> str:
+        if numbers[0] == numbers[-1]:
+            return f"- （第{numbers[0]}章摘要已省略）"
+        return f"- （第{numbers[0]}-{numbers[-1]}章摘要已省略）"
+
+
+__all__ = ["PackedWriterContext", "WriterContextPacker", "estimate_tokens"]
@@ -0,0 +1,55 @@
+"""基于项目修订号的条件请求工具（ETag / If-None-Match）。.
+
+ETag 只由修订号与资源范围生成，校验时无需加载资源本身；
+客户端带回的 ETag 与当前一致时直接返回 304，不读取章节等大表。
+"""
+
+from __future__ import annotations
+
+from fastapi import Request, Response, status
+
+# 响应可被浏览器缓存，但每次使用前都必须带 If-None-Match 重新验证
+CACHE_CONTROL = "private, no-cache"
+
+
+def revision_etag(revision: int, scope: str | None = None) -> str:
+    """生成弱 ETag，scope 用于区分同一项目下的不同资源。."""
+    tag = f"{scope}-{revision}" if scope else str(revision)
+    return f'W/"{tag}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """按弱比较判断 If-None-Match 是否命中，支持逗号分隔的多个值与 *。."""
+    if not if_none_match:
+        return False
+    target = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == target:
+            return True
+    return False
+
+
+def not_modified_response(request: Request, etag: str) -> Response | None:
+    """请求携带的 ETag 仍然有效时返回 304 响应，否则返回 None。."""
+    if not etag_matches(request.headers.get("if-none-match"), etag):
+        return None
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+def set_etag_headers(response: Response, etag: str) -> None:
+    """为正常响应写入 ETag 与缓存控制头。."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+__all__ = [
+    "CACHE_CONTROL",
+    "etag_matches",
+    "not_modified_response",
+    "revision_etag",
+    "set_etag_headers",
+]
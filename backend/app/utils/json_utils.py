@@ -84,3 +84,204 @@ def sanitize_json_like_text(raw_text: str) -> str:
         i += 1
 
     return "".join(result)
+
+
+_THINK_OPEN = "<think>"
+_THINK_CLOSE = "</think>"
+_SIMPLE_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+
+class StreamingJSONFieldExtractor:
+    """增量解析模型的流式输出，在 JSON 尚未结束时即可取得指定字段的文本。.
+
+    每次 feed 一段增量：<think> 块在到达时即被丢弃；根对象中被关注的字符串
+    字段会逐段解码（含转义）后返回。对未转义的引号与换行的容错规则与
+    sanitize_json_like_text 保持一致，JSON 之前的代码块标记或说明文字会被跳过。
+    """
+
+    def __init__(self, fields: tuple[str, ...] | list[str] | set[str]):
+        self.fields = frozenset(fields)
+        self._values: dict[str, list[str]] = {}
+        self._text: list[str] = []
+        # <think> 过滤状态
+        self._in_think = False
+        self._tag_buffer = ""
+        # JSON 扫描状态
+        self._stack: list[str] = []
+        self._done = False
+        self._expect_key = False
+        self._in_string = False
+        self._string_is_key = False
+        self._string_chars: list[str] = []
+        self._escape: str | None = None
+        self._pending_high: str | None = None
+        self._quote_pending: str | None = None
+        self._last_key: str | None = None
+        self._capture: str | None = None
+        self._emitted: dict[str, list[str]] = {}
+
+    @property
+    def values(self) -> dict[str, str]:
+        """目前已解码的字段文本（字段可能尚未结束）。."""
+        return {field: "".join(parts) for field, parts in self._values.items()}
+
+    @property
+    def text(self) -> str:
+        """已去除 <think> 块的完整输出，可直接交给 unwrap_markdown_json。."""
+        return "".join(self._text).strip()
+
+    def feed(self, delta: str) -> dict[str, str]:
+        """消费一段增量，返回本次新增的字段文本 {字段名: 新增片段}。."""
+        self._emitted = {}
+        for ch in self._strip_think(delta or ""):
+            self._text.append(ch)
+            self._scan(ch)
+        return {field: "".join(parts) for field, parts in self._emitted.items()}
+
+    def finish(self) -> dict[str, str]:
+        """流结束时调用，冲刷被暂存的标签片段与引号判断。."""
+        self._emitted = {}
+        if self._tag_buffer and not self._in_think:
+            pending, self._tag_buffer = self._tag_buffer, ""
+            for ch in pending:
+                self._text.append(ch)
+                self._scan(ch)
+        self._tag_buffer = ""
+        if self._quote_pending is not None:
+            self._close_string()
+        return {field: "".join(parts) for field, parts in self._emitted.items()}
+
+    def _strip_think(self, delta: str) -> str:
+        data = self._tag_buffer + delta
+        self._tag_buffer = ""
+        output: list[str] = []
+        i = 0
+        while i < len(data):
+            tag = _THINK_CLOSE if self._in_think else _THINK_OPEN
+            idx = data.find(tag, i)
+            if idx != -1:
+                if not self._in_think:
+                    output.append(data[i:idx])
+                self._in_think = not self._in_think
+                i = idx + len(tag)
+                continue
+            rest = data[i:]
+            # 末尾可能是被拆开的标签前缀，暂存到下一段再判断
+            keep = 0
+            for size in range(min(len(tag) - 1, len(rest)), 0, -1):
+                if tag.startswith(rest[-size:]):
+                    keep = size
+                    break
+            if not self._in_think:
+                output.append(rest[: len(rest) - keep])
+            self._tag_buffer = rest[len(rest) - keep :] if keep else ""
+            break
+        return "".join(output)
+
+    def _scan(self, ch: str) -> None:
+        if self._done:
+            return
+        if self._quote_pending is not None:
+            if ch in " \t\r\n":
+                self._quote_pending += ch
+                return
+            if ch in ",:}]":
+                self._close_string()
+            else:
+                # 引号后不是结构字符，视为正文中未转义的引号
+                pending, self._quote_pending = self._quote_pending, None
+                for item in '"' + pending:
+                    self._string_char(item)
+                self._string_char(ch)
+                return
+        if self._in_string:
+            self._scan_string(ch)
+            return
+
+        if not self._stack:
+            if ch in "{[":
+                self._stack.append(ch)
+                self._expect_key = ch == "{"
+            return
+        if ch == '"':
+            self._in_string = True
+            self._string_is_key = self._stack[-1] == "{" and self._expect_key
+            self._string_chars = []
+            if (
+                not self._string_is_key
+                and len(self._stack) == 1
+                and self._stack[0] == "{"
+                and self._last_key in self.fields
+            ):
+                self._capture = self._last_key
+                self._values[self._capture] = []
+        elif ch in "{[":
+            self._stack.append(ch)
+            self._expect_key = ch == "{"
+        elif ch in "}]":
+            self._stack.pop()
+            self._expect_key = False
+            if not self._stack:
+                self._done = True
+        elif ch == ",":
+            self._expect_key = self._stack[-1] == "{"
+
+    def _scan_string(self, ch: str) -> None:
+        if self._escape is not None:
+            self._escape += ch
+            if self._escape[1] != "u":
+                self._string_char(_SIMPLE_ESCAPES.get(ch, ch))
+                self._escape = None
+            elif len(self._escape) == 6:
+                self._decode_unicode(self._escape[2:])
+                self._escape = None
+        elif ch == "\\":
+            self._escape = "\\"
+        elif ch == '"':
+            self._quote_pending = ""
+        else:
+            self._string_char(ch)
+
+    def _decode_unicode(self, hex_digits: str) -> None:
+        try:
+            code = int(hex_digits, 16)
+        except ValueError:
+            self._string_char("\\u" + hex_digits)
+            return
+        if 0xD800 <= code <= 0xDBFF:
+            self._pending_high = hex_digits
+            return
+        if 0xDC00 <= code <= 0xDFFF and self._pending_high is not None:
+            high = int(self._pending_high, 16)
+            self._pending_high = None
+            code = 0x10000 + ((high - 0xD800) << 10) + (code - 0xDC00)
+        self._string_char(chr(code))
+
+    def _string_char(self, ch: str) -> None:
+        if self._pending_high is not None:
+            # 孤立的高位代理无法组成字符，直接丢弃
+            self._pending_high = None
+        if self._string_is_key:
+            self._string_chars.append(ch)
+        elif self._capture is not None:
+            self._values[self._capture].append(ch)
+            self._emitted.setdefault(self._capture, []).append(ch)
+
+    def _close_string(self) -> None:
+        self._quote_pending = None
+        self._in_string = False
+        self._escape = None
+        if self._string_is_key:
+            self._last_key = "".join(self._string_chars)
+            self._expect_key = False
+        self._string_is_key = False
+        self._capture = None
@@ -1,11 +1,23 @@
 """OpenAI 兼容型 LLM 工具封装，保持与旧项目一致的接口体验。."""
 
+import logging
 import os
 from collections.abc import AsyncGenerator
 from dataclasses import asdict, dataclass
+from typing import Any
 
+import httpx
 from openai import AsyncOpenAI
 
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:  # pragma: no cover - 运行环境未安装时兼容
+    from ollama import AsyncClient as OllamaAsyncClient
+except ImportError:  # pragma: no cover - Ollama 为可选依赖
+    OllamaAsyncClient = None
+
 
 @dataclass
 class ChatMessage:
@@ -16,6 +28,92 @@ class ChatMessage:
         return asdict(self)
 
 
+class LLMClientRegistry:
+    """进程级客户端注册表，按 (provider, api_key, base_url) 复用长连接。.
+
+    每个客户端持有独立的 httpx 连接池（限制最大连接数并开启 keep-alive），
+    避免每次调用都重新握手 TLS；应用关闭时由 lifespan 统一调用 aclose 释放。
+    """
+
+    def __init__(self) -> None:
+        self._clients: dict[tuple[str, str, str], Any] = {}
+
+    @staticmethod
+    def _build_http_client() -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=settings.llm_http_max_connections,
+            max_keepalive_connections=settings.llm_http_max_keepalive_connections,
+            keepalive_expiry=settings.llm_http_keepalive_expiry,
+        )
+        # 单次请求的超时由调用方通过 timeout 参数覆盖，这里只给出兜底值
+        return httpx.AsyncClient(limits=limits, timeout=httpx.Timeout(600.0))
+
+    def get_openai_client(self, api_key: str, base_url: str | None) -> AsyncOpenAI:
+        """获取（或创建）OpenAI 兼容客户端，相同凭证与地址共享同一连接池。."""
+        key = ("openai", api_key, base_url or "")
+        client = self._clients.get(key)
+        if client is None:
+            client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                http_client=self._build_http_client(),
+            )
+            self._clients[key] = client
+            logger.info(
+                "已创建 OpenAI 客户端连接池: base_url=%s pool_size=%d",
+                base_url or "default",
+                len(self._clients),
+            )
+        return client
+
+    def get_ollama_client(self, base_url: str | None) -> Any:
+        """获取（或创建）Ollama 异步客户端。."""
+        if OllamaAsyncClient is None:
+            raise RuntimeError("缺少 ollama 依赖，请先安装 ollama 包。")
+        key = ("ollama", "", base_url or "")
+        client = self._clients.get(key)
+        if client is None:
+            # ollama.AsyncClient 会把额外参数透传给内部的 httpx.AsyncClient
+            client = OllamaAsyncClient(
+                host=base_url,
+                limits=httpx.Limits(
+                    max_connections=settings.llm_http_max_connections,
+                    max_keepalive_connections=settings.llm_http_max_keepalive_connections,
+                    keepalive_expiry=settings.llm_http_keepalive_expiry,
+                ),
+            )
+            self._clients[key] = client
+            logger.info(
+                "已创建 Ollama 客户端连接池: base_url=%s", base_url or "default"
+            )
+        return client
+
+    async def aclose(self) -> None:
+        """关闭全部客户端及其连接池，供应用关闭时调用。."""
+        clients = list(self._clients.items())
+        self._clients.clear()
+        for (provider, _, base_url), client in clients:
+            try:
+                if provider == "openai":
+                    await client.close()
+                else:
+                    inner = getattr(client, "_client", None)
+                    if inner is not None:
+                        await inner.aclose()
+            except Exception as exc:  # pragma: no cover - 关闭失败仅记录
+                logger.warning(
+                    "关闭 %s 客户端失败: base_url=%s error=%s",
+                    provider,
+                    base_url or "default",
+                    exc,
+                )
+        if clients:
+            logger.info("已关闭 LLM 客户端连接池: count=%d", len(clients))
+
+
+llm_client_registry = LLMClientRegistry()
+
+
 class LLMClient:
     """异步流式调用封装，兼容 OpenAI SDK。."""
 
@@ -24,8 +122,8 @@ class LLMClient:
         if not key:
             raise ValueError("缺少 OPENAI_API_KEY 配置，请在数据库或环境变量中补全。")
 
-        self._client = AsyncOpenAI(
-            api_key=key, base_url=base_url or os.environ.get("OPENAI_API_BASE")
+        self._client = llm_client_registry.get_openai_client(
+            key, base_url or os.environ.get("OPENAI_API_BASE")
         )
 
     async def stream_chat(
@@ -37,12 +135,14 @@ class LLMClient:
         top_p: float | None = None,
         max_tokens: int | None = None,
         timeout: int = 120,
+        n: int | None = None,
         **kwargs,
-    ) -> AsyncGenerator[dict[str, str], None]:
-        import logging
-
-        logger = logging.getLogger(__name__)
+    ) -> AsyncGenerator[dict[str, Any], None]:
+        """流式返回增量内容，每个增量带 index 标明所属的候选（choice）。.
 
+        n 大于 1 时在同一请求中生成多个候选，提示词只需处理一次；
+        不支持 n 的服务通常只返回 index 为 0 的候选，由调用方自行补齐。
+        """
         payload = {
             "model": model or os.environ.get("MODEL", "gpt-3.5-turbo"),
             "messages": [msg.to_dict() for msg in messages],
@@ -59,6 +159,8 @@ class LLMClient:
             payload["top_p"] = top_p
         if max_tokens is not None:
             payload["max_tokens"] = max_tokens
+        if n is not None and n > 1:
+            payload["n"] = n
 
         stream = await self._client.chat.completions.create(**payload)
         async for chunk in stream:
@@ -66,13 +168,14 @@ class LLMClient:
             choices = getattr(chunk, "choices", None)
             if not choices:
                 continue
-            choice = choices[0]
-            delta = getattr(choice, "delta", None)
-            content_piece = (
-                getattr(delta, "content", None) if delta is not None else None
-            )
-            finish_reason = getattr(choice, "finish_reason", None)
-            yield {
-                "content": content_piece,
-                "finish_reason": finish_reason,
-            }
+            for choice in choices:
+                delta = getattr(choice, "delta", None)
+                content_piece = (
+                    getattr(delta, "content", None) if delta is not None else None
+                )
+                finish_reason = getattr(choice, "finish_reason", None)
+                yield {
+                    "content": content_piece,
+                    "finish_reason": finish_reason,
+                    "index": getattr(choice, "index", None) or 0,
+                }
@@ -0,0 +1,144 @@
+"""MinHash 签名与 LSH 分桶工具，用于近重复文本的快速判定。.
+
+签名基于字符 3-gram，适配中文/英文混排；每段文本只需计算一次签名，
+之后用 LSH 分桶筛选候选，再以签名估计的 Jaccard 相似度确认是否重复，
+避免两两比较时反复构造 shingle 集合。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+from collections.abc import Iterable, Sequence
+
+try:  # noqa: SIM105 - numpy 随 qdrant-client 安装，缺失时使用纯 Python 计算
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+# 签名长度与分桶数量，修改后历史签名会因长度不符而被自动忽略
+NUM_PERM = 64
+BANDS = 16
+SHINGLE_SIZE = 3
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+_rng = random.Random(20240601)
+_PERM_A = [_rng.randint(1, _MAX_HASH) for _ in range(NUM_PERM)]
+_PERM_B = [_rng.randint(0, _MAX_HASH) for _ in range(NUM_PERM)]
+
+
+def normalize_text(text: str) -> str:
+    """去除全部空白，避免排版差异影响相似度。."""
+    return "".join(text.split())
+
+
+def shingles(text: str, k: int = SHINGLE_SIZE) -> set[str]:
+    """基于字符的 k-gram 集合。."""
+    if not text:
+        return set()
+    if len(text) <= k:
+        return {text}
+    return {text[i : i + k] for i in range(0, len(text) - k + 1)}
+
+
+def _hash32(token: str) -> int:
+    digest = hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest()
+    return int.from_bytes(digest, "little")
+
+
+def signature(text: str) -> tuple[int, ...]:
+    """计算文本的 MinHash 签名，空文本返回空元组。."""
+    tokens = shingles(normalize_text(text))
+    if not tokens:
+        return ()
+    hashes = [_hash32(token) for token in tokens]
+    if np is not None:
+        values = np.asarray(hashes, dtype=np.uint64)[:, None]
+        a = np.asarray(_PERM_A, dtype=np.uint64)[None, :]
+        b = np.asarray(_PERM_B, dtype=np.uint64)[None, :]
+        # a、h 均小于 2^32，乘积不会溢出 uint64
+        permuted = (values * a + b) % np.uint64(_MERSENNE_PRIME)
+        return tuple(int(x) for x in (permuted & np.uint64(_MAX_HASH)).min(axis=0))
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in zip(_PERM_A, _PERM_B)
+    )
+
+
+def similarity(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    """用签名估计两段文本的 Jaccard 相似度。."""
+    if not sig_a and not sig_b:
+        return 1.0
+    if not sig_a or not sig_b or len(sig_a) != len(sig_b):
+        return 0.0
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+def coerce_signature(raw: object) -> tuple[int, ...] | None:
+    """校验外部存储的签名，长度不符或格式错误时返回 None。."""
+    if not isinstance(raw, (list, tuple)) or len(raw) != NUM_PERM:
+        return None
+    try:
+        return tuple(int(x) for x in raw)
+    except (TypeError, ValueError):
+        return None
+
+
+class LSHIndex:
+    """LSH 分桶索引：签名在任一分段完全一致即成为候选。."""
+
+    def __init__(self, bands: int = BANDS) -> None:
+        self._bands = bands
+        self._rows = NUM_PERM // bands
+        self._buckets: dict[tuple[int, tuple[int, ...]], list[int]] = {}
+
+    def _keys(self, sig: Sequence[int]) -> Iterable[tuple[int, tuple[int, ...]]]:
+        for band in range(self._bands):
+            start = band * self._rows
+            yield band, tuple(sig[start : start + self._rows])
+
+    def add(self, key: int, sig: Sequence[int]) -> None:
+        for bucket in self._keys(sig):
+            self._buckets.setdefault(bucket, []).append(key)
+
+    def candidates(self, sig: Sequence[int]) -> set[int]:
+        found: set[int] = set()
+        for bucket in self._keys(sig):
+            found.update(self._buckets.get(bucket, ()))
+        return found
+
+
+def find_duplicates(
+    signatures: Sequence[Sequence[int]], threshold: float
+) -> list[int | None]:
+    """按顺序贪心去重，返回每项所重复的代表项下标（非重复为 None）。.
+
+    顺序靠前的条目优先作为代表，检索结果按相关度排序时即保留更相关的片段。
+    """
+    index = LSHIndex()
+    owners: list[int | None] = []
+    for idx, sig in enumerate(signatures):
+        owner = None
+        if sig:
+            for candidate in sorted(index.candidates(sig)):
+                if similarity(sig, signatures[candidate]) >= threshold:
+                    owner = candidate
+                    break
+        owners.append(owner)
+        if owner is None and sig:
+            index.add(idx, sig)
+    return owners
+
+
+__all__ = [
+    "NUM_PERM",
+    "LSHIndex",
+    "coerce_signature",
+    "find_duplicates",
+    "normalize_text",
+    "shingles",
+    "signature",
+    "similarity",
+]
@@ -0,0 +1,49 @@
+"""独立运行的后台任务 worker：python -m app.worker.
+
+与 Web 进程共用同一数据库，适合在 supervisord 中作为单独进程部署；
+此时应将 Web 进程的 TASK_WORKER_ENABLED 设为 false。
+"""
+
+import asyncio
+import logging
+import signal
+
+from .core.config import settings
+from .services import task_handlers  # noqa: F401 - 注册后台任务处理函数
+from .services.embedding_cache import embedding_cache
+from .services.task_queue import task_worker
+from .services.vector_store_service import close_vector_store, init_vector_store
+from .utils.llm_tool import llm_client_registry
+
+logger = logging.getLogger("app.worker")
+
+
+async def run() -> None:
+    """启动任务 worker 并等待退出信号，退出时释放共享资源。."""
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    await init_vector_store()
+    await task_worker.start()
+    try:
+        await stop_event.wait()
+    finally:
+        await task_worker.stop()
+        await llm_client_registry.aclose()
+        await close_vector_store()
+        await embedding_cache.aclose()
+
+
+def main() -> None:
+    """命令行入口：配置日志后运行 worker。."""
+    logging.basicConfig(
+        level=settings.logging_level,
+        format="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
+    )
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -63,34 +63,131 @@ def check_column_exists(cursor, table_name, column_name, db_provider):
     return False
 
 
-def add_metadata_column_sqlite(cursor):
-    """为 SQLite 数据库添加 metadata 字段"""
+# 需要补齐的字段：(表名, 字段名, SQLite 定义, MySQL 定义)
+# 新增字段时在此追加一行即可，表不存在时跳过（启动时会自动建表）
+COLUMN_MIGRATIONS = [
+    ('novel_projects', 'metadata', 'TEXT', 'JSON'),
+    ('rag_retrieval_logs', 'embedding_latency_ms', 'INTEGER', 'INT'),
+    ('rag_retrieval_logs', 'search_latency_ms', 'INTEGER', 'INT'),
+    ('novel_blueprints', 'revision', 'INTEGER NOT NULL DEFAULT 0', 'INT NOT NULL DEFAULT 0'),
+    ('task_jobs', 'progress', 'TEXT', 'JSON'),
+    ('task_jobs', 'claimed_by', 'VARCHAR(128)', 'VARCHAR(128)'),
+    ('task_jobs', 'lease_expires_at', 'DATETIME', 'DATETIME'),
+    ('chapter_generation_jobs', 'claimed_by', 'VARCHAR(128)', 'VARCHAR(128)'),
+    ('chapter_generation_jobs', 'lease_expires_at', 'DATETIME', 'DATETIME'),
+    ('novel_projects', 'revision', 'INTEGER NOT NULL DEFAULT 0', 'INT NOT NULL DEFAULT 0'),
+    ('novel_projects', 'vector_generation', 'INTEGER NOT NULL DEFAULT 0', 'INT NOT NULL DEFAULT 0'),
+]
+
+# 需要补齐的索引：(表名, 索引名, 字段列表)
+# 已有表不会因 create_all 新增索引，在此追加即可
+INDEX_MIGRATIONS = [
+    ('novel_projects', 'ix_novel_projects_user_updated', ('user_id', 'updated_at', 'id')),
+    ('novel_projects', 'ix_novel_projects_updated', ('updated_at', 'id')),
+    ('chapters', 'ix_chapters_project_id', ('project_id',)),
+]
+
+
+def check_table_exists(cursor, table_name, db_provider):
+    """检查表是否存在"""
+    if db_provider == 'sqlite':
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+            (table_name,),
+        )
+    else:
+        cursor.execute(f"SHOW TABLES LIKE '{table_name}'")
+    return cursor.fetchone() is not None
+
+
+def add_column(cursor, table_name, column_name, definition, db_provider):
+    """为指定表添加字段，字段已存在时视为成功"""
+    label = 'SQLite' if db_provider == 'sqlite' else 'MySQL'
     try:
-        cursor.execute("ALTER TABLE novel_projects ADD COLUMN metadata TEXT")
-        logger.info("✅ 成功添加 novel_projects.metadata 字段 (SQLite)")
+        cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {definition}")
+        logger.info(f"✅ 成功添加 {table_name}.{column_name} 字段 ({label})")
         return True
     except Exception as e:
         if 'duplicate column name' in str(e).lower():
-            logger.info("ℹ️  novel_projects.metadata 字段已存在 (SQLite)")
+            logger.info(f"ℹ️  {table_name}.{column_name} 字段已存在 ({label})")
             return True
         else:
-            logger.error(f"❌ 添加 novel_projects.metadata 字段失败 (SQLite): {e}")
+            logger.error(f"❌ 添加 {table_name}.{column_name} 字段失败 ({label}): {e}")
             return False
 
 
-def add_metadata_column_mysql(cursor):
-    """为 MySQL 数据库添加 metadata 字段"""
+def apply_column_migrations(cursor, db_provider):
+    """依次检查并补齐 COLUMN_MIGRATIONS 中的字段"""
+    success = True
+    for table_name, column_name, sqlite_ddl, mysql_ddl in COLUMN_MIGRATIONS:
+        if not check_table_exists(cursor, table_name, db_provider):
+            logger.info(f"ℹ️  {table_name} 表不存在，将在应用启动时自动创建")
+            continue
+        if check_column_exists(cursor, table_name, column_name, db_provider):
+            logger.info(f"ℹ️  {table_name}.{column_name} 字段已存在")
+            continue
+        definition = sqlite_ddl if db_provider == 'sqlite' else mysql_ddl
+        success = add_column(cursor, table_name, column_name, definition, db_provider) and success
+    return success
+
+
+def check_index_exists(cursor, table_name, index_name, columns, db_provider):
+    """检查索引是否存在；MySQL 中以相同字段开头的已有索引（如外键索引）也视为存在"""
+    if db_provider == 'sqlite':
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type='index' AND name=?",
+            (index_name,),
+        )
+        return cursor.fetchone() is not None
+    cursor.execute(f"""
+        SELECT INDEX_NAME, COLUMN_NAME
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE()
+        AND TABLE_NAME = '{table_name}'
+        ORDER BY INDEX_NAME, SEQ_IN_INDEX
+    """)
+    indexes = {}
+    for name, column in cursor.fetchall():
+        indexes.setdefault(name, []).append(column)
+    if index_name in indexes:
+        return True
+    return any(existing[:len(columns)] == list(columns) for existing in indexes.values())
+
+
+def apply_index_migrations(cursor, db_provider):
+    """依次检查并补齐 INDEX_MIGRATIONS 中的索引"""
+    label = 'SQLite' if db_provider == 'sqlite' else 'MySQL'
+    success = True
+    for table_name, index_name, columns in INDEX_MIGRATIONS:
+        if not check_table_exists(cursor, table_name, db_provider):
+            continue
+        if check_index_exists(cursor, table_name, index_name, columns, db_provider):
+            logger.info(f"ℹ️  {table_name}.{index_name} 索引已存在")
+            continue
+        try:
+            cursor.execute(f"CREATE INDEX {index_name} ON {table_name} ({', '.join(columns)})")
+            logger.info(f"✅ 成功创建 {table_name}.{index_name} 索引 ({label})")
+        except Exception as e:
+            logger.error(f"❌ 创建 {table_name}.{index_name} 索引失败 ({label}): {e}")
+            success = False
+    return success
+
+
+def normalize_sqlite_timestamps(cursor):
+    """将 SQLite 中带微秒的 novel_projects.updated_at 截断为秒精度，与模型存储格式保持一致"""
+    if not check_table_exists(cursor, 'novel_projects', 'sqlite'):
+        return True
     try:
-        cursor.execute("ALTER TABLE novel_projects ADD COLUMN metadata JSON")
-        logger.info("✅ 成功添加 novel_projects.metadata 字段 (MySQL)")
+        cursor.execute(
+            "UPDATE novel_projects SET updated_at = substr(updated_at, 1, 19) "
+            "WHERE length(updated_at) > 19"
+        )
+        if cursor.rowcount:
+            logger.info(f"✅ 已将 {cursor.rowcount} 条 novel_projects.updated_at 截断为秒精度")
         return True
     except Exception as e:
-        if 'duplicate column name' in str(e).lower() or "Duplicate column name" in str(e):
-            logger.info("ℹ️  novel_projects.metadata 字段已存在 (MySQL)")
-            return True
-        else:
-            logger.error(f"❌ 添加 novel_projects.metadata 字段失败 (MySQL): {e}")
-            return False
+        logger.error(f"❌ 规范化 novel_projects.updated_at 精度失败: {e}")
+        return False
 
 
 def run_migrations_sqlite(db_path):
@@ -109,24 +206,15 @@ def run_migrations_sqlite(db_path):
         conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
         
-        # 检查 novel_projects 表是否存在
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='novel_projects'")
-        if not cursor.fetchone():
-            logger.info("ℹ️  novel_projects 表不存在，将在应用启动时自动创建")
-            conn.close()
-            return True
-        
-        # 检查并添加 metadata 字段
-        if not check_column_exists(cursor, 'novel_projects', 'metadata', 'sqlite'):
-            success = add_metadata_column_sqlite(cursor)
-            if success:
-                conn.commit()
-        else:
-            logger.info("ℹ️  novel_projects.metadata 字段已存在")
-        
+        # 检查并补齐缺失字段与索引
+        success = apply_column_migrations(cursor, 'sqlite')
+        success = apply_index_migrations(cursor, 'sqlite') and success
+        success = normalize_sqlite_timestamps(cursor) and success
+        conn.commit()
         conn.close()
-        logger.info("✅ SQLite 数据库迁移完成")
-        return True
+        if success:
+            logger.info("✅ SQLite 数据库迁移完成")
+        return success
         
     except Exception as e:
         logger.error(f"❌ SQLite 数据库迁移失败: {e}")
@@ -153,24 +241,14 @@ def run_migrations_mysql(config):
         )
         cursor = conn.cursor()
         
-        # 检查 novel_projects 表是否存在
-        cursor.execute("SHOW TABLES LIKE 'novel_projects'")
-        if not cursor.fetchone():
-            logger.info("ℹ️  novel_projects 表不存在，将在应用启动时自动创建")
-            conn.close()
-            return True
-        
-        # 检查并添加 metadata 字段
-        if not check_column_exists(cursor, 'novel_projects', 'metadata', 'mysql'):
-            success = add_metadata_column_mysql(cursor)
-            if success:
-                conn.commit()
-        else:
-            logger.info("ℹ️  novel_projects.metadata 字段已存在")
-        
+        # 检查并补齐缺失字段与索引
+        success = apply_column_migrations(cursor, 'mysql')
+        success = apply_index_migrations(cursor, 'mysql') and success
+        conn.commit()
         conn.close()
-        logger.info("✅ MySQL 数据库迁移完成")
-        return True
+        if success:
+            logger.info("✅ MySQL 数据库迁移完成")
+        return success
         
     except Exception as e:
         logger.error(f"❌ MySQL 数据库迁移失败: {e}")
@@ -0,0 +1,134 @@
+import json
+
+import pytest
+
+from app.utils.json_utils import (
+    StreamingJSONFieldExtractor,
+    remove_think_tags,
+    sanitize_json_like_text,
+    unwrap_markdown_json,
+)
+
+FIELD = "full_content"
+CHUNK_SIZES = [1, 2, 3, 5, 7, 10_000]
+
+
+def _feed(text: str, chunk_size: int) -> tuple[StreamingJSONFieldExtractor, str]:
+    """按固定长度切分输入逐段喂给解析器，返回解析器与增量拼接结果。."""
+    extractor = StreamingJSONFieldExtractor((FIELD,))
+    pieces = []
+    for start in range(0, len(text), chunk_size):
+        pieces.append(extractor.feed(text[start : start + chunk_size]).get(FIELD, ""))
+    pieces.append(extractor.finish().get(FIELD, ""))
+    return extractor, "".join(pieces)
+
+
+def _reference(text: str) -> str:
+    return json.loads(unwrap_markdown_json(remove_think_tags(text)))[FIELD]
+
+
+# 合法 JSON（去掉 <think> 与代码块后）：期望值直接取 json.loads 的结果
+VALID_CASES = {
+    "plain": '{"title": "第一章", "full_content": "正文内容"}',
+    "escapes": r'{"full_content": "行一\n行二\t\"引号\" \\ \/ 中文"}',
+    "surrogate_pair": r'{"full_content": "笑脸 \ud83d\ude00 结束"}',
+    "nested_object_key_ignored": (
+        '{"meta": {"full_content": "嵌套"}, "full_content": "顶层"}'
+    ),
+    "nested_array_key_ignored": (
+        '{"items": [{"full_content": "数组"}], "full_content": "顶层"}'
+    ),
+    "field_name_as_value": '{"label": "full_content", "full_content": "值"}',
+    "whitespace_before_comma": '{"full_content": "文本" ,\n "next": 1}',
+    "markdown_fence": '```json\n{"full_content": "代码块中的正文"}\n```',
+    "leading_prose": '好的，以下是章节：\n{"full_content": "正文"}',
+    "think_block": (
+        '<think>先想想 {"full_content": "草稿"}</think>\n{"full_content": "定稿"}'
+    ),
+    "empty_value": '{"full_content": "", "other": "x"}',
+}
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("text", VALID_CASES.values(), ids=VALID_CASES.keys())
+def test_streamed_field_matches_json_loads(text, chunk_size):
+    extractor, streamed = _feed(text, chunk_size)
+    expected = _reference(text)
+
+    assert streamed == expected
+    assert extractor.values.get(FIELD, "") == expected
+    assert extractor.text == remove_think_tags(text)
+
+
+# 非法或不完整的输入：按容错规则给出期望值
+LENIENT_CASES = {
+    "unescaped_quotes": (
+        '{"full_content": "他说"你好"就走了", "x": 1}',
+        '他说"你好"就走了',
+    ),
+    "unescaped_quote_before_space": (
+        '{"full_content": "引号 " 后有空格", "x": 1}',
+        '引号 " 后有空格',
+    ),
+    "truncated_after_closing_quote": ('{"full_content": "结尾"', "结尾"),
+    "truncated_inside_string": ('{"full_content": "写到一半', "写到一半"),
+    "lone_high_surrogate": (r'{"full_content": "a\ud83db"}', "ab"),
+}
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize(
+    ("text", "expected"), LENIENT_CASES.values(), ids=LENIENT_CASES.keys()
+)
+def test_streamed_field_with_lenient_input(text, expected, chunk_size):
+    extractor, streamed = _feed(text, chunk_size)
+
+    assert streamed == expected
+    assert extractor.values[FIELD] == expected
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_unescaped_quotes_agree_with_sanitize(chunk_size):
+    text = '{"full_content": "他说"你好"就走了", "x": 1}'
+    _, streamed = _feed(text, chunk_size)
+
+    assert streamed == json.loads(sanitize_json_like_text(text))[FIELD]
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_think_tag_split_across_deltas_is_dropped(chunk_size):
+    text = '<think>{"full_content": "不应出现"}</think>{"full_content": "保留"}'
+    extractor, streamed = _feed(text, chunk_size)
+
+    assert streamed == "保留"
+    assert "不应出现" not in extractor.text
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_finish_flushes_partial_tag_prefix(chunk_size):
+    text = '{"full_content": "正文"}\n<thi'
+    extractor, streamed = _feed(text, chunk_size)
+
+    assert streamed == "正文"
+    assert extractor.text.endswith("<thi")
+
+
+def test_closing_quote_waits_for_next_delta():
+    extractor = StreamingJSONFieldExtractor((FIELD,))
+
+    assert extractor.feed('{"full_content": "甲"') == {FIELD: "甲"}
+    # 引号之后仍是正文时，暂存的引号作为正文输出
+    assert extractor.feed("乙") == {FIELD: '"乙'}
+    assert extractor.feed('"}') == {}
+    assert extractor.finish() == {}
+    assert extractor.values == {FIELD: '甲"乙'}
+
+
+def test_multiple_fields_are_tracked_independently():
+    text = '{"full_content": "正文", "summary": "摘要", "other": "忽略"}'
+    extractor = StreamingJSONFieldExtractor((FIELD, "summary"))
+    for ch in text:
+        extractor.feed(ch)
+    extractor.finish()
+
+    assert extractor.values == {FIELD: "正文", "summary": "摘要"}
@@ -0,0 +1,193 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from app.services.local_vector_index import LocalVectorIndex, _Collection
+
+DIM = 8
+
+
+def _open(path, **overrides):
+    options = {
+        "segment_rows": 64,
+        "compact_ratio": 0.3,
+        "ivf_min_rows": 0,
+        "ivf_nprobe": 4,
+    }
+    options.update(overrides)
+    return _Collection(path, **options)
+
+
+def _vector(seed: int, dim: int = DIM) -> list[float]:
+    return np.random.default_rng(seed).normal(size=dim).astype(np.float32).tolist()
+
+
+def _records(ids, *, chapter=1):
+    return [({"id": rid, "chapter": chapter}, _vector(i)) for i, rid in enumerate(ids)]
+
+
+def _brute_force(vectors: np.ndarray, query: np.ndarray, top_k: int) -> list[int]:
+    similarity = vectors @ query / (
+        np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+    )
+    return np.argsort(1.0 - similarity, kind="stable")[:top_k].tolist()
+
+
+def test_upsert_overwrites_record_with_same_id(tmp_path):
+    collection = _open(tmp_path)
+    collection.upsert(_records(["a", "b", "c"]))
+    replacement = _vector(100)
+    collection.upsert([({"id": "b", "chapter": 2}, replacement)])
+
+    assert collection.count() == 3
+    payload, distance = collection.search(replacement, 1)[0]
+    assert payload == {"id": "b", "chapter": 2}
+    assert distance == pytest.approx(0.0, abs=1e-6)
+    assert {p["id"] for p, _ in collection.search(replacement, 10)} == {"a", "b", "c"}
+
+    reopened = _open(tmp_path)
+    assert reopened.count() == 3
+    assert reopened.payloads(lambda p: p["id"] == "b") == [{"id": "b", "chapter": 2}]
+
+
+def test_upsert_skips_vectors_with_wrong_dimension(tmp_path):
+    collection = _open(tmp_path)
+    written = collection.upsert(
+        [({"id": "a"}, _vector(1)), ({"id": "b"}, _vector(2, dim=DIM + 1))]
+    )
+
+    assert written == 1
+    assert collection.count() == 1
+
+
+def test_deleted_records_are_not_returned(tmp_path):
+    collection = _open(tmp_path)
+    collection.upsert(_records(["a", "b"], chapter=1) + _records(["c"], chapter=2))
+
+    assert collection.delete(lambda p: p["chapter"] == 1) == 2
+    assert [p["id"] for p, _ in collection.search(_vector(0), 10)] == ["c"]
+
+    # 删除标记落盘，重新打开后仍然生效
+    reopened = _open(tmp_path)
+    assert reopened.count() == 1
+    assert [p["id"] for p, _ in reopened.search(_vector(0), 10)] == ["c"]
+
+
+def test_compaction_keeps_only_live_rows(tmp_path):
+    collection = _open(tmp_path, segment_rows=32)
+    ids = [f"r{i}" for i in range(100)]
+    collection.upsert(_records(ids))
+    collection.delete(lambda p: int(p["id"][1:]) % 10 < 7)
+
+    # 失效行达到阈值时自动压缩，删除标记与旧段文件一并清理
+    assert not (tmp_path / "tombstones.jsonl").exists()
+    manifest = json.loads((tmp_path / "manifest.json").read_text(encoding="utf-8"))
+    assert sorted(p.stem for p in tmp_path.glob("*.f32")) == manifest["segments"]
+
+    live = {rid for rid in ids if int(rid[1:]) % 10 >= 7}
+    for reader in (collection, _open(tmp_path)):
+        assert reader.count() == len(live)
+        for i, rid in enumerate(ids):
+            if rid not in live:
+                continue
+            payload, distance = reader.search(_vector(i), 1)[0]
+            assert payload["id"] == rid
+            assert distance == pytest.approx(0.0, abs=1e-6)
+
+
+def test_reopen_truncates_torn_segment_write(tmp_path):
+    collection = _open(tmp_path)
+    collection.upsert(_records(["a", "b", "c"]))
+    collection.release()
+
+    # 模拟写入中途崩溃：向量多写半行，载荷末尾留下半行 JSON
+    (segment,) = tmp_path.glob("*.f32")
+    with open(segment, "ab") as fh:
+        fh.write(np.ones(DIM // 2, dtype=np.float32).tobytes())
+    with open(segment.with_suffix(".jsonl"), "a", encoding="utf-8") as fh:
+        fh.write('{"id": "d", "chap')
+
+    reopened = _open(tmp_path)
+    assert reopened.count() == 3
+    assert segment.stat().st_size == 3 * DIM * 4
+
+    fresh = _vector(200)
+    reopened.upsert([({"id": "new"}, fresh)])
+    for reader in (reopened, _open(tmp_path)):
+        assert reader.count() == 4
+        payload, distance = reader.search(fresh, 1)[0]
+        assert payload["id"] == "new"
+        assert distance == pytest.approx(0.0, abs=1e-6)
+
+
+@pytest.mark.parametrize("extra_rows", [0, 50])
+def test_ivf_search_matches_brute_force(tmp_path, extra_rows):
+    rng = np.random.default_rng(7)
+    centers = rng.normal(size=(16, DIM))
+    vectors = (
+        centers[rng.integers(0, len(centers), size=1500)]
+        + rng.normal(scale=0.05, size=(1500, DIM))
+    ).astype(np.float32)
+    records = [({"id": str(i)}, vec.tolist()) for i, vec in enumerate(vectors)]
+
+    # nprobe 覆盖全部聚类时 IVF 必须与暴力检索完全一致
+    collection = _open(
+        tmp_path, segment_rows=512, ivf_min_rows=500, ivf_nprobe=10_000
+    )
+    collection.upsert(records[: len(records) - extra_rows])
+    collection.search(vectors[0].tolist(), 1)
+    assert collection._ivf is not None
+    # IVF 构建后追加的行按暴力方式补扫
+    collection.upsert(records[len(records) - extra_rows :])
+
+    for query in rng.normal(size=(20, DIM)).astype(np.float32):
+        expected = _brute_force(vectors, query, 10)
+        got = [int(p["id"]) for p, _ in collection.search(query.tolist(), 10)]
+        assert got == expected
+
+
+def test_ivf_partial_probe_keeps_high_recall(tmp_path):
+    rng = np.random.default_rng(11)
+    centers = rng.normal(size=(16, DIM))
+    vectors = (
+        centers[rng.integers(0, len(centers), size=2000)]
+        + rng.normal(scale=0.05, size=(2000, DIM))
+    ).astype(np.float32)
+    collection = _open(tmp_path, segment_rows=1024, ivf_min_rows=500, ivf_nprobe=8)
+    collection.upsert([({"id": str(i)}, vec.tolist()) for i, vec in enumerate(vectors)])
+
+    hits = 0
+    queries = vectors[rng.choice(len(vectors), size=20, replace=False)]
+    for query in queries:
+        expected = set(_brute_force(vectors, query, 10))
+        got = {int(p["id"]) for p, _ in collection.search(query.tolist(), 10)}
+        hits += len(expected & got)
+    assert hits / (10 * len(queries)) >= 0.9
+
+
+def test_index_prunes_collection_locks(tmp_path):
+    index = LocalVectorIndex(
+        tmp_path,
+        segment_rows=64,
+        compact_ratio=0.3,
+        ivf_min_rows=0,
+        ivf_nprobe=4,
+        max_open_collections=2,
+    )
+
+    async def scenario():
+        await asyncio.gather(
+            *(
+                index.upsert("chunks", f"project-{i % 3}", _records([f"id-{i}"]))
+                for i in range(12)
+            )
+        )
+        return [await index.count("chunks", f"project-{i}") for i in range(3)]
+
+    assert asyncio.run(scenario()) == [4, 4, 4]
+    assert index._locks == {}
+    assert index._lock_users == {}
+    assert sorted(index.project_ids()) == ["project-0", "project-1", "project-2"]
+    index.close()